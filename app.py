@@ -1,40 +1,46 @@
 import os
 import logging
 from logging.handlers import RotatingFileHandler
-import random
 import time
 import threading
 import base64
 import io
-from collections import deque
-from datetime import datetime, timedelta
+import uuid
+import hmac
+from functools import wraps
+from datetime import datetime
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Optional
 
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import mariadb
-import av
-from flask import Flask, render_template, jsonify, Response, request
+from urllib.parse import urlsplit
+from flask import Flask, render_template, jsonify, Response, request, send_from_directory, abort, stream_with_context, redirect, g
 from dotenv import load_dotenv
-from dbutils.pooled_db import PooledDB
-import tflite_runtime.interpreter as tflite
-from src.utils.camera import CameraManager
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("./logs/app.log"),
-        logging.StreamHandler(),
-        RotatingFileHandler(
-            "./logs/app_debug.log",
-            maxBytes=1024*1024,
-            backupCount=5
-        )
-    ]
-)
+from src.utils.camera import CameraManager, CameraSupervisor, placeholder_frame
+from src.utils.camera_registry import CameraRegistry, check_device, parse_cameras
+from src.utils import sqlite_backend
+from src.utils.db_pool import InstrumentedPool, PoolTimeout
+from src.models.stub_interpreter import StubInterpreter
+from src.models.batch_classifier import ArchiveClassifier, BatchClassifier
+from src.models.growth_curve import GrowthAnalytics
+from src.utils.system_sampler import SystemSampler
+from src.utils.sensor_service import SensorService, create_bus, parse_rates
+from src.utils.ring_store import RingStore, bucket_means, window_stats
+from src.utils.snapshot_writer import SnapshotWriter
+from src.utils.lazy import LazyResource, startup, warm_up
+from src.utils.detection_store import DETECTION_TABLES, Detection, DetectionWriter, summarize
+from src.utils.species_info import DEFAULT_UPSTREAM, SpeciesInfoService
+from src.utils.retention import RetentionPolicy, RetentionService
+from src.utils.write_buffer import WriteBuffer
+from src.utils.mjpeg_server import MjpegServer
+from src.utils.inference_scheduler import InferenceScheduler
+from src.utils.log_pipeline import configure_logging
+from src.utils.profiler import SamplingProfiler
+from src.utils.frame_pool import encode_jpeg, model_input
+from src.utils import export
+from src.utils import metrics
 
 # Ensure local directories exist
 os.makedirs("./logs", exist_ok=True)
@@ -52,14 +58,74 @@ class AppConfig:
         self.MYSQL_USER = os.getenv('MYSQL_USER', 'rootdash_user')
         self.MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'adminrdash')
         self.MYSQL_DB = os.getenv('MYSQL_DB', 'rootdash_db')
+        self.DB_BACKEND = os.getenv('DB_BACKEND', 'mariadb')
+        self.SQLITE_PATH = os.getenv('SQLITE_PATH', './data/rootdash.sqlite3')
+        self.DB_POOL_MIN_CACHED = int(os.getenv('DB_POOL_MIN_CACHED', 2))
+        self.DB_POOL_MAX_CACHED = int(os.getenv('DB_POOL_MAX_CACHED', 5))
+        self.DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', 10))
+        self.DB_POOL_PING = int(os.getenv('DB_POOL_PING', 1))
+        self.DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5.0))
+        self.DB_PREPARED_CACHE = int(os.getenv('DB_PREPARED_CACHE', 32))
+        # Each running export holds a pooled connection for the whole download
+        self.EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', 2))
+        self.SENSOR_RETENTION_DAYS = float(os.getenv('SENSOR_RETENTION_DAYS', 90))
+        self.SENSOR_RETENTION_INTERVAL = float(os.getenv('SENSOR_RETENTION_INTERVAL', 6 * 3600))
+        self.SENSOR_PARTITIONING = os.getenv('SENSOR_PARTITIONING', '1').lower() in ('1', 'true', 'yes')
+        self.RETENTION_CHUNK_SIZE = int(os.getenv('RETENTION_CHUNK_SIZE', 5000))
+        self.RETENTION_PAUSE = float(os.getenv('RETENTION_PAUSE', 0.05))
+        self.WRITE_BUFFER_PATH = os.getenv('WRITE_BUFFER_PATH', './data/write_buffer.sqlite3')
+        self.WRITE_BUFFER_BATCH = int(os.getenv('WRITE_BUFFER_BATCH', 500))
+        self.WRITE_BUFFER_MAX_ROWS = int(os.getenv('WRITE_BUFFER_MAX_ROWS', 1_000_000))
+        self.HARVEST_FRACTION = float(os.getenv('HARVEST_FRACTION', 0.95))
+        # Opt-in: the stream server listens without authentication and /video_feed redirects to it over plain HTTP
+        self.STREAM_SERVER = os.getenv('STREAM_SERVER', '0').lower() in ('1', 'true', 'yes')
+        self.STREAM_HOST = os.getenv('STREAM_HOST', '0.0.0.0')
+        self.STREAM_PORT = int(os.getenv('STREAM_PORT', 5001))
+        self.STREAM_PUBLIC_URL = os.getenv('STREAM_PUBLIC_URL', '')
+        self.STREAM_MAX_VIEWERS = int(os.getenv('STREAM_MAX_VIEWERS', 64))
+        self.FRAME_POOL = os.getenv('FRAME_POOL', '1').lower() in ('1', 'true', 'yes')
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+        self.LOG_RATE_BURST = int(os.getenv('LOG_RATE_BURST', 5))
+        self.LOG_RATE_WINDOW = float(os.getenv('LOG_RATE_WINDOW', 60))
+        self.LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+        self.ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+        self.PROFILE_DIR = os.getenv('PROFILE_DIR', './data/profiles')
+        self.PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.01))
+        self.PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', 120))
+        self.INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'tflite')
+        self.INFERENCE_CPU_BUDGET = float(os.getenv('INFERENCE_CPU_BUDGET', 0.5))
+        self.MODEL_DIR = os.getenv('MODEL_DIR', 'data_model')
+        self.MODEL_CACHE_PATH = os.getenv('MODEL_CACHE_PATH', './data/model_choice.json')
+        self.SPECIES_INFO_URL = os.getenv('SPECIES_INFO_URL', DEFAULT_UPSTREAM)
+        self.SPECIES_CACHE_PATH = os.getenv('SPECIES_CACHE_PATH', './data/species_cache.sqlite3')
+        self.SPECIES_PREFETCH_TOP = int(os.getenv('SPECIES_PREFETCH_TOP', 20))
+        self.STARTUP_WARMUP = os.getenv('STARTUP_WARMUP', '1').lower() in ('1', 'true', 'yes')
         self.TIME_LAPSE_FOLDER = os.getenv('TIME_LAPSE_FOLDER', './media/time_lapse')
         self.SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', './snapshots')
+        self.SNAPSHOT_BURST_MAX = int(os.getenv('SNAPSHOT_BURST_MAX', 10))
         self.SECRET_KEY = os.getenv('SECRET_KEY', os.urandom(24).hex())
         self.CAMERA_DEVICE = os.getenv('CAMERA_DEVICE', '/dev/video0')
+        self.CAMERAS = os.getenv('CAMERAS', '')
+        self.CAMERA_ALLOW_SOURCES = os.getenv('CAMERA_ALLOW_SOURCES', '0').lower() in ('1', 'true', 'yes')
         self.CAMERA_WIDTH = int(os.getenv('CAMERA_WIDTH', 640))
         self.CAMERA_HEIGHT = int(os.getenv('CAMERA_HEIGHT', 480))
         self.CAMERA_FPS = int(os.getenv('CAMERA_FPS', 30))
         self.JPEG_QUALITY = int(os.getenv('JPEG_QUALITY', 95))
+        self.CAMERA_STALE_AFTER = float(os.getenv('CAMERA_STALE_AFTER', 1.0))
+        self.CAMERA_MAX_BACKOFF = float(os.getenv('CAMERA_MAX_BACKOFF', 30.0))
+        self.H264_BITRATE = int(os.getenv('H264_BITRATE', 1_000_000))
+        self.H264_GOP = int(os.getenv('H264_GOP', 0)) or self.CAMERA_FPS
+        self.H264_ENCODER = os.getenv('H264_ENCODER', 'libx264')
+        self.SYSTEM_SAMPLE_INTERVAL = float(os.getenv('SYSTEM_SAMPLE_INTERVAL', 1.0))
+        self.SYSTEM_HISTORY_SIZE = int(os.getenv('SYSTEM_HISTORY_SIZE', 3600))
+        # Simulated readings are persisted like real ones, so they are never picked implicitly
+        self.SENSOR_BUS = os.getenv('SENSOR_BUS', 'i2c')
+        self.SENSOR_RATES = parse_rates(os.getenv('SENSOR_RATES', ''))
+        self.SENSOR_HISTORY_HOURS = float(os.getenv('SENSOR_HISTORY_HOURS', 24))
+        self.SENSOR_HISTORY_RESOLUTION = float(os.getenv('SENSOR_HISTORY_RESOLUTION', 1.0))
+        self.CLASSIFY_BATCH_SIZE = int(os.getenv('CLASSIFY_BATCH_SIZE', 8))
+        self.CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', os.cpu_count() or 1))
+        self.CLASSIFY_TOP_K = int(os.getenv('CLASSIFY_TOP_K', 3))
 
         self.validate()
 
@@ -75,31 +141,147 @@ class AppConfig:
             raise ValueError("Camera FPS must be positive")
         if self.JPEG_QUALITY < 0 or self.JPEG_QUALITY > 100:
             raise ValueError("JPEG quality must be between 0 and 100")
+        if self.SNAPSHOT_BURST_MAX <= 0:
+            raise ValueError("Snapshot burst size must be positive")
+        if self.CAMERA_STALE_AFTER <= 0 or self.CAMERA_MAX_BACKOFF <= 0:
+            raise ValueError("Camera stale threshold and max backoff must be positive")
+        if self.H264_BITRATE <= 0 or self.H264_GOP <= 0:
+            raise ValueError("H.264 bitrate and GOP must be positive")
+        if self.SYSTEM_SAMPLE_INTERVAL <= 0 or self.SYSTEM_HISTORY_SIZE <= 0:
+            raise ValueError("System sample interval and history size must be positive")
+        if self.DB_BACKEND not in ('mariadb', 'sqlite'):
+            raise ValueError("DB_BACKEND must be one of mariadb, sqlite")
+        if self.DB_POOL_MAX_CONNECTIONS <= 0 or self.DB_POOL_TIMEOUT <= 0:
+            raise ValueError("Database pool size and checkout timeout must be positive")
+        if not 0 <= self.DB_POOL_MIN_CACHED <= self.DB_POOL_MAX_CACHED <= self.DB_POOL_MAX_CONNECTIONS:
+            raise ValueError("Database pool sizes must satisfy 0 <= min cached <= max cached <= max connections")
+        if not 0 <= self.DB_POOL_PING <= 7:
+            raise ValueError("DB_POOL_PING must be a DBUtils ping mask between 0 and 7")
+        if self.SENSOR_RETENTION_DAYS < 0 or self.SENSOR_RETENTION_INTERVAL <= 0:
+            raise ValueError("Sensor retention days must be >= 0 (0 keeps everything) and the interval positive")
+        if self.RETENTION_CHUNK_SIZE <= 0 or self.RETENTION_PAUSE < 0:
+            raise ValueError("Retention chunk size must be positive and the pause non-negative")
+        if self.WRITE_BUFFER_BATCH <= 0 or self.WRITE_BUFFER_MAX_ROWS <= 0:
+            raise ValueError("Write buffer batch size and max rows must be positive")
+        if not 0 < self.HARVEST_FRACTION < 1:
+            raise ValueError("HARVEST_FRACTION must be between 0 and 1")
+        if self.STREAM_PORT < 0 or self.STREAM_MAX_VIEWERS <= 0:
+            raise ValueError("Stream port must be >= 0 and max viewers positive")
+        if self.LOG_LEVEL not in ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'):
+            raise ValueError("LOG_LEVEL must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL")
+        if self.LOG_RATE_BURST <= 0 or self.LOG_RATE_WINDOW <= 0 or self.LOG_QUEUE_SIZE <= 0:
+            raise ValueError("Log rate burst, window and queue size must be positive")
+        if self.PROFILE_INTERVAL <= 0 or self.PROFILE_MAX_SECONDS <= 0:
+            raise ValueError("Profile interval and max seconds must be positive")
+        if self.INFERENCE_BACKEND not in ('tflite', 'stub'):
+            raise ValueError("INFERENCE_BACKEND must be one of tflite, stub")
+        if not 0 < self.INFERENCE_CPU_BUDGET <= 1:
+            raise ValueError("INFERENCE_CPU_BUDGET must be a fraction of one core between 0 and 1")
+        parse_cameras(self.CAMERAS, self.CAMERA_DEVICE)
+        if self.SENSOR_BUS not in ('auto', 'i2c', 'simulated'):
+            raise ValueError("SENSOR_BUS must be one of auto, i2c, simulated")
+        if self.SENSOR_HISTORY_HOURS <= 0 or self.SENSOR_HISTORY_RESOLUTION <= 0:
+            raise ValueError("Sensor history hours and resolution must be positive")
+        if self.CLASSIFY_BATCH_SIZE <= 0 or self.CLASSIFY_WORKERS <= 0 or self.CLASSIFY_TOP_K <= 0:
+            raise ValueError("Classification batch size, workers and top-k must be positive")
 
 config = AppConfig()
 app.secret_key = config.SECRET_KEY
 
+# Configure logging: handlers run on one listener thread fed by a bounded queue,
+# and each call site may log LOG_RATE_BURST records per LOG_RATE_WINDOW seconds
+log_pipeline = configure_logging(
+    handlers=[
+        logging.FileHandler("./logs/app.log"),
+        logging.StreamHandler(),
+        RotatingFileHandler(
+            "./logs/app_debug.log",
+            maxBytes=1024*1024,
+            backupCount=5
+        )
+    ],
+    level=config.LOG_LEVEL,
+    fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    burst=config.LOG_RATE_BURST,
+    window=config.LOG_RATE_WINDOW,
+    queue_size=config.LOG_QUEUE_SIZE
+)
+
+def is_admin() -> bool:
+    if not config.ADMIN_TOKEN:
+        return False
+    token = request.headers.get('X-Admin-Token') or request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode())
+
+def admin_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Without ADMIN_TOKEN the admin routes don't exist
+        if not config.ADMIN_TOKEN:
+            abort(404)
+        if not is_admin():
+            return jsonify({"error": "Admin token required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# sqlite_backend is a drop-in stand-in for benchmarks, so handlers catch both driver errors
+# as well as an exhausted pool
+DB_ERRORS = (mariadb.Error, sqlite_backend.Error, PoolTimeout)
+
+DB_QUERY_SECONDS = metrics.registry.histogram("db_query_seconds", "DatabaseManager.execute_query latency")
+DB_QUERY_ERRORS = metrics.registry.counter("db_query_errors_total", "Queries that raised a database error")
+PREPROCESS_SECONDS = metrics.stage_timer("preprocess")
+INVOKE_SECONDS = metrics.stage_timer("invoke")
+ENCODE_SECONDS = metrics.stage_timer("encode")
+RENDER_SECONDS = metrics.registry.histogram("render_seconds", "Matplotlib chart rendering time", labels={"chart": "growth_graph"})
+ACTIVE_STREAMS = metrics.registry.gauge("video_streams_active", "Open /video_feed generators")
+
 class DatabaseManager:
     def __init__(self):
         self.pool = None
+        self.reconnect_lock = threading.Lock()
         self._create_pool()
         if self.pool:
             self._init_tables()
             self.populate_sample_data()
 
+    def reconnect(self) -> bool:
+        """Retry creating the pool if the database was unreachable at startup; tables are set up once it is."""
+        with self.reconnect_lock:
+            if not self.pool:
+                self._create_pool()
+                if self.pool:
+                    self._init_tables(max_retries=1, delay=0)
+                    self.populate_sample_data()
+            return bool(self.pool)
+
     def _create_pool(self):
+        sizing = dict(
+            min_cached=config.DB_POOL_MIN_CACHED,
+            max_cached=config.DB_POOL_MAX_CACHED,
+            max_connections=config.DB_POOL_MAX_CONNECTIONS,
+            ping=config.DB_POOL_PING,
+            timeout=config.DB_POOL_TIMEOUT,
+            prepared_cache_size=config.DB_PREPARED_CACHE
+        )
+        if config.DB_BACKEND == 'sqlite':
+            os.makedirs(os.path.dirname(config.SQLITE_PATH) or ".", exist_ok=True)
+            self.pool = InstrumentedPool(sqlite_backend, database=config.SQLITE_PATH, **sizing)
+            logging.info(f"SQLite connection pool created at {config.SQLITE_PATH}")
+            return
         try:
-            self.pool = PooledDB(
-                creator=mariadb,
+            self.pool = InstrumentedPool(
+                mariadb,
                 host=config.MYSQL_HOST,
                 port=config.MYSQL_PORT,
                 user=config.MYSQL_USER,
                 password=config.MYSQL_PASSWORD,
                 database=config.MYSQL_DB,
-                maxconnections=5
+                **sizing
             )
-            logging.info("Database connection pool created")
-        except mariadb.Error as e:
+            logging.info(f"Database connection pool created ({config.DB_POOL_MIN_CACHED} warm, "
+                         f"up to {config.DB_POOL_MAX_CONNECTIONS})")
+        except DB_ERRORS as e:
             logging.error(f"Database connection failed: {e}")
             self.pool = None
 
@@ -120,6 +302,9 @@ class DatabaseManager:
             ) ENGINE=InnoDB
             """,
             """
+            CREATE INDEX IF NOT EXISTS idx_sensor_data_time ON sensor_data (timestamp)
+            """,
+            """
             CREATE TABLE IF NOT EXISTS plants (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name VARCHAR(100) NOT NULL
@@ -134,8 +319,25 @@ class DatabaseManager:
                 time_after_planting INT,
                 FOREIGN KEY (plant_id) REFERENCES plants(id)
             ) ENGINE=InnoDB
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_growth_rate_plant_time ON growth_rate (plant_id, time_after_planting)
+            """,
             """
-        ]
+            CREATE TABLE IF NOT EXISTS image_classifications (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                image_path VARCHAR(512) NOT NULL,
+                captured_at DATETIME,
+                label_rank INT,
+                label VARCHAR(255),
+                confidence FLOAT,
+                classified_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_image_classifications_path ON image_classifications (image_path)
+            """
+        ] + DETECTION_TABLES
         for attempt in range(max_retries):
             conn = None
             try:
@@ -143,10 +345,15 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 for table_sql in tables:
                     cursor.execute(table_sql)
+                # Buffered sensor rows carry a key so a replayed batch is not inserted twice
+                self._ensure_column(cursor, "sensor_data", "reading_key", "VARCHAR(40)")
+                cursor.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_sensor_data_key ON sensor_data (reading_key, timestamp)"
+                )
                 conn.commit()
                 logging.info("Database tables initialized")
                 return
-            except mariadb.Error as e:
+            except DB_ERRORS as e:
                 logging.error(f"Table init attempt {attempt + 1} failed: {e}")
                 time.sleep(delay)
             finally:
@@ -154,6 +361,14 @@ class DatabaseManager:
                     conn.close()
         logging.error("Failed to initialize database tables")
 
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, definition: str):
+        cursor.execute(f"SELECT * FROM {table} WHERE 1 = 0")
+        cursor.fetchall()
+        if column not in [description[0] for description in cursor.description]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logging.info(f"Added column {table}.{column}")
+
     def populate_sample_data(self):
         conn = None
         try:
@@ -172,7 +387,7 @@ class DatabaseManager:
                 """)
                 conn.commit()
                 logging.info("Inserted sample growth data")
-        except mariadb.Error as e:
+        except DB_ERRORS as e:
             logging.error(f"Failed to populate sample data: {e}")
         finally:
             if conn:
@@ -183,33 +398,268 @@ class DatabaseManager:
             return None
         conn = None
         try:
-            conn = self.pool.connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            if commit:
-                conn.commit()
-            if cursor.description:
-                return cursor.fetchall()
-            return []
-        except mariadb.Error as e:
+            with DB_QUERY_SECONDS.time():
+                conn = self.pool.connection()
+                # Parameterized statements are the hot ones; reuse their prepared cursor per connection
+                cursor = conn.prepared_cursor(query) if params else conn.cursor()
+                cursor.execute(query, params or ())
+                if commit:
+                    conn.commit()
+                if cursor.description:
+                    return cursor.fetchall()
+                return []
+        except DB_ERRORS as e:
+            DB_QUERY_ERRORS.inc()
             logging.error(f"Query failed: {e}")
             return None
         finally:
             if conn:
                 conn.close()
 
-db_manager = DatabaseManager()
-camera_manager = CameraManager(
-    index=config.CAMERA_DEVICE,
-    width=config.CAMERA_WIDTH,
-    height=config.CAMERA_HEIGHT
+    def stream_query(self, query: str, params: tuple = None, chunk_size: int = 1000):
+        """
+        Yield result rows in chunks through an unbuffered cursor, so memory stays flat for any result size.
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        if not self.pool:
+            return
+        conn = self.pool.connection()
+        cursor = None
+        try:
+            # buffered=False streams rows from the server instead of fetching the whole result up front
+            cursor = conn.cursor(buffered=False)
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # Closing the cursor discards unread rows if the client went away mid-export
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except DB_ERRORS as e:
+                    logging.warning(f"Failed to close export cursor: {e}")
+            conn.close()
+
+    def execute_many(self, query: str, rows: List[tuple]) -> bool:
+        """Run one statement for many parameter rows in a single transaction."""
+        return self.execute_batches([(query, rows)])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Check out one connection and yield a cursor; commit if the block completes, roll back if it raises.
+        Database errors propagate to the caller after the rollback.
+        """
+        if not self.pool:
+            raise PoolTimeout("Database is not available")
+        conn = self.pool.connection()
+        try:
+            with DB_QUERY_SECONDS.time():
+                yield conn.cursor()
+                conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except DB_ERRORS as e:
+                logging.warning(f"Rollback failed: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def execute_batches(self, batches: List[Tuple[str, List[tuple]]]) -> bool:
+        """Run several executemany() statements in one transaction; all or nothing."""
+        if not self.pool:
+            return False
+        batches = [(query, rows) for query, rows in batches if rows]
+        if not batches:
+            return True
+        try:
+            with self.transaction() as cursor:
+                for query, rows in batches:
+                    cursor.executemany(query, rows)
+            return True
+        except DB_ERRORS as e:
+            DB_QUERY_ERRORS.inc()
+            logging.error(f"Batch query failed: {e}")
+            return False
+
+    def stats(self) -> Dict:
+        if not self.pool:
+            return {"available": False}
+        return dict(self.pool.stats(), available=True, backend=config.DB_BACKEND)
+
+# Subsystems are built on first use or by the background warm-up in create_app(), never at import
+db_manager = LazyResource("database", DatabaseManager)
+metrics.registry.gauge("db_pool_connections_in_use", "Pooled connections currently checked out").set_function(
+    lambda: db_manager.pool.in_use if db_manager.initialized and db_manager.pool else 0
 )
+metrics.registry.gauge("db_pool_connections_idle", "Idle connections cached in the pool").set_function(
+    lambda: db_manager.pool.idle() if db_manager.initialized and db_manager.pool else 0
+)
+metrics.registry.gauge("metrics_timer_overhead_seconds", "Measured cost of one timed block").set(
+    metrics.measure_timer_overhead()
+)
+metrics.registry.gauge("metrics_timer_overhead_budget_seconds", "Allowed cost of one timed block").set(
+    metrics.TIMER_OVERHEAD_BUDGET
+)
+
+def start_camera(name: str, device: str) -> CameraSupervisor:
+    camera_manager = CameraManager(
+        index=device,
+        width=config.CAMERA_WIDTH,
+        height=config.CAMERA_HEIGHT
+    )
+    supervisor = CameraSupervisor(
+        camera_manager,
+        stale_after=config.CAMERA_STALE_AFTER,
+        max_backoff=config.CAMERA_MAX_BACKOFF,
+        history_size=config.SNAPSHOT_BURST_MAX,
+        pool_buffers=None if config.FRAME_POOL else 0,
+        name=name
+    )
+    supervisor.start()
+    return supervisor
+
+def start_cameras() -> CameraRegistry:
+    registry = CameraRegistry(start_camera)
+    for name, device in parse_cameras(config.CAMERAS, config.CAMERA_DEVICE).items():
+        registry.add(name, device)
+    return registry
+
+def start_snapshot_writer() -> SnapshotWriter:
+    writer = SnapshotWriter(config.SNAPSHOT_DIR, quality=config.JPEG_QUALITY)
+    writer.start()
+    return writer
+
+def start_h264():
+    # PyAV is only imported once someone asks for the H.264 stream
+    from src.utils.h264_stream import H264Broadcaster
+    return H264Broadcaster(
+        camera_supervisor.get(),
+        fps=config.CAMERA_FPS,
+        bitrate=config.H264_BITRATE,
+        gop=config.H264_GOP,
+        encoder=config.H264_ENCODER
+    )
+
+def start_detection_writer() -> DetectionWriter:
+    writer = DetectionWriter(db_manager.get())
+    writer.start()
+    return writer
+
+def start_retention() -> RetentionService:
+    policy = RetentionPolicy(
+        db_manager.get(),
+        config.DB_BACKEND,
+        table="sensor_data",
+        keep_days=config.SENSOR_RETENTION_DAYS,
+        partition=config.SENSOR_PARTITIONING,
+        chunk_size=config.RETENTION_CHUNK_SIZE,
+        pause=config.RETENTION_PAUSE
+    )
+    service = RetentionService(policy, interval=config.SENSOR_RETENTION_INTERVAL)
+    # Started even with the database down at boot; each run skips until it is reachable
+    if config.SENSOR_RETENTION_DAYS > 0:
+        service.start()
+    return service
+
+INSERT_SENSOR_DATA = """
+    INSERT IGNORE INTO sensor_data
+    (reading_key, timestamp, analog_value, color_red, color_green, color_blue,
+     temperature, humidity, light_intensity, soil_moisture)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def start_write_buffer() -> WriteBuffer:
+    buffer = WriteBuffer(
+        config.WRITE_BUFFER_PATH,
+        db_manager.get(),
+        batch_size=config.WRITE_BUFFER_BATCH,
+        max_rows=config.WRITE_BUFFER_MAX_ROWS
+    )
+    buffer.start()
+    return buffer
+
+def start_system_sampler() -> SystemSampler:
+    sampler = SystemSampler(
+        interval=config.SYSTEM_SAMPLE_INTERVAL,
+        capacity=config.SYSTEM_HISTORY_SIZE
+    )
+    sampler.start()
+    return sampler
+
+camera_registry = LazyResource("cameras", start_cameras)
+# The default (first) camera, used by the single-camera routes
+camera_supervisor = LazyResource("camera", lambda: camera_registry.camera())
+no_camera_frame = placeholder_frame(config.CAMERA_WIDTH, config.CAMERA_HEIGHT)
+snapshot_writer = LazyResource("snapshots", start_snapshot_writer)
+h264_broadcaster = LazyResource("h264", start_h264)
+system_sampler = LazyResource("system_sampler", start_system_sampler)
+detection_writer = LazyResource("detections", start_detection_writer)
+sensor_retention = LazyResource("retention", start_retention)
+write_buffer = LazyResource("write_buffer", start_write_buffer)
+growth_analytics = LazyResource("growth_analytics", lambda: GrowthAnalytics(
+    db_manager.get(),
+    harvest_fraction=config.HARVEST_FRACTION
+))
+species_info = LazyResource("species_info", lambda: SpeciesInfoService(
+    config.SPECIES_INFO_URL,
+    cache_path=config.SPECIES_CACHE_PATH
+))
+
+# Sensor metrics that are also persisted, mapped to their sensor_data column
+SENSOR_DB_COLUMNS = {
+    "analog_value": "analog_value",
+    "color_red": "color_red",
+    "color_green": "color_green",
+    "color_blue": "color_blue",
+    "temperature_sht": "temperature",
+    "humidity": "humidity",
+    "light_intensity": "light_intensity",
+    "soil_moisture": "soil_moisture"
+}
+
+def load_sensor_history(metric: str, start: float, end: float) -> Tuple[List[float], List[float]]:
+    """Fetch readings older than the in-memory window from sensor_data."""
+    column = SENSOR_DB_COLUMNS.get(metric)
+    if column is None or not db_manager.initialized or not db_manager.pool:
+        return [], []
+    rows = db_manager.execute_query(
+        f"""
+        SELECT UNIX_TIMESTAMP(timestamp), {column} FROM sensor_data
+        WHERE timestamp >= FROM_UNIXTIME(%s) AND timestamp < FROM_UNIXTIME(%s)
+          AND {column} IS NOT NULL
+        ORDER BY timestamp
+        """,
+        (start, end)
+    )
+    if not rows:
+        return [], []
+    return [float(row[0]) for row in rows], [float(row[1]) for row in rows]
+
+sensor_store = RingStore(
+    horizon=config.SENSOR_HISTORY_HOURS * 3600,
+    resolution=config.SENSOR_HISTORY_RESOLUTION,
+    fallback=load_sensor_history
+)
+
+def start_sensors() -> SensorService:
+    service = SensorService(create_bus(config.SENSOR_BUS), rates=config.SENSOR_RATES)
+    service.subscribe(sensor_store.ingest)
+    service.start()
+    return service
+
+sensor_service = LazyResource("sensors", start_sensors)
 
-last_detections = deque(maxlen=5)
 is_feed_paused = False
+# Set while the feed runs; stream generators and the stream server block on it while paused
+feed_active = threading.Event()
+feed_active.set()
 
 # Initialize TFLite interpreter for plant detection
-model_path = os.path.join("data_model", "mobilenet_v2_1.0_224_inat_plant_quant.tflite")
 label_path = os.path.join("data_model", "inat_plant_labels.txt")
 
 # Load labels
@@ -221,36 +671,30 @@ except Exception as e:
     logging.error(f"Failed to load plant detection labels: {e}")
     labels = []
 
-# Load Edge TPU delegate with fallback to CPU
-delegate_paths = [
-    "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1.0",
-    "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1",
-    "/usr/lib/libedgetpu.so.1",
-    "/usr/local/lib/libedgetpu.so.1"
-]
-delegate = None
-for path in delegate_paths:
-    if os.path.exists(path):
-        try:
-            delegate = tflite.load_delegate(path)
-            logging.info(f"Found Edge TPU delegate at {path}")
-            break
-        except Exception as e:
-            logging.warning(f"Failed to load delegate from {path}: {e}")
-if delegate is None:
-    logging.warning("No Edge TPU delegate found; using CPU for inference")
-
-# Load interpreter
-try:
-    interpreter = tflite.Interpreter(
-        model_path=model_path,
-        experimental_delegates=[delegate] if delegate else []
-    )
-    interpreter.allocate_tensors()
-    logging.info("Plant detection model loaded successfully")
-except Exception as e:
-    logging.error(f"Failed to load plant detection model: {e}")
-    interpreter = None
+def create_model_registry():
+    # Deferred so importing the app does not load the TFLite runtime
+    from src.utils.model_registry import ModelRegistry
+    return ModelRegistry(config.MODEL_DIR, cache_path=config.MODEL_CACHE_PATH)
+
+def load_plant_interpreter():
+    """Load the interpreter; the registry picks the fastest working variant/backend (cached on disk)."""
+    if config.INFERENCE_BACKEND == 'stub':
+        stub = StubInterpreter(num_classes=len(labels) or 1000)
+        stub.allocate_tensors()
+        logging.info("Using stub interpreter for plant detection")
+        return stub
+    try:
+        loaded, _ = model_registry.load("plant")
+        if loaded is not None:
+            logging.info("Plant detection model loaded successfully")
+        return loaded
+    except Exception as e:
+        logging.error(f"Failed to load plant detection model: {e}")
+        return None
+
+model_registry = LazyResource("model_registry", create_model_registry)
+# May resolve to None when no model loads, so use interpreter.get() rather than attribute access
+interpreter = LazyResource("inference", load_plant_interpreter)
 
 class TimeLapseController:
     def __init__(self):
@@ -265,14 +709,10 @@ class TimeLapseController:
                     break
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = os.path.join(output_folder, f"timelapse_{timestamp}.jpg")
-            camera = camera_manager.get_camera()
-            if camera:
-                ret, frame = camera.read()
-                if ret and frame is not None:
-                    cv2.imwrite(filename, frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
-                    logging.info(f"Captured time-lapse image {i + 1}/{num_images}: {filename}")
-                else:
-                    logging.warning(f"Failed to capture time-lapse image {i + 1}")
+            snapshot = camera_supervisor.get_frame()
+            if snapshot.frame is not None and not snapshot.stale:
+                cv2.imwrite(filename, snapshot.frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+                logging.info(f"Captured time-lapse image {i + 1}/{num_images}: {filename}")
             else:
                 logging.warning(f"Camera unavailable for time-lapse image {i + 1}")
             time.sleep(interval)
@@ -289,6 +729,7 @@ class TimeLapseController:
             self.thread = threading.Thread(
                 target=self.capture,
                 kwargs={'output_folder': folder, 'interval': interval, 'num_images': num_images},
+                name="time-lapse",
                 daemon=True
             )
             self.thread.start()
@@ -303,29 +744,116 @@ class TimeLapseController:
 
 time_lapse_controller = TimeLapseController()
 
-def generate_frames() -> bytes:
-    camera = camera_manager.get_camera()
-    if not camera:
-        logging.error("Camera unavailable for video feed")
-        return
-    while True:
-        if is_feed_paused:
-            time.sleep(0.1)
-            continue
-        ret, frame = camera.read()
-        if not ret or frame is None:
-            logging.warning("Camera frame read failed")
-            camera_manager.release()  # Release and retry
-            camera = camera_manager.get_camera()
-            if not camera:
-                logging.error("Failed to reinitialize camera for video feed")
-                time.sleep(0.1)
+def create_batch_interpreter():
+    """Separate CPU interpreter for archive jobs; its input is resized to a batch dimension."""
+    if config.INFERENCE_BACKEND == 'stub':
+        return StubInterpreter(num_classes=len(labels) or 1000)
+    import tflite_runtime.interpreter as tflite
+    from src.utils.model_registry import find_variants
+
+    # Edge TPU models are compiled for batch 1, so archive jobs always use the CPU variant
+    variants, _ = find_variants(config.MODEL_DIR, "plant")
+    if "cpu" not in variants:
+        raise FileNotFoundError(f"No CPU plant model in {config.MODEL_DIR}")
+    return tflite.Interpreter(model_path=variants["cpu"], num_threads=config.CLASSIFY_WORKERS)
+
+def create_archive_classifier() -> BatchClassifier:
+    batch_interpreter = create_batch_interpreter()
+    batch_interpreter.allocate_tensors()
+    return BatchClassifier(
+        batch_interpreter, labels,
+        batch_size=config.CLASSIFY_BATCH_SIZE,
+        workers=config.CLASSIFY_WORKERS,
+        top_k=config.CLASSIFY_TOP_K
+    )
+
+archive_classifier = ArchiveClassifier(db_manager, create_archive_classifier)
+
+def stale_overlay(frame: np.ndarray) -> np.ndarray:
+    """Copy the last good frame and mark it as stale while the camera recovers."""
+    frame = frame.copy()
+    cv2.rectangle(frame, (0, 0), (frame.shape[1], 28), (0, 0, 160), -1)
+    cv2.putText(frame, "Camera reconnecting - showing last frame", (8, 20),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    return frame
+
+def encode_snapshot(snapshot) -> Optional[memoryview]:
+    """JPEG-encode a supervisor snapshot, with the placeholder or stale overlay when needed."""
+    if snapshot.frame is None:
+        frame = no_camera_frame
+    elif snapshot.stale:
+        frame = stale_overlay(snapshot.frame)
+    else:
+        frame = snapshot.frame
+    with ENCODE_SECONDS.time():
+        jpeg = encode_jpeg(frame, config.JPEG_QUALITY)
+    if jpeg is None:
+        logging.error("Failed to encode frame")
+    return jpeg
+
+def generate_frames(supervisor=None) -> bytes:
+    if supervisor is None:
+        supervisor = camera_supervisor
+    ACTIVE_STREAMS.inc()
+    sequence = 0
+    try:
+        while True:
+            if not feed_active.is_set():
+                # Block instead of polling; the timeout lets the generator notice a closed client
+                feed_active.wait(timeout=5.0)
+                continue
+            # Never touches the device: the supervisor thread owns capture and recovery
+            snapshot = supervisor.wait_frame(sequence, timeout=1.0)
+            sequence = snapshot.sequence
+            jpeg = encode_snapshot(snapshot)
+            if jpeg is None:
                 continue
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
-        if not ret:
-            logging.error("Failed to encode frame")
-            continue
-        yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+            yield (b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+    finally:
+        ACTIVE_STREAMS.dec()
+
+def start_mjpeg_server() -> Optional[MjpegServer]:
+    server = MjpegServer(
+        camera_supervisor.get(),
+        encode_snapshot,
+        feed_active,
+        host=config.STREAM_HOST,
+        port=config.STREAM_PORT,
+        max_viewers=config.STREAM_MAX_VIEWERS
+    )
+    # Under several worker processes only the first binds; the others stream in-process
+    if not server.start():
+        return None
+    registry = camera_registry.get()
+    registry.subscribe(lambda name, supervisor: update_camera_feed(server, name, supervisor))
+    for name in registry.names():
+        update_camera_feed(server, name, registry.camera(name))
+    return server
+
+def camera_feed_path(name: str) -> str:
+    return f"/cameras/{name}/video_feed"
+
+def update_camera_feed(server: MjpegServer, name: str, supervisor):
+    if supervisor is None:
+        server.remove_feed(camera_feed_path(name))
+    elif camera_feed_path(name) not in server.feeds:
+        server.add_feed(camera_feed_path(name), supervisor)
+
+mjpeg_server = LazyResource("mjpeg_server", start_mjpeg_server)
+
+def stream_server_url(path: Optional[str] = None) -> Optional[str]:
+    if not config.STREAM_SERVER:
+        return None
+    server = mjpeg_server.get()
+    if server is None:
+        return None
+    if config.STREAM_PUBLIC_URL:
+        # The public URL points at the default feed; other cameras are served beside it
+        return config.STREAM_PUBLIC_URL if path is None else config.STREAM_PUBLIC_URL.rsplit(server.path, 1)[0] + path
+    hostname = urlsplit(request.host_url).hostname or "localhost"
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    return f"{request.scheme}://{hostname}:{server.port}{path or server.path}"
 
 @app.route("/")
 def index() -> str:
@@ -335,42 +863,197 @@ def index() -> str:
 def video_feed() -> Response:
     if is_feed_paused:
         return jsonify({"error": "Feed is paused"}), 503
-    if not camera_manager.get_camera():
-        return jsonify({"error": "Camera unavailable"}), 503
+    # Hand viewers to the stream server so they don't hold a request thread for the life of the stream
+    url = stream_server_url()
+    if url:
+        return redirect(url, code=307)
     return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route("/stream_status")
+def stream_status() -> Response:
+    server = mjpeg_server.get() if config.STREAM_SERVER else None
+    return jsonify({
+        "mode": "server" if server else "inline",
+        "inline_viewers": ACTIVE_STREAMS.read(),
+        "server": server.status() if server else None
+    })
+
+@app.route("/video_feed.mp4")
+def video_feed_h264() -> Response:
+    if is_feed_paused:
+        return jsonify({"error": "Feed is paused"}), 503
+    # One shared encoder; each viewer only receives already-encoded fMP4 fragments
+    response = Response(h264_broadcaster.stream(), mimetype='video/mp4')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route("/video_feed_status")
+def video_feed_status() -> Response:
+    return jsonify(h264_broadcaster.status())
+
+def take_snapshot(supervisor, prefix: str = "snapshot"):
+    data = request.get_json(silent=True) or {}
+    try:
+        count = int(data.get('count', request.args.get('count', 1)))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "count must be an integer"}), 400
+    if count < 1:
+        return jsonify({"success": False, "message": "count must be at least 1"}), 400
+    # A burst can only return the frames the supervisor still holds
+    count = min(count, supervisor.history.maxlen or config.SNAPSHOT_BURST_MAX)
+    # Copies of frames the supervisor already captured; no extra camera read
+    frames = supervisor.recent_frames(count)
+    if not frames:
+        return jsonify({"success": False, "message": "No camera frame available"}), 503
+    entries = snapshot_writer.submit(frames, prefix=prefix)
+    if entries is None:
+        return jsonify({"success": False, "message": "Snapshot writer is busy"}), 503
+    return jsonify({
+        "success": True,
+        "stale": any(frame.stale for frame in frames),
+        "snapshots": [{
+            "url": f"/snapshots/{entry['filename']}",
+            "timestamp": entry["timestamp"]
+        } for entry in entries]
+    }), 202
+
+@app.route("/snapshot", methods=["POST"])
+def snapshot():
+    return take_snapshot(camera_supervisor)
+
+@app.route("/cameras")
+def cameras_list() -> Response:
+    return jsonify(camera_registry.status())
+
+@app.route("/cameras", methods=["POST"])
+@admin_required
+def cameras_add():
+    data = request.get_json(silent=True) or {}
+    name = str(data.get('name', '')).strip()
+    try:
+        configured = parse_cameras(config.CAMERAS, config.CAMERA_DEVICE).values()
+        device = check_device(str(data.get('device', '')), configured, allow_sources=config.CAMERA_ALLOW_SOURCES)
+        # Its own capture thread and frame pool; the other cameras' capture and streams are untouched
+        camera_registry.add(name, device)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return jsonify({"success": True, "name": name, "device": device, "video_feed": camera_feed_path(name)}), 201
+
+@app.route("/cameras/<name>", methods=["DELETE"])
+@admin_required
+def cameras_remove(name: str):
+    try:
+        removed = camera_registry.remove(name)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if not removed:
+        return jsonify({"success": False, "message": f"Unknown camera {name}"}), 404
+    return jsonify({"success": True})
+
+@app.route("/cameras/<name>/video_feed")
+def camera_video_feed(name: str) -> Response:
+    supervisor = camera_registry.camera(name)
+    if supervisor is None:
+        return jsonify({"error": f"Unknown camera {name}"}), 404
+    if is_feed_paused:
+        return jsonify({"error": "Feed is paused"}), 503
+    url = stream_server_url(camera_feed_path(name))
+    if url:
+        return redirect(url, code=307)
+    return Response(generate_frames(supervisor), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route("/cameras/<name>/snapshot", methods=["POST"])
+def camera_snapshot(name: str):
+    supervisor = camera_registry.camera(name)
+    if supervisor is None:
+        return jsonify({"success": False, "message": f"Unknown camera {name}"}), 404
+    return take_snapshot(supervisor, prefix=name)
+
+@app.route("/cameras/<name>/inference")
+def camera_inference_data(name: str):
+    return camera_inference(name)
+
+@app.route("/cameras/<name>/status")
+def camera_status_by_name(name: str) -> Response:
+    supervisor = camera_registry.camera(name)
+    if supervisor is None:
+        return jsonify({"error": f"Unknown camera {name}"}), 404
+    return jsonify(supervisor.status())
+
+@app.route("/snapshots/<path:filename>")
+def snapshot_file(filename: str):
+    # Give a just-requested snapshot a moment to reach disk before answering
+    if not snapshot_writer.wait(filename):
+        abort(404)
+    return send_from_directory(os.path.abspath(config.SNAPSHOT_DIR), filename)
+
 @app.route("/sensor_data")
 def sensor_data() -> Response:
+    # Readings come from the polling service; this request never touches the I2C bus
+    readings = sensor_service.snapshot()
     data = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "analog_value": random.randint(0, 1023),
-        "color_red": random.randint(0, 255),
-        "color_green": random.randint(0, 255),
-        "color_blue": random.randint(0, 255),
-        "temperature": random.uniform(10, 30),
-        "humidity": random.uniform(20, 80),
-        "light_intensity": random.uniform(100, 1000),
-        "soil_moisture": random.uniform(0, 100)
+        "analog_value": readings.get("analog_value"),
+        "color_red": readings.get("color_red"),
+        "color_green": readings.get("color_green"),
+        "color_blue": readings.get("color_blue"),
+        "temperature": readings.get("temperature_sht", readings.get("temperature_lps")),
+        "humidity": readings.get("humidity"),
+        "light_intensity": readings.get("light_intensity"),
+        "soil_moisture": readings.get("soil_moisture")
     }
-    if db_manager.pool:
-        result = db_manager.execute_query(
-            """
-            INSERT INTO sensor_data 
-            (timestamp, analog_value, color_red, color_green, color_blue, 
-             temperature, humidity, light_intensity, soil_moisture)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            tuple(data.values()),
-            commit=True
-        )
-        if result is None:
-            logging.warning("Failed to store sensor data")
-    return jsonify(data)
+    # Stored locally and forwarded in batches, so a slow or unreachable database never delays this response
+    write_buffer.append(INSERT_SENSOR_DATA, (uuid.uuid4().hex,) + tuple(data.values()))
+    system = system_sampler.latest()
+    return jsonify({
+        **readings,
+        **data,
+        "cpu_usage": system["cpu_usage"],
+        "ram_usage": system["ram_usage"],
+        "storage_usage": system["storage_usage"],
+        "cpu_temperature": system["temperature"],
+        "ip_address": system.get("ip_address", "N/A")
+    })
+
+@app.route("/sensor_status")
+def sensor_status() -> Response:
+    return jsonify(sensor_service.stats())
+
+@app.route("/sensor_history")
+def sensor_history() -> Response:
+    requested = request.args.get("metric")
+    metrics = requested.split(",") if requested else sensor_store.metrics()
+    last = request.args.get("last", type=int)
+    seconds = request.args.get("seconds", default=3600, type=float)
+    points = request.args.get("points", default=300, type=int)
+    end = time.time()
+    start = end - seconds
+    history = {}
+    for metric in metrics:
+        # One window read per metric, so an older range hits the MariaDB fallback only once
+        window_ts, window_values = sensor_store.window(metric, start, end)
+        if last:
+            timestamps, values = sensor_store.last_n(metric, last)
+        else:
+            timestamps, values = bucket_means(window_ts, window_values, start, end, points)
+        history[metric] = {
+            "timestamp": timestamps.tolist(),
+            "value": values.tolist(),
+            "stats": window_stats(window_values)
+        }
+    return jsonify(history)
+
+@app.route("/system_history")
+def system_history() -> Response:
+    seconds = request.args.get("seconds", type=float)
+    points = request.args.get("points", default=300, type=int)
+    return jsonify(system_sampler.history(seconds=seconds, max_points=points))
 
 @app.route("/pause_feed", methods=["POST"])
 def pause_feed():
     global is_feed_paused
     is_feed_paused = True
+    feed_active.clear()
     logging.info("Live feed paused")
     return jsonify({"success": True, "message": "Live feed paused"}), 200
 
@@ -378,6 +1061,7 @@ def pause_feed():
 def resume_feed():
     global is_feed_paused
     is_feed_paused = False
+    feed_active.set()
     logging.info("Live feed resumed")
     return jsonify({"success": True, "message": "Live feed resumed"}), 200
 
@@ -394,6 +1078,18 @@ def stop_time_lapse():
     success, message = time_lapse_controller.stop()
     return jsonify({"success": success, "message": message}), 200 if success else 400
 
+@app.route("/classify_time_lapse", methods=["POST"])
+def classify_time_lapse():
+    if not labels:
+        return jsonify({"success": False, "message": "Labels not loaded"}), 409
+    data = request.get_json(silent=True) or {}
+    success, message = archive_classifier.start(config.TIME_LAPSE_FOLDER, reclassify=bool(data.get('reclassify')))
+    return jsonify({"success": success, "message": message}), 202 if success else 409
+
+@app.route("/classify_time_lapse/status")
+def classify_time_lapse_status():
+    return jsonify(archive_classifier.status())
+
 @app.route("/growth_graph")
 def growth_graph():
     try:
@@ -410,19 +1106,22 @@ def growth_graph():
             data.setdefault(plant_name, {"time": [], "height": []})
             data[plant_name]["time"].append(time)
             data[plant_name]["height"].append(float(height))
-        plt.figure(figsize=(10, 6))
-        for plant_name, values in data.items():
-            plt.plot(values["time"], values["height"], label=plant_name, marker='o')
-        plt.title("Plant Growth Over Time")
-        plt.xlabel("Time (Days)")
-        plt.ylabel("Height (cm)")
-        plt.legend()
-        plt.grid(True)
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        image_base64 = base64.b64encode(buf.read()).decode("utf-8")
-        plt.close()
+        with RENDER_SECONDS.time():
+            import matplotlib.pyplot as plt
+
+            plt.figure(figsize=(10, 6))
+            for plant_name, values in data.items():
+                plt.plot(values["time"], values["height"], label=plant_name, marker='o')
+            plt.title("Plant Growth Over Time")
+            plt.xlabel("Time (Days)")
+            plt.ylabel("Height (cm)")
+            plt.legend()
+            plt.grid(True)
+            buf = io.BytesIO()
+            plt.savefig(buf, format="png")
+            buf.seek(0)
+            image_base64 = base64.b64encode(buf.read()).decode("utf-8")
+            plt.close()
         return jsonify({"image": image_base64})
     except Exception as e:
         logging.error(f"Graph generation error: {e}")
@@ -443,121 +1142,417 @@ def growth_rate():
             "plant_name": row[3]
         } for row in result]
         return jsonify(data)
-    except mariadb.Error as e:
+    except DB_ERRORS as e:
         logging.error(f"Database error: {e}")
         return jsonify([]), 500
 
 @app.route("/seasonal_status")
 def seasonal_status():
-    try:
-        result = db_manager.execute_query("""
-            SELECT gr.time_after_planting, p.name AS plant_name
-            FROM growth_rate gr
-            JOIN plants p ON gr.plant_id = p.id
-        """)
-        seasonal_status_data = []
-        for time_after_planting, plant_name in result:
-            start_date = (datetime.now() - timedelta(days=time_after_planting)).strftime("%Y-%m-%d")
-            current_stage = ("Early Growth" if time_after_planting < 30 else
-                            "Mid Growth" if time_after_planting < 60 else
-                            "Late Growth")
-            seasonal_status_data.append({
-                "plant_name": plant_name,
-                "start_date": start_date,
-                "current_stage": current_stage
-            })
-        return jsonify(seasonal_status_data)
-    except mariadb.Error as e:
-        logging.error(f"Database error: {e}")
+    # One entry per plant; the stage comes from the plant's fitted growth curve
+    plants = growth_analytics.refresh()
+    if plants is None:
         return jsonify([]), 500
+    return jsonify([{
+        "plant_name": plant["plant_name"],
+        "start_date": plant["start_date"],
+        "current_stage": plant["current_stage"],
+        "fraction_of_capacity": plant.get("fraction_of_capacity")
+    } for plant in plants])
 
 @app.route("/harvest_scheduler")
 def harvest_scheduler():
+    plants = growth_analytics.refresh()
+    if plants is None:
+        return jsonify([]), 500
+    return jsonify([{
+        "plant_name": plant["plant_name"],
+        "predicted_harvest_date": plant["predicted_harvest_date"],
+        "days_to_harvest": plant["days_to_harvest"]
+    } for plant in plants])
+
+@app.route("/growth_analytics")
+def growth_analytics_endpoint():
+    plants = growth_analytics.refresh()
+    if plants is None:
+        return jsonify({"error": "Growth data unavailable"}), 500
+    return jsonify(plants)
+
+def parse_time_arg(value: Optional[str]) -> Optional[datetime]:
+    """Accept Unix seconds or an ISO 8601 date/datetime."""
+    if not value:
+        return None
     try:
-        result = db_manager.execute_query("""
-            SELECT gr.time_after_planting, p.name AS plant_name
-            FROM growth_rate gr
-            JOIN plants p ON gr.plant_id = p.id
-        """)
-        harvest_scheduler_data = []
-        for time_after_planting, plant_name in result:
-            planting_date = datetime.now() - timedelta(days=time_after_planting)
-            predicted_harvest_date = planting_date + timedelta(days=90)
-            harvest_scheduler_data.append({
-                "plant_name": plant_name,
-                "predicted_harvest_date": predicted_harvest_date.strftime("%Y-%m-%d")
+        return datetime.fromtimestamp(float(value))
+    except (ValueError, OverflowError, OSError):
+        # inf, nan and out-of-range seconds fall through and fail ISO parsing too
+        return datetime.fromisoformat(value)
+
+export_slots = threading.BoundedSemaphore(max(1, config.EXPORT_MAX_CONCURRENT))
+
+def export_response(name: str, columns: List[str], query: str, params: tuple) -> Response:
+    fmt = request.args.get('format', 'csv')
+    if fmt not in export.FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(export.FORMATS)}"}), 400
+    if not db_manager.pool:
+        return jsonify({"error": "Database unavailable"}), 503
+    # Streaming exports must not drain the pool the dashboard's own queries need
+    if not export_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many exports running, try again shortly"}), 503
+    compress = request.args.get('gzip', '0').lower() in ('1', 'true', 'yes')
+    mimetype, extension = export.FORMATS[fmt]
+    filename = f"{name}.{extension}" + (".gz" if compress else "")
+
+    def generate():
+        try:
+            yield from export.encode(columns, db_manager.stream_query(query, params), fmt, compress)
+        except DB_ERRORS as e:
+            # Headers are already sent; the truncated body is the only signal left
+            DB_QUERY_ERRORS.inc()
+            logging.error(f"Export of {name} failed mid-stream: {e}")
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/gzip' if compress else mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+    # Called once the body is sent or the client goes away, even if streaming never started
+    response.call_on_close(export_slots.release)
+    return response
+
+@app.route("/export/sensor_data")
+def export_sensor_data():
+    try:
+        start = parse_time_arg(request.args.get('start'))
+        end = parse_time_arg(request.args.get('end'))
+    except (ValueError, OverflowError, OSError):
+        return jsonify({"error": "start and end must be Unix seconds or ISO 8601"}), 400
+    columns = ["timestamp", "analog_value", "color_red", "color_green", "color_blue",
+               "temperature", "humidity", "light_intensity", "soil_moisture"]
+    conditions, params = [], []
+    if start:
+        conditions.append("timestamp >= %s")
+        params.append(start.strftime("%Y-%m-%d %H:%M:%S"))
+    if end:
+        conditions.append("timestamp < %s")
+        params.append(end.strftime("%Y-%m-%d %H:%M:%S"))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"SELECT {', '.join(columns)} FROM sensor_data {where} ORDER BY timestamp"
+    return export_response("sensor_data", columns, query, tuple(params))
+
+@app.route("/export/growth_rate")
+def export_growth_rate():
+    # growth_rate has no timestamp; the range is on days after planting
+    min_days = request.args.get('min_days', type=int)
+    max_days = request.args.get('max_days', type=int)
+    plant = request.args.get('plant')
+    conditions, params = [], []
+    if min_days is not None:
+        conditions.append("gr.time_after_planting >= %s")
+        params.append(min_days)
+    if max_days is not None:
+        conditions.append("gr.time_after_planting <= %s")
+        params.append(max_days)
+    if plant:
+        conditions.append("p.name = %s")
+        params.append(plant)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT p.name, gr.plant_id, gr.time_after_planting, gr.height, gr.rate
+        FROM growth_rate gr
+        JOIN plants p ON gr.plant_id = p.id
+        {where}
+        ORDER BY gr.plant_id, gr.time_after_planting
+    """
+    columns = ["plant_name", "plant_id", "time_after_planting", "height", "rate"]
+    return export_response("growth_rate", columns, query, tuple(params))
+
+def classify_frame(camera: str, snapshot) -> List[Dict]:
+    """Classify one frame; runs on the inference scheduler's thread, so the interpreter is never shared."""
+    plant_interpreter = interpreter.get()
+    if plant_interpreter is None or not labels:
+        raise RuntimeError("Inference model or labels not loaded")
+
+    # Resize frame to model input size (224x224 for MobileNet)
+    with PREPROCESS_SECONDS.time():
+        img = model_input(snapshot.frame, 224, 224)
+
+    # Run inference
+    with INVOKE_SECONDS.time():
+        plant_interpreter.set_tensor(plant_interpreter.get_input_details()[0]['index'], img)
+        plant_interpreter.invoke()
+    output_details = plant_interpreter.get_output_details()
+    probabilities = plant_interpreter.get_tensor(output_details[0]['index'])[0]
+    scale, zero_point = output_details[0].get('quantization', (0.0, 0))
+    if scale:
+        # Quantized models return raw uint8 scores; the threshold below is a probability
+        probabilities = (probabilities.astype(np.float32) - zero_point) * scale
+
+    # Format detections
+    results = []
+    records = []
+    detected_at = time.time()
+    score_threshold = 0.3
+    for i, score in enumerate(probabilities):
+        if score > score_threshold and i < len(labels):
+            results.append({
+                "category": "plant",
+                "label": labels[i],
+                "confidence": float(score * 100)  # Convert to percentage
             })
-        return jsonify(harvest_scheduler_data)
-    except mariadb.Error as e:
-        logging.error(f"Database error: {e}")
-        return jsonify([]), 500
+            records.append(Detection(detected_at, "plant", i, labels[i], float(score * 100)))
+
+    # Persist in the background
+    detection_writer.submit(records)
+    # Resolve species info now so the dashboard's lookup is a cache hit
+    species_info.prefetch(result["label"] for result in results)
+    return results
+
+def start_inference_scheduler() -> InferenceScheduler:
+    scheduler = InferenceScheduler(camera_registry.get(), classify_frame, budget=config.INFERENCE_CPU_BUDGET)
+    scheduler.start()
+    return scheduler
+
+inference_scheduler = LazyResource("inference_scheduler", start_inference_scheduler)
+
+def camera_inference(name: str):
+    if interpreter.get() is None or not labels:
+        return jsonify({"error": "Inference model or labels not loaded"}), 500
+    supervisor = camera_registry.camera(name)
+    if supervisor is None:
+        return jsonify({"error": f"Unknown camera {name}"}), 404
+
+    snapshot = supervisor.get_frame()
+    if snapshot.frame is None:
+        return jsonify({"error": "Camera unavailable"}), 503
+    if snapshot.stale:
+        # The supervisor is recovering the device; don't re-classify an old frame or wait for a new one
+        return jsonify(inference_scheduler.latest(name)), 200
+    # Queued behind the other cameras' turns; concurrent requests for this camera share one run
+    detections, error, _ = inference_scheduler.request(name)
+    if error:
+        return jsonify({"error": "Failed to perform inference"}), 500
+    return jsonify(detections), 200
 
 @app.route("/inference_data")
 def inference_data():
-    if interpreter is None or not labels:
-        return jsonify({"error": "Inference model or labels not loaded"}), 500
+    return camera_inference(camera_registry.default_name)
 
-    for attempt in range(3):  # Retry up to 3 times
-        try:
-            camera = camera_manager.get_camera()
-            if not camera:
-                logging.warning(f"Camera unavailable on attempt {attempt + 1}")
-                time.sleep(0.5)
-                continue
-            ret, frame = camera.read()
-            if not ret or frame is None:
-                logging.warning(f"Failed to capture camera frame on attempt {attempt + 1}")
-                camera_manager.release()
-                time.sleep(0.5)
-                continue
+@app.route("/inference_status")
+def inference_status() -> Response:
+    return jsonify(inference_scheduler.status())
+
+@app.route("/detections/summary")
+def detections_summary() -> Response:
+    period = request.args.get('period', 'hour')
+    if period not in ('hour', 'day'):
+        return jsonify({"error": "period must be hour or day"}), 400
+    end = request.args.get('end', type=float)
+    start = request.args.get('start', type=float)
+    if start is None:
+        days = request.args.get('days', 7, type=float)
+        start = (end or time.time()) - days * 86400
+    rows = summarize(db_manager, period, start, end,
+                     category=request.args.get('category'), label=request.args.get('label'))
+    if rows is None:
+        return jsonify({"error": "Database unavailable"}), 503
+    return jsonify({"period": period, "start": start, "end": end, "rows": rows})
 
-            # Resize frame to model input size (224x224 for MobileNet)
-            img = cv2.resize(frame, (224, 224))
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            img = np.expand_dims(img, axis=0).astype(np.uint8)
-
-            # Run inference
-            interpreter.set_tensor(interpreter.get_input_details()[0]['index'], img)
-            interpreter.invoke()
-            output_details = interpreter.get_output_details()
-            probabilities = interpreter.get_tensor(output_details[0]['index'])[0]
-
-            # Format detections
-            results = []
-            score_threshold = 0.3
-            for i, score in enumerate(probabilities):
-                if score > score_threshold and i < len(labels):
-                    results.append({
-                        "category": "plant",
-                        "label": labels[i],
-                        "confidence": float(score * 100)  # Convert to percentage
-                    })
-
-            # Store in last_detections
-            last_detections.extend(results)
-            return jsonify(list(last_detections)), 200
-        except Exception as e:
-            logging.error(f"Inference error on attempt {attempt + 1}: {e}")
-            camera_manager.release()
-            time.sleep(0.5)
-    return jsonify({"error": "Failed to perform inference after retries"}), 500
+@app.route("/species_info")
+def species_info_lookup() -> Response:
+    label = request.args.get('label', '').strip()
+    if not label:
+        return jsonify({"error": "label is required"}), 400
+    response = jsonify(species_info.lookup(label))
+    # Species pages rarely change; let the browser reuse the answer too
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+@app.route("/species_info/prefetch", methods=["POST"])
+@admin_required
+def species_info_prefetch() -> Response:
+    data = request.get_json(silent=True) or {}
+    labels_to_fetch = data.get('labels')
+    if not labels_to_fetch:
+        # Default to the most frequently detected species of the past week
+        rows = summarize(db_manager, 'day', time.time() - 7 * 86400) or []
+        totals = {}
+        for row in rows:
+            totals[row["label"]] = totals.get(row["label"], 0) + row["count"]
+        labels_to_fetch = sorted(totals, key=totals.get, reverse=True)[:config.SPECIES_PREFETCH_TOP]
+    queued = species_info.prefetch(labels_to_fetch)
+    return jsonify({"success": True, "requested": len(labels_to_fetch), "queued": queued}), 202
+
+@app.route("/species_info/status")
+def species_info_status() -> Response:
+    return jsonify(species_info.stats())
+
+@app.route("/camera_status")
+def camera_status() -> Response:
+    return jsonify(camera_supervisor.status())
+
+@app.route("/model_status")
+def model_status() -> Response:
+    return jsonify(model_registry.status())
+
+@app.route("/retention_status")
+def retention_status() -> Response:
+    return jsonify(sensor_retention.status())
+
+@app.route("/retention/run", methods=["POST"])
+@admin_required
+def retention_run():
+    if not db_manager.pool:
+        return jsonify({"success": False, "message": "Database not available"}), 503
+    if config.SENSOR_RETENTION_DAYS <= 0:
+        return jsonify({"success": False, "message": "Retention is disabled (SENSOR_RETENTION_DAYS=0)"}), 409
+    if not sensor_retention.trigger():
+        return jsonify({"success": False, "message": "A retention run is already in progress"}), 409
+    return jsonify({"success": True, "message": "Retention run started"}), 202
+
+@app.route("/write_buffer_status")
+def write_buffer_status() -> Response:
+    return jsonify(write_buffer.stats())
+
+@app.route("/log_status")
+def log_status() -> Response:
+    return jsonify(log_pipeline.stats())
+
+profiler = LazyResource("profiler", lambda: SamplingProfiler(
+    config.PROFILE_DIR, interval=config.PROFILE_INTERVAL, max_seconds=config.PROFILE_MAX_SECONDS
+))
+
+@app.before_request
+def profile_request():
+    # A single header lookup on every request; the profiler only runs when an admin asks for it
+    mode = request.headers.get('X-Profile')
+    if mode is None:
+        return None
+    if not is_admin():
+        return jsonify({"error": "Admin token required to profile requests"}), 403
+    g.profile_id = profiler.start(
+        config.PROFILE_MAX_SECONDS,
+        threads={threading.get_ident()},
+        mode=mode if mode in SamplingProfiler.MODES else "wall",
+        label=f"{request.method} {request.path}"
+    )
+    return None
+
+@app.after_request
+def attach_profile(response: Response) -> Response:
+    profile_id = g.pop('profile_id', None)
+    if profile_id:
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = f"/admin/profile/{profile_id}"
+        # Stop once the body is sent, so streamed responses (generate_frames) are covered too
+        response.call_on_close(lambda: profiler.stop(profile_id))
+    return response
+
+@app.route("/admin/profile", methods=["POST"])
+@admin_required
+def profile_start():
+    data = request.get_json(silent=True) or {}
+    try:
+        profile_id = profiler.start(float(data.get('seconds', 10)), mode=data.get('mode', 'cpu'))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    if profile_id is None:
+        return jsonify({"success": False, "message": "Too many profiles running"}), 409
+    return jsonify({"success": True, "id": profile_id, "url": f"/admin/profile/{profile_id}"}), 202
+
+@app.route("/admin/profile")
+@admin_required
+def profile_status() -> Response:
+    return jsonify(profiler.status())
+
+@app.route("/admin/profile/<profile_id>")
+@admin_required
+def profile_download(profile_id: str):
+    path = profiler.path(profile_id)
+    if path is None:
+        if any(session["id"] == profile_id for session in profiler.status()["active"]):
+            return jsonify({"error": "Profile is still running"}), 409
+        abort(404)
+    return send_from_directory(os.path.abspath(config.PROFILE_DIR), os.path.basename(path),
+                               mimetype="text/plain", as_attachment=True)
+
+@app.route("/admin/profile/<profile_id>", methods=["DELETE"])
+@admin_required
+def profile_stop(profile_id: str):
+    info = profiler.stop(profile_id)
+    if info is None:
+        return jsonify({"success": False, "message": "No such running profile"}), 404
+    return jsonify({"success": True, "profile": info, "url": f"/admin/profile/{profile_id}"})
+
+@app.route("/db_status")
+def db_status() -> Response:
+    if not db_manager.initialized:
+        return jsonify({"available": False, "initialized": False})
+    return jsonify(db_manager.stats())
+
+@app.route("/metrics")
+def metrics_endpoint() -> Response:
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/health")
 def health_check():
     status = {
         "database": bool(db_manager.pool),
-        "camera": bool(camera_manager.get_camera()),
-        "inference": interpreter is not None and bool(labels),
+        "camera": camera_supervisor.is_healthy(),
+        "inference": interpreter.get() is not None and bool(labels),
         "worker": True,
         "timestamp": datetime.now().isoformat()
     }
     return jsonify(status), 200 if all([status["database"], status["camera"], status["inference"], status["worker"]]) else 503
 
+@app.route("/startup_status")
+def startup_status() -> Response:
+    return jsonify(startup.report())
+
+startup.record("module", time.perf_counter() - startup.started)
+warm_up_thread = None
+
+def create_app(warm: Optional[bool] = None) -> Flask:
+    """
+    Return the configured app; use `gunicorn 'app:create_app()'` or call it before app.run().
+
+    Importing this module builds nothing heavy. Every subsystem starts on first
+    use, and unless disabled (STARTUP_WARMUP=0) they are also started here in
+    parallel on background threads so the first requests don't pay for them.
+    The per-subsystem timing is logged once warm-up completes.
+    """
+    global warm_up_thread
+    if (config.STARTUP_WARMUP if warm is None else warm) and warm_up_thread is None:
+        warm_up_thread = warm_up(
+            [db_manager, camera_registry, interpreter, inference_scheduler, sensor_service, system_sampler, sensor_retention,
+             write_buffer] + ([mjpeg_server] if config.STREAM_SERVER else []),
+            on_done=startup.log_report
+        )
+    return app
+
+def shutdown():
+    # Only stop what was actually started; touching a LazyResource here would build it
+    if mjpeg_server.initialized and mjpeg_server.get() is not None:
+        mjpeg_server.get().stop()
+    for resource in (inference_scheduler, sensor_service, system_sampler, h264_broadcaster, snapshot_writer,
+                     detection_writer, sensor_retention, write_buffer, camera_registry):
+        if resource.initialized:
+            resource.stop()
+    if write_buffer.initialized:
+        write_buffer.close()
+    archive_classifier.stop()
+    if profiler.initialized:
+        profiler.stop_all()
+    if species_info.initialized:
+        species_info.close()
+    if db_manager.initialized and db_manager.pool:
+        db_manager.pool.close()
+
 if __name__ == "__main__":
     try:
-        app.run(host="0.0.0.0", port=5000, threaded=True)
+        create_app().run(host="0.0.0.0", port=5000, threaded=True)
     except KeyboardInterrupt:
         logging.info("Shutting down...")
     finally:
-        camera_manager.release()
-        logging.info("Application stopped")
\ No newline at end of file
+        shutdown()
+        logging.info("Application stopped")
+        log_pipeline.stop()
\ No newline at end of file
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Per-frame memory allocated by capture, motion detection, preprocessing and
+encoding, with and without the frame buffer pool, measured with tracemalloc.
+
+  before  camera.read() with no buffer, resize/cvtColor/astype, imencode().tobytes()
+  after   FramePool capture buffers, scratch buffers (model_input) and encode_jpeg()
+
+For each stage, tracemalloc traces are cleared, the stage runs on one frame,
+and the traced peak is recorded. That peak is the memory the stage
+allocated for that frame. NumPy and OpenCV output arrays are both traced.
+A second pass without tracing times the stages.
+
+Usage:
+    python benchmarks/frame_allocations.py
+    python benchmarks/frame_allocations.py --camera synthetic@0 --frames 300 --output allocations.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import cv2
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from src.utils.camera import open_capture
+from src.utils.frame_pool import FramePool, encode_jpeg, model_input, scratch
+
+STAGES = ["capture", "motion", "preprocess", "encode"]
+
+class Before:
+    """The allocating path the app used before the pool."""
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=16, detectShadows=False)
+
+    def capture(self, camera, history):
+        _, frame = camera.read()
+        history.append(frame)
+        return frame
+
+    def motion(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        fgmask = self.fgbg.apply(small)
+        _, fgmask = cv2.threshold(fgmask, 127, 255, cv2.THRESH_BINARY)
+        return fgmask
+
+    def preprocess(self, frame):
+        img = cv2.resize(frame, (224, 224))
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        return np.expand_dims(img, axis=0).astype(np.uint8)
+
+    def encode(self, frame, quality):
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return buffer.tobytes()
+
+class After(Before):
+    """The pooled path: what CameraSupervisor, ObjectDetector and the app now do."""
+
+    def __init__(self, scale: float, history_size: int):
+        super().__init__(scale)
+        self.pool = FramePool(history_size + 8)
+        self.shape = None
+
+    def capture(self, camera, history):
+        buffer = self.pool.acquire(self.shape) if self.shape else None
+        _, frame = camera.read(buffer)
+        buffer = None
+        self.shape = frame.shape
+        history.append(frame)
+        return frame
+
+    def motion(self, frame):
+        height, width = round(frame.shape[0] * self.scale), round(frame.shape[1] * self.scale)
+        small = cv2.resize(frame, None, dst=scratch("motion_small", (height, width, 3)),
+                           fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        fgmask = self.fgbg.apply(small, fgmask=scratch("motion_mask", small.shape[:2]))
+        cv2.threshold(fgmask, 127, 255, cv2.THRESH_BINARY, dst=fgmask)
+        return fgmask
+
+    def preprocess(self, frame):
+        return model_input(frame, 224, 224)
+
+    def encode(self, frame, quality):
+        return encode_jpeg(frame, quality)
+
+def run_pipeline(path, camera, frames: int, quality: int, history_size: int, traced: bool) -> dict:
+    # Published frames stay referenced for a while, like the supervisor's snapshot history
+    history = deque(maxlen=history_size)
+    samples = {stage: [] for stage in STAGES}
+    for _ in range(frames):
+        frame = None
+        for stage in STAGES:
+            if traced:
+                tracemalloc.clear_traces()
+            else:
+                started = time.perf_counter()
+            if stage == "capture":
+                frame = path.capture(camera, history)
+            elif stage == "motion":
+                path.motion(frame)
+            elif stage == "preprocess":
+                path.preprocess(frame)
+            else:
+                path.encode(frame, quality)
+            samples[stage].append(tracemalloc.get_traced_memory()[1] if traced else time.perf_counter() - started)
+    return samples
+
+def summarize(samples: dict, traced: bool, warmup: int) -> dict:
+    results = {}
+    for stage, values in samples.items():
+        values = np.asarray(values[warmup:], dtype=np.float64)
+        if traced:
+            results[stage] = {"mean_kib": round(float(values.mean()) / 1024, 1),
+                              "max_kib": round(float(values.max()) / 1024, 1)}
+        else:
+            results[stage] = {"mean_ms": round(float(values.mean()) * 1000, 3)}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="synthetic@0", help="Camera source: synthetic[@fps], replay:<dir>[@fps] or gst:...")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20, help="Frames excluded while buffers are first allocated")
+    parser.add_argument("--scale", type=float, default=0.5, help="Motion analysis scale")
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--history", type=int, default=10, help="Frames kept referenced after capture")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "camera": args.camera,
+            "resolution": f"{args.width}x{args.height}",
+            "frames": args.frames,
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "results": {},
+    }
+    for name in ("before", "after"):
+        result = {}
+        for traced in (True, False):
+            camera = open_capture(args.camera, args.width, args.height)
+            path = Before(args.scale) if name == "before" else After(args.scale, args.history)
+            if traced:
+                tracemalloc.start()
+            samples = run_pipeline(path, camera, args.frames, args.quality, args.history, traced)
+            if traced:
+                tracemalloc.stop()
+            camera.release()
+            result["allocated" if traced else "time"] = summarize(samples, traced, args.warmup)
+        result["allocated_per_frame_kib"] = round(sum(stage["mean_kib"] for stage in result["allocated"].values()), 1)
+        report["results"][name] = result
+        print(f"{name:>6}: " + " ".join(f"{stage}={values['mean_kib']}KiB" for stage, values in result["allocated"].items())
+              + f" total={result['allocated_per_frame_kib']}KiB/frame", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
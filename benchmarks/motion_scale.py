@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Per-frame cost and detection agreement of ObjectDetector motion boxes at
+reduced analysis resolutions.
+
+Every detector sees the same frames. Boxes from the full-resolution detector
+are the reference; a reference box counts as found when a box from the
+scaled detector overlaps it with IoU >= --iou.
+
+Usage:
+    python benchmarks/motion_scale.py
+    python benchmarks/motion_scale.py --camera replay:./media/time_lapse --scales 1,0.5,0.25 --stride 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+def iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = min(ax + aw, bx + bw) - max(ax, bx)
+    h = min(ay + ah, by + bh) - max(ay, by)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / float(aw * ah + bw * bh - inter)
+
+def agreement(reference, boxes, threshold: float):
+    """Return (matched reference boxes, matched candidate boxes, IoUs of reference boxes)."""
+    ious = [max((iou(ref, box) for box in boxes), default=0.0) for ref in reference]
+    matched_candidates = sum(1 for box in boxes if any(iou(ref, box) >= threshold for ref in reference))
+    return sum(1 for value in ious if value >= threshold), matched_candidates, ious
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="synthetic@0",
+                        help="Camera source: synthetic[@fps] or replay:<dir-or-video>[@fps]")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30, help="Frames fed before measuring (MOG2 learning)")
+    parser.add_argument("--scales", default="1,0.5,0.25")
+    parser.add_argument("--stride", type=int, default=1, help="Frame stride for the scaled detectors")
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    from src.models.object_detection import ObjectDetector
+    from src.utils.camera import open_capture
+
+    scales = [float(value) for value in args.scales.split(",")]
+    reference = ObjectDetector(analysis_scale=1.0)
+    detectors = {scale: ObjectDetector(analysis_scale=scale, frame_stride=args.stride) for scale in scales}
+    camera = open_capture(args.camera, args.width, args.height)
+
+    timings = {scale: [] for scale in scales}
+    totals = {scale: {"reference": 0, "found": 0, "boxes": 0, "precise": 0, "ious": []} for scale in scales}
+    for index in range(args.warmup + args.frames):
+        ok, frame = camera.read()
+        if not ok or frame is None:
+            break
+        expected = reference.detect_motion(frame)
+        for scale, detector in detectors.items():
+            start = time.perf_counter()
+            boxes = detector.detect_motion(frame)
+            elapsed = time.perf_counter() - start
+            if index < args.warmup:
+                continue
+            timings[scale].append(elapsed)
+            found, precise, ious = agreement(expected, boxes, args.iou)
+            total = totals[scale]
+            total["reference"] += len(expected)
+            total["found"] += found
+            total["boxes"] += len(boxes)
+            total["precise"] += precise
+            total["ious"].extend(ious)
+    camera.release()
+
+    results = {}
+    for scale in scales:
+        values = np.asarray(timings[scale]) * 1000
+        total = totals[scale]
+        results[f"{scale:g}x"] = {
+            "frames": int(len(values)),
+            "mean_ms": round(float(values.mean()), 3) if len(values) else None,
+            "p90_ms": round(float(np.percentile(values, 90)), 3) if len(values) else None,
+            "recall": round(total["found"] / total["reference"], 3) if total["reference"] else None,
+            "precision": round(total["precise"] / total["boxes"], 3) if total["boxes"] else None,
+            "mean_iou": round(float(np.mean(total["ious"])), 3) if total["ious"] else None,
+        }
+    report = {
+        "meta": {"camera": args.camera, "width": args.width, "height": args.height,
+                 "stride": args.stride, "iou_threshold": args.iou},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
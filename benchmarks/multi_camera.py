@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Whether adding cameras degrades the streams and inference of the cameras already running.
+
+The app starts with one synthetic camera. Cameras are then added through
+POST /cameras in steps. Each camera gets --viewers stream viewers and one
+client polling its inference endpoint in a loop. At each step the report
+records the first camera's viewer frame rate and inference latency, and
+every camera's inference runs, so both the impact on existing cameras and
+the scheduler's fairness are visible.
+
+Usage:
+    python benchmarks/multi_camera.py
+    python benchmarks/multi_camera.py --cameras 1,2,4 --budget 0.5 --output multi_camera.json
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from stream_load import ViewerReader, configure_environment, open_viewer, serve
+
+ADMIN_TOKEN = "benchmark"
+
+class InferencePoller:
+    """Request one camera's inference endpoint back to back and record latencies."""
+
+    def __init__(self, port: int, name: str, timeout: float):
+        self.path = f"/cameras/{name}/inference"
+        self.port = port
+        self.timeout = timeout
+        self.samples = []
+        self.errors = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"poll-{name}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=self.timeout)
+            try:
+                conn.request("GET", self.path)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    self.samples.append(time.perf_counter() - started)
+                else:
+                    self.errors += 1
+            except OSError:
+                self.errors += 1
+            finally:
+                conn.close()
+
+def latency(samples) -> dict:
+    values = np.array(samples) * 1000
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 2) if samples else None,
+        "p95_ms": round(float(np.percentile(values, 95)), 2) if samples else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="synthetic@15", help="Source for every camera: synthetic[@fps] or replay:<dir>[@fps]")
+    parser.add_argument("--cameras", default="1,2,3,4", help="Comma-separated camera counts, in increasing order")
+    parser.add_argument("--viewers", type=int, default=2, help="Stream viewers per camera")
+    parser.add_argument("--budget", type=float, default=0.5, help="INFERENCE_CPU_BUDGET")
+    parser.add_argument("--workers", type=int, default=16, help="Request threads, like gunicorn --threads")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per step")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait after adding cameras")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gardenhub-cameras-")
+    configure_environment(args, "server", workdir)
+    # Cameras added at runtime must reuse a configured device unless CAMERA_ALLOW_SOURCES is set
+    os.environ.update({"CAMERAS": f"cam0={args.camera}", "INFERENCE_CPU_BUDGET": str(args.budget),
+                       "ADMIN_TOKEN": ADMIN_TOKEN})
+    import psutil
+    import app as app_module
+
+    app_module.create_app(warm=True)
+    app_module.warm_up_thread.join()
+    server = serve(app_module.app, args.workers)
+    port = server.server_address[1]
+    process = psutil.Process()
+    readers, pollers, steps = {}, {}, []
+    for target in [int(n) for n in args.cameras.split(",")]:
+        while len(readers) < target:
+            name = f"cam{len(readers)}"
+            if name != "cam0":
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=args.timeout)
+                conn.request("POST", "/cameras", body=json.dumps({"name": name, "device": args.camera}),
+                             headers={"Content-Type": "application/json", "X-Admin-Token": ADMIN_TOKEN})
+                conn.getresponse().read()
+                conn.close()
+            readers[name] = ViewerReader()
+            for _ in range(args.viewers):
+                sock = open_viewer(port, timeout=args.timeout, path=f"/cameras/{name}/video_feed")
+                if sock is not None:
+                    readers[name].add(sock)
+            pollers[name] = InferencePoller(port, name, args.timeout)
+        time.sleep(args.settle)
+        frames = {name: reader.frames for name, reader in readers.items()}
+        samples = {name: len(poller.samples) for name, poller in pollers.items()}
+        runs = {name: stats["runs"] for name, stats in app_module.inference_scheduler.status()["cameras"].items()}
+        process.cpu_percent()
+        started = time.perf_counter()
+        time.sleep(args.duration)
+        elapsed = time.perf_counter() - started
+        status = app_module.inference_scheduler.status()["cameras"]
+        steps.append({
+            "cameras": len(readers),
+            "cpu_percent": process.cpu_percent(),
+            "viewer_fps": {name: round((reader.frames - frames[name]) / elapsed / args.viewers, 1)
+                           for name, reader in readers.items()},
+            "inference": {name: dict(latency(poller.samples[samples[name]:]),
+                                     runs_per_second=round((status[name]["runs"] - runs.get(name, 0)) / elapsed, 2))
+                          for name, poller in pollers.items()},
+        })
+        first = steps[-1]["inference"]["cam0"]
+        print(f"cameras={len(readers)} cpu={steps[-1]['cpu_percent']:5.1f}% "
+              f"cam0 fps={steps[-1]['viewer_fps']['cam0']} inference p50={first['p50_ms']} p95={first['p95_ms']} "
+              f"runs/s=" + ",".join(str(stats["runs_per_second"]) for stats in steps[-1]["inference"].values()),
+              file=sys.stderr)
+    for poller in pollers.values():
+        poller.stop_event.set()
+    for reader in readers.values():
+        reader.stop_event.set()
+    # Stops the inference scheduler before interpreter exit tears down the prefetch executor
+    app_module.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "camera": args.camera,
+            "viewers_per_camera": args.viewers,
+            "budget": args.budget,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": steps,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks that run without a Pi, a USB camera or MariaDB.
+
+The app is imported with stand-ins selected through its normal configuration:
+a synthetic (or replayed) camera, a deterministic stub interpreter (or a real
+TFLite model on CPU) and the SQLite backend for DatabaseManager.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --camera replay:./media/time_lapse --compare results.json
+    python benchmarks/run_benchmarks.py --interpreter tflite \
+        --model data_model/mobilenet_v2_1.0_224_inat_bird_quant.tflite
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from species_fixture import start_fixture_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+ENDPOINTS = [
+    "/sensor_data",
+    "/sensor_history?metric=humidity&seconds=3600",
+    "/system_history?seconds=300",
+    "/growth_rate",
+    "/seasonal_status",
+    "/harvest_scheduler",
+    "/inference_data",
+    "/health",
+    "/metrics",
+    "/growth_graph",
+]
+
+def configure_environment(args, workdir: str):
+    """Point the app at the stand-ins before it is imported."""
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    os.makedirs("./logs", exist_ok=True)
+    # Species lookups triggered by classification go to a local fixture, never to Wikipedia
+    _, species_url = start_fixture_server()
+    os.environ.update({
+        "CAMERA_DEVICE": args.camera,
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(workdir, "bench.sqlite3"),
+        "WRITE_BUFFER_PATH": os.path.join(workdir, "write_buffer.sqlite3"),
+        "INFERENCE_BACKEND": "stub" if args.interpreter == "stub" else "tflite",
+        "SENSOR_BUS": "simulated",
+        "TIME_LAPSE_FOLDER": os.path.join(workdir, "time_lapse"),
+        "SNAPSHOT_DIR": os.path.join(workdir, "snapshots"),
+        "STREAM_PORT": "0",
+        "SPECIES_CACHE_PATH": os.path.join(workdir, "species_cache.sqlite3"),
+        "SPECIES_INFO_URL": species_url,
+    })
+
+def summarize(samples) -> dict:
+    """Latency percentiles in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+def bench_streams(app_module, stream_counts, duration: float) -> dict:
+    """Frames/s and CPU seconds per second for N concurrent generate_frames() consumers."""
+    results = {}
+    for count in stream_counts:
+        stop = threading.Event()
+        stats = [None] * count
+
+        def consume(slot):
+            frames = 0
+            generator = app_module.generate_frames()
+            cpu_start = time.thread_time()
+            wall_start = time.perf_counter()
+            try:
+                for _ in generator:
+                    frames += 1
+                    if stop.is_set():
+                        break
+            finally:
+                generator.close()
+            wall = time.perf_counter() - wall_start
+            stats[slot] = (frames, wall, time.thread_time() - cpu_start)
+
+        threads = [threading.Thread(target=consume, args=(i,), daemon=True) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join(10)
+        per_stream = [
+            {"fps": round(frames / wall, 2), "cpu_percent": round(100 * cpu / wall, 1)}
+            for frames, wall, cpu in filter(None, stats)
+        ]
+        results[f"{count}_streams"] = {
+            "per_stream": per_stream,
+            "total_fps": round(sum(s["fps"] for s in per_stream), 2),
+        }
+    return results
+
+def bench_inference(app_module, iterations: int) -> dict:
+    """Preprocess and invoke latency for the plant interpreter on synthetic frames."""
+    import cv2
+    from src.utils.camera import SyntheticCamera
+
+    interpreter = app_module.interpreter.get()
+    if interpreter is None:
+        return {"error": "interpreter not loaded"}
+    camera = SyntheticCamera(fps=0)
+    input_details = interpreter.get_input_details()[0]
+    height, width = int(input_details["shape"][1]), int(input_details["shape"][2])
+    preprocess, invoke = [], []
+    for _ in range(iterations):
+        _, frame = camera.read()
+        start = time.perf_counter()
+        img = cv2.cvtColor(cv2.resize(frame, (width, height)), cv2.COLOR_BGR2RGB)
+        img = np.expand_dims(img, axis=0).astype(np.uint8)
+        preprocess.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        interpreter.set_tensor(input_details["index"], img)
+        interpreter.invoke()
+        interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+        invoke.append(time.perf_counter() - start)
+    return {"preprocess": summarize(preprocess), "invoke": summarize(invoke)}
+
+def bench_endpoints(app_module, duration: float, max_requests: int) -> dict:
+    """Sequential requests/s and latency per JSON endpoint through the Flask test client."""
+    client = app_module.app.test_client()
+    results = {}
+    for endpoint in ENDPOINTS:
+        latencies = []
+        statuses = set()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline and len(latencies) < max_requests:
+            start = time.perf_counter()
+            response = client.get(endpoint)
+            latencies.append(time.perf_counter() - start)
+            statuses.add(response.status_code)
+        elapsed = sum(latencies)
+        results[endpoint] = {
+            "requests_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "status_codes": sorted(statuses),
+            **summarize(latencies),
+        }
+    return results
+
+def bench_analyze_image(iterations: int) -> dict:
+    """analyze_image() speed on a synthetic scene with a reference coin and plant-like blobs."""
+    import cv2
+    from src.models.analyze_image import analyze_image
+
+    image = np.full((480, 640, 3), 235, dtype=np.uint8)
+    cv2.circle(image, (80, 400), 40, (120, 120, 120), -1)
+    for i in range(6):
+        cv2.ellipse(image, (200 + 70 * i, 240), (25, 60 + 10 * i), 0, 0, 360, (40, 140 + 10 * i, 50), -1)
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        analyze_image(image)
+        latencies.append(time.perf_counter() - start)
+    return {"images_per_s": round(len(latencies) / sum(latencies), 2), **summarize(latencies)}
+
+def bench_batch_classification(app_module, workdir: str, images: int, model: str = None, threads: int = None) -> dict:
+    """Archive images/s: one decode+invoke per image versus the pipelined BatchClassifier."""
+    import cv2
+    from src.models.batch_classifier import BatchClassifier, catalog_images
+    from src.utils.camera import SyntheticCamera
+
+    if app_module.interpreter.get() is None:
+        return {"error": "interpreter not loaded"}
+    folder = os.path.join(workdir, "archive")
+    os.makedirs(folder, exist_ok=True)
+    camera = SyntheticCamera(fps=0)
+    for i in range(images):
+        _, frame = camera.read()
+        cv2.imwrite(os.path.join(folder, f"timelapse_{i:05d}.jpg"), frame)
+    paths = catalog_images(folder)
+    labels = app_module.labels or [str(i) for i in range(1000)]
+
+    # Per-request path: the live interpreter, one image per set_tensor/invoke
+    interpreter = app_module.interpreter.get()
+    input_details = interpreter.get_input_details()[0]
+    output_index = interpreter.get_output_details()[0]["index"]
+    height, width = int(input_details["shape"][1]), int(input_details["shape"][2])
+    start = time.perf_counter()
+    for path in paths:
+        img = cv2.cvtColor(cv2.resize(cv2.imread(path), (width, height)), cv2.COLOR_BGR2RGB)
+        interpreter.set_tensor(input_details["index"], np.expand_dims(img, axis=0).astype(np.uint8))
+        interpreter.invoke()
+        interpreter.get_tensor(output_index)
+    sequential = len(paths) / (time.perf_counter() - start)
+
+    if model:
+        import tflite_runtime.interpreter as tflite
+        batch_interpreter = tflite.Interpreter(model_path=model, num_threads=threads or os.cpu_count())
+    else:
+        batch_interpreter = app_module.create_batch_interpreter()
+    batch_interpreter.allocate_tensors()
+    classifier = BatchClassifier(batch_interpreter, labels, batch_size=app_module.config.CLASSIFY_BATCH_SIZE,
+                                 workers=app_module.config.CLASSIFY_WORKERS)
+    result = classifier.run(paths, lambda batch: None)
+    return {
+        "sequential_images_per_s": round(sequential, 2),
+        "batched_images_per_s": result["images_per_s"],
+        "speedup": round(result["images_per_s"] / sequential, 2) if sequential else None,
+        "batch_size": result["batch_size"],
+        "workers": result["workers"],
+    }
+
+def flatten(data, prefix: str = "") -> dict:
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            flat.update(flatten(value, f"{prefix}{i}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix[:-1]] = data
+    return flat
+
+def compare(current: dict, baseline: dict):
+    """Print every numeric result next to its baseline value."""
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    print(f"{'metric':70} {'baseline':>12} {'current':>12} {'change':>9}")
+    for key in sorted(set(now) & set(before)):
+        if ".status_codes." in key:
+            continue
+        old, new = before[key], now[key]
+        change = f"{100 * (new - old) / old:+.1f}%" if old else "n/a"
+        print(f"{key:70} {old:12.3f} {new:12.3f} {change:>9}")
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--camera", default="synthetic@0",
+                        help="Camera source: synthetic[@fps] or replay:<dir-or-video>[@fps]")
+    parser.add_argument("--interpreter", choices=["stub", "tflite"], default="stub")
+    parser.add_argument("--model", help="TFLite model to benchmark with --interpreter tflite")
+    parser.add_argument("--threads", type=int, default=None, help="num_threads for the TFLite interpreter")
+    parser.add_argument("--streams", default="1,2,4", help="Comma-separated concurrent stream counts")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per stream/endpoint run")
+    parser.add_argument("--iterations", type=int, default=100, help="Inference and analysis iterations")
+    parser.add_argument("--archive-images", type=int, default=64, help="Images for the batch classification run")
+    parser.add_argument("--max-requests", type=int, default=500, help="Request cap per endpoint")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gardenhub-bench-")
+    configure_environment(args, workdir)
+
+    import app as app_module
+
+    if args.interpreter == "tflite" and args.model:
+        import tflite_runtime.interpreter as tflite
+        model = tflite.Interpreter(model_path=args.model, num_threads=args.threads)
+        model.allocate_tensors()
+        app_module.interpreter.set(model)
+    # Start every subsystem up front so lazy initialization is not measured as request latency
+    app_module.create_app(warm=True)
+    app_module.warm_up_thread.join()
+
+    results = {
+        "streams": bench_streams(app_module, [int(n) for n in args.streams.split(",")], args.duration),
+        "inference": bench_inference(app_module, args.iterations),
+        "endpoints": bench_endpoints(app_module, args.duration, args.max_requests),
+        "analyze_image": bench_analyze_image(args.iterations),
+        "batch_classification": bench_batch_classification(app_module, workdir, args.archive_images,
+                                                           args.model, args.threads),
+    }
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "host": platform.node(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "camera": args.camera,
+            "interpreter": args.model or args.interpreter,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
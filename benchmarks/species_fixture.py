@@ -0,0 +1,58 @@
+"""
+Local stand-in for the MediaWiki API that species info lookups query.
+
+Benchmarks and tests point SPECIES_INFO_URL (or SpeciesInfoService's
+`upstream_url`) at it so that classifying frames never sends traffic to
+Wikipedia. Every title is answered as a found page with a canned summary,
+except titles starting with "Missing", which come back as missing pages.
+
+Usage:
+    server, url = start_fixture_server()
+    ...
+    server.shutdown()
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        title = query.get("titles", [""])[0]
+        with self.server.lock:
+            self.server.requests.append(title)
+        if title.startswith("Missing"):
+            page = {"ns": 0, "title": title, "missing": ""}
+        else:
+            page = {
+                "pageid": len(self.server.requests),
+                "ns": 0,
+                "title": title,
+                "extract": f"{title} is a species used by the GardenHub fixture server.",
+                "thumbnail": {"source": f"http://{self.server.host}/thumb/{quote(title)}.jpg", "width": 100, "height": 100},
+                "fullurl": f"http://{self.server.host}/wiki/{quote(title)}",
+            }
+        body = json.dumps({"batchcomplete": "", "query": {"pages": {str(page.get("pageid", -1)): page}}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server() -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Serve the fixture on an ephemeral localhost port from a daemon thread.
+    :return: (server, API url). server.requests lists the titles looked up so far.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.host = f"127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="species-fixture", daemon=True).start()
+    return server, f"http://{server.host}/w/api.php"
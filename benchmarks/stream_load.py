@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+JSON endpoint latency while MJPEG viewers are connected, in both streaming modes.
+
+The app is served the way a WSGI server with a fixed thread count serves it
+(gunicorn --threads N): every request, including a long-lived /video_feed,
+occupies one of --workers threads. Viewers are opened in steps; at each step
+the JSON endpoints are timed while fast viewers drain the stream and slow
+viewers connect but never read.
+
+  inline  STREAM_SERVER=0: /video_feed is a Flask generator on a worker thread
+  server  STREAM_SERVER=1: /video_feed redirects to the selector-based stream server
+
+Usage:
+    python benchmarks/stream_load.py
+    python benchmarks/stream_load.py --viewers 0,4,8,16 --workers 8 --output stream_load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from species_fixture import start_fixture_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def configure_environment(args, mode: str, workdir: str):
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    os.makedirs("./logs", exist_ok=True)
+    # Species lookups triggered by classification go to a local fixture, never to Wikipedia
+    _, species_url = start_fixture_server()
+    os.environ.update({
+        "CAMERA_DEVICE": args.camera,
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(workdir, "bench.sqlite3"),
+        "WRITE_BUFFER_PATH": os.path.join(workdir, "write_buffer.sqlite3"),
+        "INFERENCE_BACKEND": "stub",
+        "SENSOR_BUS": "simulated",
+        "SNAPSHOT_DIR": os.path.join(workdir, "snapshots"),
+        "STREAM_SERVER": "1" if mode == "server" else "0",
+        "STREAM_HOST": "127.0.0.1",
+        "STREAM_PORT": "0",
+        "SENSOR_RETENTION_DAYS": "0",
+        "SPECIES_CACHE_PATH": os.path.join(workdir, "species_cache.sqlite3"),
+        "SPECIES_INFO_URL": species_url,
+    })
+
+def serve(app, workers: int):
+    """Serve `app` on an ephemeral port with a fixed-size request thread pool."""
+    from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    class PooledWSGIServer(ThreadingMixIn, BaseWSGIServer):
+        daemon_threads = True
+
+        def __init__(self):
+            super().__init__("127.0.0.1", 0, app, handler=QuietHandler)
+            self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wsgi")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.process_request_thread, request, client_address)
+
+    server = PooledWSGIServer()
+    threading.Thread(target=server.serve_forever, name="wsgi-accept", daemon=True).start()
+    return server
+
+def open_viewer(port: int, timeout: float = 5.0, path: str = "/video_feed"):
+    """Request a video feed, following the stream server redirect; returns a connected socket or None."""
+    host = "127.0.0.1"
+    for _ in range(2):
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode())
+        head = b""
+        try:
+            while b"\r\n\r\n" not in head:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                head += chunk
+        except socket.timeout:
+            sock.close()
+            return None
+        status = head.split(b" ", 2)[1] if b" " in head else b""
+        if status in (b"302", b"307"):
+            location = [line.split(b":", 1)[1].strip() for line in head.split(b"\r\n")
+                        if line.lower().startswith(b"location:")][0].decode()
+            sock.close()
+            parts = urlsplit(location)
+            host, port, path = parts.hostname, parts.port, parts.path
+            continue
+        if status != b"200":
+            sock.close()
+            return None
+        sock.setblocking(False)
+        return sock
+    return None
+
+class ViewerReader:
+    """Drain every fast viewer from one thread and count received frames."""
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.frames = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="viewer-reader", daemon=True)
+        self.thread.start()
+
+    def add(self, sock):
+        with self.lock:
+            self.selector.register(sock, selectors.EVENT_READ)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            with self.lock:
+                registered = bool(self.selector.get_map())
+            if not registered:
+                time.sleep(0.05)
+                continue
+            for key, _ in self.selector.select(timeout=0.2):
+                try:
+                    data = key.fileobj.recv(65536)
+                except (BlockingIOError, OSError):
+                    continue
+                if not data:
+                    with self.lock:
+                        self.selector.unregister(key.fileobj)
+                    continue
+                self.frames += data.count(b"--frame")
+
+def time_endpoint(port: int, path: str, timeout: float) -> float:
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        conn.getresponse().read()
+    finally:
+        conn.close()
+    return time.perf_counter() - start
+
+def measure(port: int, endpoints, requests: int, timeout: float) -> dict:
+    results = {}
+    for path in endpoints:
+        samples, timeouts = [], 0
+        for _ in range(requests):
+            try:
+                samples.append(time_endpoint(port, path, timeout))
+            except (socket.timeout, OSError):
+                timeouts += 1
+                # A starved server would take requests * timeout to measure; three in a row is enough
+                if timeouts >= 3 and not samples:
+                    break
+        values = np.array(samples) * 1000
+        results[path] = {
+            "count": len(samples),
+            "timeouts": timeouts,
+            "p50_ms": round(float(np.percentile(values, 50)), 2) if samples else None,
+            "p95_ms": round(float(np.percentile(values, 95)), 2) if samples else None,
+            "max_ms": round(float(values.max()), 2) if samples else None,
+        }
+    return results
+
+def run_mode(args, mode: str) -> list:
+    import psutil
+
+    workdir = tempfile.mkdtemp(prefix="gardenhub-stream-")
+    configure_environment(args, mode, workdir)
+    import app as app_module
+
+    app_module.create_app(warm=True)
+    app_module.warm_up_thread.join()
+    server = serve(app_module.app, args.workers)
+    port = server.server_address[1]
+    endpoints = args.endpoints.split(",")
+    reader = ViewerReader()
+    process = psutil.Process()
+    fast, slow, steps = [], [], []
+    for target in [int(n) for n in args.viewers.split(",")]:
+        while len(fast) + len(slow) < target:
+            sock = open_viewer(port, timeout=args.timeout)
+            if sock is None:
+                break
+            # Every slow_every-th viewer never reads: its socket buffers fill up and stay full
+            if args.slow_every and (len(fast) + len(slow) + 1) % args.slow_every == 0:
+                slow.append(sock)
+            else:
+                fast.append(sock)
+                reader.add(sock)
+        time.sleep(args.settle)
+        frames_before, started = reader.frames, time.perf_counter()
+        process.cpu_percent()
+        latency = measure(port, endpoints, args.requests, args.timeout)
+        elapsed = time.perf_counter() - started
+        steps.append({
+            "viewers": len(fast) + len(slow),
+            "slow_viewers": len(slow),
+            "requested_viewers": target,
+            "cpu_percent": process.cpu_percent(),
+            "threads": threading.active_count(),
+            "viewer_fps": round((reader.frames - frames_before) / elapsed / len(fast), 1) if fast else None,
+            "latency": latency,
+        })
+        print(f"[{mode}] viewers={steps[-1]['viewers']:3d} cpu={steps[-1]['cpu_percent']:5.1f}% "
+              + " ".join(f"{path} p50={stats['p50_ms']} p95={stats['p95_ms']} timeouts={stats['timeouts']}"
+                         for path, stats in latency.items()), file=sys.stderr)
+    for sock in fast + slow:
+        sock.close()
+    reader.stop_event.set()
+    return steps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inline", "server", "both"], default="both")
+    parser.add_argument("--camera", default="synthetic@15", help="Camera source: synthetic[@fps] or replay:<dir>[@fps]")
+    parser.add_argument("--viewers", default="0,2,4,8,16", help="Comma-separated viewer counts, in increasing order")
+    parser.add_argument("--slow-every", type=int, default=4, help="Every Nth viewer never reads (0 for none)")
+    parser.add_argument("--workers", type=int, default=8, help="Request threads, like gunicorn --threads")
+    parser.add_argument("--endpoints", default="/video_feed_status,/db_status,/stream_status")
+    parser.add_argument("--requests", type=int, default=30, help="Requests per endpoint per step")
+    parser.add_argument("--timeout", type=float, default=3.0)
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait after opening viewers")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if args.mode != "both":
+        print(json.dumps(run_mode(args, args.mode)))
+        return
+
+    # Each mode in its own process: the mode is read from the environment at import
+    results = {}
+    for mode in ("inline", "server"):
+        command = [sys.executable, os.path.abspath(__file__), "--mode", mode] + [
+            arg for arg in sys.argv[1:] if not arg.startswith("--output") and arg != args.output
+        ]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "camera": args.camera,
+            "workers": args.workers,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,6 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
 # Constants for reference object sizes (in inches)
 REFERENCE_OBJECTS = {
     "U.S. Quarter": {"diameter": 0.955},  # Diameter in inches
@@ -231,4 +228,7 @@ def main():
 
 # Run the script (for standalone usage)
 if __name__ == "__main__":
+    from src.utils.log_pipeline import configure_logging
+    configure_logging()
+
     main()
\ No newline at end of file
@@ -0,0 +1,265 @@
+# src/models/batch_classifier.py
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils import metrics
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+DECODE_SECONDS = metrics.stage_timer("batch_decode")
+BATCH_INVOKE_SECONDS = metrics.stage_timer("batch_invoke")
+IMAGES_CLASSIFIED = metrics.registry.counter("batch_images_classified_total", "Archive images classified offline")
+
+def catalog_images(folder: str) -> List[str]:
+    """
+    List every image below `folder`, including the per-day subfolders.
+    :return: Sorted list of paths.
+    """
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS) and ".tmp." not in name:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+class BatchClassifier:
+    """
+    Classify archived images with decode, resize and inference pipelined.
+
+    Images are decoded and resized on a thread pool (OpenCV releases the GIL)
+    while the interpreter works on the previous batch. If the model accepts a
+    resized batch dimension, `batch_size` images go through one invoke();
+    otherwise the interpreter stays at batch 1 and only the decode is
+    overlapped. The interpreter must not be shared with the live endpoints
+    because its input tensor is resized.
+    """
+
+    def __init__(self, interpreter, labels: List[str], batch_size: int = 8, workers: int = 4, top_k: int = 3):
+        self.interpreter = interpreter
+        self.labels = labels
+        self.workers = max(1, workers)
+        self.top_k = max(1, top_k)
+        input_details = interpreter.get_input_details()[0]
+        self.input_index = input_details["index"]
+        self.input_dtype = input_details["dtype"]
+        self.height, self.width = int(input_details["shape"][1]), int(input_details["shape"][2])
+        self.batch_size = self._configure_batch(max(1, batch_size))
+        output_details = interpreter.get_output_details()[0]
+        self.output_index = output_details["index"]
+        self.output_scale, self.output_zero_point = output_details.get("quantization", (0.0, 0))
+
+    def _resize_input(self, batch_size: int):
+        self.interpreter.resize_tensor_input(self.input_index, [batch_size, self.height, self.width, 3])
+        self.interpreter.allocate_tensors()
+
+    def _configure_batch(self, batch_size: int) -> int:
+        if batch_size > 1:
+            try:
+                self._resize_input(batch_size)
+                self.interpreter.set_tensor(
+                    self.input_index,
+                    np.zeros((batch_size, self.height, self.width, 3), dtype=self.input_dtype)
+                )
+                self.interpreter.invoke()
+                output_index = self.interpreter.get_output_details()[0]["index"]
+                if self.interpreter.get_tensor(output_index).shape[0] == batch_size:
+                    logging.info(f"Batch classifier using batch size {batch_size}")
+                    return batch_size
+                logging.warning("Model ignored the resized batch dimension; classifying one image per invoke")
+            except Exception as e:
+                logging.warning(f"Model does not accept batch size {batch_size} ({e}); classifying one image per invoke")
+        self._resize_input(1)
+        return 1
+
+    def _decode(self, path: str) -> Tuple[str, Optional[np.ndarray]]:
+        with DECODE_SECONDS.time():
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                return path, None
+            # Same preprocessing as /inference_data so archive and live labels agree
+            image = cv2.resize(image, (self.width, self.height))
+            return path, cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    def _scores(self, output: np.ndarray) -> np.ndarray:
+        if self.output_scale:
+            return (output.astype(np.float32) - self.output_zero_point) * self.output_scale
+        return output.astype(np.float32)
+
+    def _invoke(self, images: List[np.ndarray]) -> np.ndarray:
+        count = len(images)
+        batch = np.zeros((self.batch_size, self.height, self.width, 3), dtype=self.input_dtype)
+        batch[:count] = images
+        with BATCH_INVOKE_SECONDS.time():
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_index)
+        return self._scores(output[:count])
+
+    def _top_k(self, scores: np.ndarray) -> List[List[Tuple[str, float]]]:
+        k = min(self.top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        ordered = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        return [
+            [(self.labels[i] if i < len(self.labels) else str(i), float(row[i])) for i in indices]
+            for row, indices in zip(scores, ordered)
+        ]
+
+    def classify(self, paths: Iterable[str]) -> Iterator[List[Tuple[str, Optional[List[Tuple[str, float]]]]]]:
+        """
+        Classify images in order, one batch at a time.
+        :param paths: Image paths.
+        :return: Iterator of batches of (path, top-k [(label, score)] or None if unreadable).
+        """
+        # Keep a couple of batches decoding ahead without holding the whole archive in memory
+        window = self.batch_size * 2 + self.workers
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-decode") as executor:
+            futures = deque()
+            paths = iter(paths)
+            exhausted = False
+            while futures or not exhausted:
+                while not exhausted and len(futures) < window:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                    else:
+                        futures.append(executor.submit(self._decode, path))
+                decoded = [futures.popleft().result() for _ in range(min(self.batch_size, len(futures)))]
+                if not decoded:
+                    continue
+                readable = [(path, image) for path, image in decoded if image is not None]
+                results = dict(zip(
+                    (path for path, _ in readable),
+                    self._top_k(self._invoke([image for _, image in readable])) if readable else []
+                ))
+                IMAGES_CLASSIFIED.inc(len(readable))
+                yield [(path, results.get(path)) for path, _ in decoded]
+
+    def run(self, paths: List[str], on_batch: Callable[[List], None],
+            should_stop: Optional[Callable[[], bool]] = None) -> dict:
+        """
+        Classify `paths`, hand every batch of results to `on_batch` and report throughput.
+        :return: Dictionary with image counts, elapsed seconds and images per second.
+        """
+        started = time.perf_counter()
+        classified = failed = 0
+        for batch in self.classify(paths):
+            on_batch(batch)
+            classified += sum(1 for _, top in batch if top is not None)
+            failed += sum(1 for _, top in batch if top is None)
+            if should_stop and should_stop():
+                break
+        elapsed = time.perf_counter() - started
+        return {
+            "images": classified,
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+            "images_per_s": round(classified / elapsed, 2) if elapsed else 0.0,
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+        }
+
+INSERT_CLASSIFICATIONS = """
+    INSERT INTO image_classifications (image_path, captured_at, label_rank, label, confidence)
+    VALUES (%s, FROM_UNIXTIME(%s), %s, %s, %s)
+"""
+
+class ArchiveClassifier:
+    """
+    Background job classifying the time-lapse archive and bulk-writing top-k labels.
+
+    Each batch replaces the rows already stored for its images in one
+    transaction, so reclassifying the archive (or replaying a batch) never
+    duplicates labels. A batch the database rejects is counted as failed and
+    does not advance `done`; images that vanish before their rows are written
+    are skipped.
+    """
+
+    def __init__(self, db, create_classifier: Callable[[], BatchClassifier]):
+        self.db = db
+        self.create_classifier = create_classifier
+        self.lock = threading.Lock()
+        self.thread = None
+        self.is_running = False
+        self.progress = {"total": 0, "done": 0, "failed": 0, "skipped": 0}
+        self.last_result = None
+
+    def _pending_images(self, folder: str, reclassify: bool) -> List[str]:
+        paths = catalog_images(folder)
+        if reclassify:
+            return paths
+        rows = self.db.execute_query("SELECT DISTINCT image_path FROM image_classifications") or []
+        done = {row[0] for row in rows}
+        return [path for path in paths if path not in done]
+
+    def _write(self, batch):
+        paths, rows, skipped = [], [], 0
+        for path, top in batch:
+            if top is None:
+                continue
+            try:
+                captured = os.path.getmtime(path)
+            except OSError:
+                # Deleted or moved since it was decoded; nothing to attach the labels to
+                logging.warning(f"Archive image {path} disappeared before its labels were written; skipped")
+                skipped += 1
+                continue
+            paths.append((path,))
+            rows.extend((path, captured, rank, label, score) for rank, (label, score) in enumerate(top, 1))
+        ok = not paths or self.db.execute_batches([
+            ("DELETE FROM image_classifications WHERE image_path = %s", paths),
+            (INSERT_CLASSIFICATIONS, rows),
+        ])
+        with self.lock:
+            self.progress["skipped"] += skipped
+            if ok:
+                self.progress["done"] += len(batch)
+            else:
+                self.progress["failed"] += len(batch)
+        if not ok:
+            logging.error(f"Failed to store labels for {len(paths)} archive images")
+
+    def _should_stop(self) -> bool:
+        with self.lock:
+            return not self.is_running
+
+    def run(self, folder: str, reclassify: bool):
+        try:
+            paths = self._pending_images(folder, reclassify)
+            with self.lock:
+                self.progress = {"total": len(paths), "done": 0, "failed": 0, "skipped": 0}
+            classifier = self.create_classifier()
+            result = classifier.run(paths, self._write, self._should_stop)
+            logging.info(f"Classified {result['images']} archive images at {result['images_per_s']} images/s "
+                         f"(batch {result['batch_size']}, {result['workers']} decode workers)")
+        except Exception as e:
+            logging.error(f"Archive classification failed: {e}")
+            result = {"error": str(e)}
+        with self.lock:
+            self.last_result = result
+            self.is_running = False
+
+    def start(self, folder: str, reclassify: bool = False) -> Tuple[bool, str]:
+        with self.lock:
+            if self.is_running:
+                return False, "Classification already running"
+            self.is_running = True
+            self.thread = threading.Thread(target=self.run, args=(folder, reclassify),
+                                           name="archive-classifier", daemon=True)
+            self.thread.start()
+            return True, "Classification started"
+
+    def stop(self):
+        with self.lock:
+            self.is_running = False
+
+    def status(self) -> dict:
+        with self.lock:
+            return {"running": self.is_running, **self.progress, "last_result": self.last_result}
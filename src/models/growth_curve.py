@@ -0,0 +1,223 @@
+# src/models/growth_curve.py
+import logging
+import threading
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils import metrics
+
+GrowthFit = namedtuple("GrowthFit", ["capacity", "rate", "midpoint", "rmse", "points"])
+
+# (upper bound on height / capacity, stage) along the logistic curve
+STAGES = [
+    (0.12, "Early Growth"),
+    (0.5, "Rapid Growth"),
+    (0.88, "Late Growth"),
+    (float("inf"), "Mature"),
+]
+
+# Fits slower than this (per day) or predicting harvest beyond the horizon describe a plant that is not growing
+MIN_RATE = 1e-3
+HARVEST_HORIZON_DAYS = 3650
+
+FITS = metrics.registry.counter("growth_fits_total", "Per-plant logistic curve fits computed")
+FIT_SECONDS = metrics.stage_timer("growth_fit")
+
+def fit_logistic(days: np.ndarray, heights: np.ndarray, grid: int = 64) -> Optional[GrowthFit]:
+    """
+    Fit height(t) = K / (1 + exp(-r (t - t0))) by least squares.
+
+    For a fixed capacity K the curve is linear in t after the logit transform,
+    so every K on a grid above the tallest measurement is solved in closed
+    form at once; the one with the smallest height residual seeds a short
+    Levenberg-Marquardt refinement.
+    :return: GrowthFit, or None with fewer than three distinct days or no growth.
+    """
+    mask = np.isfinite(days) & np.isfinite(heights) & (heights > 0)
+    days, heights = days[mask].astype(np.float64), heights[mask].astype(np.float64)
+    if np.unique(days).size < 3:
+        return None
+    capacity = heights.max() * np.geomspace(1.02, 4.0, grid)[:, None]
+    logits = np.log(capacity / heights - 1.0)
+    centered = days - days.mean()
+    slope = (logits - logits.mean(axis=1, keepdims=True)) @ centered / (centered @ centered)
+    intercept = logits.mean(axis=1) - slope * days.mean()
+    rate = -slope
+    valid = rate > 0
+    if not valid.any():
+        return None
+    midpoint = np.where(valid, intercept / np.where(valid, rate, 1.0), 0.0)
+    predicted = capacity / (1.0 + np.exp(-rate[:, None] * (days - midpoint[:, None])))
+    sse = np.where(valid, ((predicted - heights) ** 2).sum(axis=1), np.inf)
+    best = int(np.argmin(sse))
+    params, best_sse = _refine(days, heights, np.array([capacity[best, 0], rate[best], midpoint[best]]), sse[best])
+    return GrowthFit(float(params[0]), float(params[1]), float(params[2]),
+                     float(np.sqrt(best_sse / heights.size)), int(heights.size))
+
+def _refine(days: np.ndarray, heights: np.ndarray, params: np.ndarray, sse: float,
+            iterations: int = 30) -> tuple:
+    """
+    Levenberg-Marquardt steps on the height residuals. The logit fit weights
+    the small early measurements too heavily; this corrects for it.
+    """
+    damping = 1e-3
+    for _ in range(iterations):
+        capacity, rate, midpoint = params
+        s = 1.0 / (1.0 + np.exp(-rate * (days - midpoint)))
+        residual = capacity * s - heights
+        slope = capacity * s * (1.0 - s)
+        jacobian = np.stack([s, slope * (days - midpoint), -slope * rate], axis=1)
+        normal = jacobian.T @ jacobian
+        step = np.linalg.lstsq(normal + damping * np.diag(np.diag(normal)), -jacobian.T @ residual, rcond=None)[0]
+        candidate = params + step
+        if candidate[0] <= 0 or candidate[1] <= 0:
+            damping *= 10
+            continue
+        fitted = candidate[0] / (1.0 + np.exp(-candidate[1] * (days - candidate[2])))
+        candidate_sse = float(((fitted - heights) ** 2).sum())
+        if candidate_sse < sse:
+            converged = sse - candidate_sse < 1e-9 * max(sse, 1e-12)
+            params, sse, damping = candidate, candidate_sse, damping / 10
+            if converged:
+                break
+        else:
+            damping *= 10
+            if damping > 1e8:
+                break
+    return params, sse
+
+def predict(fit: GrowthFit, day: float) -> float:
+    return fit.capacity / (1.0 + np.exp(-fit.rate * (day - fit.midpoint)))
+
+def stage(fraction: float) -> str:
+    return next(name for bound, name in STAGES if fraction < bound)
+
+class GrowthAnalytics:
+    """
+    Per-plant growth stage and harvest prediction from logistic curve fits.
+
+    Fits are cached per plant and only recomputed for plants that received
+    measurements since the last request, detected through MAX(id) on the
+    growth_rate primary key, so a request costs the same however long the
+    measurement history gets. The harvest date is when the fitted height
+    reaches `harvest_fraction` of the plant's fitted capacity.
+    """
+
+    def __init__(self, db, harvest_fraction: float = 0.95):
+        self.db = db
+        self.harvest_fraction = harvest_fraction
+        self.lock = threading.Lock()
+        self.last_id = None
+        self.plants: Dict[int, Dict] = {}
+
+    def _load(self, plant_ids: Optional[List[int]] = None) -> Optional[Dict[int, Dict]]:
+        where, params = "", ()
+        if plant_ids is not None:
+            where = f"WHERE gr.plant_id IN ({', '.join(['%s'] * len(plant_ids))})"
+            params = tuple(plant_ids)
+        rows = self.db.execute_query(
+            f"""
+            SELECT gr.plant_id, p.name, gr.time_after_planting, gr.height
+            FROM growth_rate gr
+            JOIN plants p ON gr.plant_id = p.id
+            {where}
+            ORDER BY gr.plant_id, gr.time_after_planting
+            """,
+            params
+        )
+        if rows is None:
+            return None
+        if not rows:
+            return {}
+        plant_id = np.array([row[0] for row in rows], dtype=np.int64)
+        days = np.array([row[2] if row[2] is not None else np.nan for row in rows], dtype=np.float64)
+        heights = np.array([row[3] if row[3] is not None else np.nan for row in rows], dtype=np.float64)
+        ids, starts = np.unique(plant_id, return_index=True)
+        bounds = list(starts[1:]) + [len(rows)]
+        results = {}
+        for pid, start, end in zip(ids, starts, bounds):
+            try:
+                results[int(pid)] = self._analyze(int(pid), rows[start][1], days[start:end], heights[start:end])
+            except (ArithmeticError, ValueError) as e:
+                # One plant's bad data must not fail the analysis of all the others
+                logging.error(f"Growth analysis failed for plant {pid}: {e}")
+        return results
+
+    def _analyze(self, plant_id: int, name: str, days: np.ndarray, heights: np.ndarray) -> Dict:
+        with FIT_SECONDS.time(), np.errstate(over="ignore"):
+            fit = fit_logistic(days, heights)
+        FITS.inc()
+        latest = float(np.nanmax(days)) if np.isfinite(days).any() else 0.0
+        today = date.today()
+        planted = today - timedelta(days=latest)
+        entry = {
+            "plant_id": plant_id,
+            "plant_name": name,
+            "measurements": int(days.size),
+            "start_date": planted.strftime("%Y-%m-%d"),
+            "days_after_planting": latest,
+            "fit": None,
+            "current_stage": "Not enough data",
+            "predicted_harvest_date": None,
+        }
+        if fit is None or fit.rate < MIN_RATE:
+            return entry
+        harvest_day = fit.midpoint + np.log(self.harvest_fraction / (1 - self.harvest_fraction)) / fit.rate
+        if not np.isfinite(harvest_day) or abs(harvest_day) > HARVEST_HORIZON_DAYS:
+            return entry
+        fraction = predict(fit, latest) / fit.capacity
+        entry.update({
+            "fit": {"capacity": round(fit.capacity, 2), "rate": round(fit.rate, 4),
+                    "midpoint_day": round(fit.midpoint, 1), "rmse": round(fit.rmse, 3)},
+            "current_stage": stage(fraction),
+            "fraction_of_capacity": round(float(fraction), 3),
+            "predicted_harvest_date": (planted + timedelta(days=float(harvest_day))).strftime("%Y-%m-%d"),
+        })
+        return entry
+
+    def _current(self) -> List[Dict]:
+        # The countdown changes daily even when the cached fit does not
+        today = date.today()
+        return [
+            dict(entry, days_to_harvest=max(0, (date.fromisoformat(entry["predicted_harvest_date"]) - today).days)
+                 if entry["predicted_harvest_date"] else None)
+            for entry in self.plants.values()
+        ]
+
+    def refresh(self) -> Optional[List[Dict]]:
+        """
+        Return the analysis for every plant with measurements, refitting only what changed.
+        :return: List of per-plant dictionaries, or None if the database is unavailable and nothing is cached.
+        """
+        with self.lock:
+            rows = self.db.execute_query("SELECT MAX(id) FROM growth_rate")
+            if rows is None:
+                logging.warning("Growth analytics serving cached fits; database unavailable")
+                return self._current() if self.last_id is not None else None
+            last_id = rows[0][0] if rows else None
+            if self.last_id is None or last_id is None or last_id < self.last_id:
+                # First request, or rows were deleted: fit everything
+                loaded = self._load()
+                if loaded is None:
+                    return None
+                self.plants = loaded
+            elif last_id > self.last_id:
+                changed = self.db.execute_query(
+                    "SELECT DISTINCT plant_id FROM growth_rate WHERE id > %s", (self.last_id,)
+                )
+                if changed is None:
+                    return self._current()
+                loaded = self._load([row[0] for row in changed]) if changed else {}
+                if loaded is None:
+                    return self._current()
+                self.plants.update(loaded)
+            self.last_id = last_id if last_id is not None else 0
+            return self._current()
+
+    def invalidate(self):
+        with self.lock:
+            self.last_id = None
+            self.plants = {}
@@ -2,13 +2,77 @@
 import cv2
 import numpy as np
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+from src.utils import metrics
+from src.utils.frame_pool import encode_jpeg, model_input
+
+CAPTURE_SECONDS = metrics.stage_timer("capture")
+MOTION_SECONDS = metrics.stage_timer("motion")
+PREPROCESS_SECONDS = metrics.stage_timer("preprocess")
+INVOKE_SECONDS = metrics.stage_timer("invoke")
+ENCODE_SECONDS = metrics.stage_timer("encode")
 
 class ObjectDetector:
-    def __init__(self):
+    """
+    Motion boxes plus per-category classification over a camera feed.
+
+    Background subtraction runs on a copy of the frame downscaled by
+    `analysis_scale` (MOG2 cost is proportional to pixel count) and only on
+    every `frame_stride`-th frame; skipped frames reuse the previous boxes.
+    Boxes are scaled back to display coordinates and `min_area` is always
+    expressed in display pixels.
+    """
+
+    def __init__(self, analysis_scale: float = 1.0, frame_stride: int = 1, min_area: float = 500):
+        if not 0 < analysis_scale <= 1:
+            raise ValueError("Analysis scale must be in (0, 1]")
+        if frame_stride < 1:
+            raise ValueError("Frame stride must be at least 1")
+        self.analysis_scale = analysis_scale
+        self.frame_stride = frame_stride
+        self.min_area = min_area
         self.fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=16, detectShadows=False)
+        self.frame_count = 0
+        self.motion_boxes: List[Tuple[int, int, int, int]] = []
+        # Per detector rather than per thread, so detectors at different scales don't reallocate each other's
+        self.buffers: Dict[str, np.ndarray] = {}
+
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        buffer = self.buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def detect_motion(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Return (x, y, w, h) motion boxes in the coordinates of `frame`.
+        :param frame: Full-resolution BGR frame.
+        :return: List of bounding boxes; the previous result on strided-out frames.
+        """
+        self.frame_count += 1
+        if (self.frame_count - 1) % self.frame_stride:
+            return self.motion_boxes
+        with MOTION_SECONDS.time():
+            scale = self.analysis_scale
+            if scale < 1:
+                # Same size cv2.resize derives from fx/fy, so the buffer is reused every frame
+                height, width = round(frame.shape[0] * scale), round(frame.shape[1] * scale)
+                small = cv2.resize(frame, None, dst=self._buffer("small", (height, width) + frame.shape[2:]),
+                                   fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                small = frame
+            fgmask = self.fgbg.apply(small, fgmask=self._buffer("mask", small.shape[:2]))
+            cv2.threshold(fgmask, 127, 255, cv2.THRESH_BINARY, dst=fgmask)
+            contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            min_area = self.min_area * scale * scale
+            boxes = []
+            for contour in contours:
+                if cv2.contourArea(contour) > min_area:
+                    (x, y, w, h) = cv2.boundingRect(contour)
+                    boxes.append((int(x / scale), int(y / scale), int(round(w / scale)), int(round(h / scale))))
+        self.motion_boxes = boxes
+        return boxes
 
     def generate_frames(self, camera: cv2.VideoCapture, interpreters: Dict, 
                        labels: Dict, last_detections: List) -> bytes:
@@ -22,8 +86,11 @@ class ObjectDetector:
             return
 
         logging.info("Starting frame generation")
+        # One capture buffer for the whole stream: each frame is drawn on, encoded and sent before the next read
+        frame = None
         while True:
-            success, frame = camera.read()
+            with CAPTURE_SECONDS.time():
+                success, frame = camera.read(frame)
             if not success or frame is None or not frame.any():
                 logging.error("Failed to read valid frame from camera")
                 break
@@ -31,13 +98,8 @@ class ObjectDetector:
 
             try:
                 # Background subtraction
-                fgmask = self.fgbg.apply(frame)
-                _, fgmask = cv2.threshold(fgmask, 127, 255, cv2.THRESH_BINARY)
-                contours, _ = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                for contour in contours:
-                    if cv2.contourArea(contour) > 500:
-                        (x, y, w, h) = cv2.boundingRect(contour)
-                        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                for (x, y, w, h) in self.detect_motion(frame):
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
 
                 # Object detection
                 if interpreters:
@@ -47,12 +109,12 @@ class ObjectDetector:
                             output_details = interpreter.get_output_details()
                             input_shape = input_details[0]['shape']
 
-                            img = cv2.resize(frame, (input_shape[1], input_shape[2]))
-                            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                            input_data = np.expand_dims(img_rgb, axis=0).astype(np.uint8)
+                            with PREPROCESS_SECONDS.time():
+                                input_data = model_input(frame, input_shape[2], input_shape[1])
 
-                            interpreter.set_tensor(input_details[0]['index'], input_data)
-                            interpreter.invoke()
+                            with INVOKE_SECONDS.time():
+                                interpreter.set_tensor(input_details[0]['index'], input_data)
+                                interpreter.invoke()
                             output_data = interpreter.get_tensor(output_details[0]['index'])
                             predicted_label_idx = np.argmax(output_data[0])
                             confidence = output_data[0][predicted_label_idx]
@@ -74,11 +136,11 @@ class ObjectDetector:
                         except Exception as e:
                             logging.error(f"Error in {category} detection: {e}")
 
-                ret, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
-                if not ret:
+                with ENCODE_SECONDS.time():
+                    frame_bytes = encode_jpeg(frame, 95)
+                if frame_bytes is None:
                     logging.warning("Failed to encode frame")
                     continue
-                frame_bytes = buffer.tobytes()
                 yield (b'--frame\r\n'
                        b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
             except Exception as e:
@@ -87,6 +149,7 @@ class ObjectDetector:
 
         logging.info("Frame generation stopped")
 
-def generate_frames(camera, interpreters, labels, last_detections):
-    detector = ObjectDetector()
+def generate_frames(camera, interpreters, labels, last_detections, analysis_scale: float = 1.0,
+                    frame_stride: int = 1):
+    detector = ObjectDetector(analysis_scale=analysis_scale, frame_stride=frame_stride)
     return detector.generate_frames(camera, interpreters, labels, last_detections)
\ No newline at end of file
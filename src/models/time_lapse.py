@@ -1,24 +1,48 @@
-import gi
-gi.require_version('Gst', '1.0')
-from gi.repository import Gst, GObject
-import numpy as np
 import cv2
 import os
 import datetime
 import logging
+import threading
 import time
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+from src.utils.gst_camera import GstCamera
 
-def capture_single_photo(output_folder="/home/boss/BASE/dev_tpu/coral/dashboard/media/time_lapse", camera_device="/dev/video0", experiment_id="exp001", max_retries=3):
+# One long-lived pipeline per device, shared by every capture in the process
+_cameras = {}
+_cameras_lock = threading.Lock()
+
+def shared_camera(camera_device="/dev/video0", width=640, height=480):
+    """
+    Return the open GStreamer camera for a device, starting its pipeline on first use.
+    :return: GstCamera, or None if the pipeline could not be started.
+    """
+    with _cameras_lock:
+        camera = _cameras.get(camera_device)
+        if camera is None or not camera.isOpened():
+            if camera is not None:
+                camera.release()
+            # Same YUY2 caps as the per-photo pipeline this replaces; the camera picks its own rate
+            camera = GstCamera(camera_device, width, height, fps=None, input_format="YUY2")
+            if not camera.isOpened():
+                return None
+            _cameras[camera_device] = camera
+        return camera
+
+def release_cameras():
+    with _cameras_lock:
+        for camera in _cameras.values():
+            camera.release()
+        _cameras.clear()
+
+def capture_single_photo(output_folder="/home/boss/BASE/dev_tpu/coral/dashboard/media/time_lapse", camera_device="/dev/video0", experiment_id="exp001", max_retries=3, camera=None):
     """
     Capture a single photo using GStreamer and save it to a folder with a standardized naming convention.
     
     :param output_folder: Folder to save the image (default: "/home/boss/BASE/dev_tpu/coral/dashboard/media/time_lapse").
-    :param camera_device: Camera device path (default: "/dev/video0").
+    :param camera_device: Camera device path (default: "/dev/video0"), or "videotestsrc" for a test pattern.
     :param experiment_id: Unique identifier for the experiment (default: "exp001").
     :param max_retries: Maximum number of retries if the camera is busy.
+    :param camera: Already open GstCamera to capture from; defaults to the shared pipeline for camera_device.
     :return: Tuple (success, message) indicating whether the capture was successful.
     """
     # Log output folder details
@@ -34,83 +58,54 @@ def capture_single_photo(output_folder="/home/boss/BASE/dev_tpu/coral/dashboard/
         logging.error(f"Output folder is not writable: {output_folder}")
         return False, f"Output folder is not writable: {output_folder}"
 
-    # Initialize GStreamer
-    Gst.init(None)
-
     # Retry mechanism
     for attempt in range(max_retries):
         try:
-            # Define the GStreamer pipeline
-            pipeline_str = (
-                f"v4l2src device={camera_device} ! "
-                "video/x-raw,format=YUY2,width=640,height=480 ! "
-                "videoconvert ! "
-                "video/x-raw,format=BGR ! "
-                "appsink name=sink"
-            )
-            pipeline = Gst.parse_launch(pipeline_str)
-            logging.info("Pipeline created successfully.")
-
-            # Start the pipeline
-            pipeline.set_state(Gst.State.PLAYING)
-            logging.info("Pipeline set to PLAYING state.")
-
-            # Get the appsink element
-            appsink = pipeline.get_by_name("sink")
-
-            # Capture a frame
-            sample = appsink.emit("pull-sample")
-            if sample:
-                logging.info("Frame captured successfully.")
-                # Convert GStreamer sample to OpenCV frame
-                buffer = sample.get_buffer()
-                caps = sample.get_caps()
-                width = caps.get_structure(0).get_value("width")
-                height = caps.get_structure(0).get_value("height")
-                success, map_info = buffer.map(Gst.MapFlags.READ)
-                if success:
-                    frame = map_info.data
-                    # Convert raw data to OpenCV format
-                    img = np.ndarray((height, width, 3), dtype=np.uint8, buffer=frame)
-
-                    # Get current date and time
-                    now = datetime.datetime.now()
-
-                    # Create a subfolder for each day to organize images
-                    date_folder = now.strftime("%Y-%m-%d")
-                    daily_folder = os.path.join(output_folder, date_folder)
-                    os.makedirs(daily_folder, exist_ok=True)
-
-                    # Standardized naming convention: <experiment_id>_<timestamp>.png
-                    timestamp = now.strftime("%Y%m%d_%H%M%S")
-                    image_name = f"{experiment_id}_{timestamp}.png"
-                    image_path = os.path.join(daily_folder, image_name)
-
-                    # Save image with lossless compression (PNG format)
-                    if not cv2.imwrite(image_path, img):
-                        logging.error(f"Error: Failed to save image to {image_path}")
-                        return False, f"Failed to save image to {image_path}"
-                    logging.info(f"Saved {image_path}")
-                    return True, f"Successfully captured and saved {image_path}"
-                buffer.unmap(map_info)
-            else:
-                logging.error("Failed to capture frame: No sample returned.")
-
-            logging.error(f"Attempt {attempt + 1}: Failed to capture image.")
-            time.sleep(1)  # Wait for 1 second before retrying
+            source = camera if camera is not None else shared_camera(camera_device)
+            if source is None:
+                logging.error(f"Attempt {attempt + 1}: Camera {camera_device} is unavailable.")
+                time.sleep(1)  # Wait for 1 second before retrying
+                continue
+
+            # Get current date and time
+            now = datetime.datetime.now()
+
+            # Create a subfolder for each day to organize images
+            date_folder = now.strftime("%Y-%m-%d")
+            daily_folder = os.path.join(output_folder, date_folder)
+            os.makedirs(daily_folder, exist_ok=True)
+
+            # Standardized naming convention: <experiment_id>_<timestamp>.png
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
+            image_name = f"{experiment_id}_{timestamp}.png"
+            image_path = os.path.join(daily_folder, image_name)
+
+            # Encode straight from the mapped GStreamer buffer; nothing is copied
+            with source.mapped() as img:
+                if img is None:
+                    logging.error(f"Attempt {attempt + 1}: Failed to capture frame: No sample returned.")
+                    time.sleep(1)  # Wait for 1 second before retrying
+                    continue
+                # Save image with lossless compression (PNG format)
+                saved = cv2.imwrite(image_path, img)
+                del img
+            if not saved:
+                logging.error(f"Error: Failed to save image to {image_path}")
+                return False, f"Failed to save image to {image_path}"
+            logging.info(f"Saved {image_path}")
+            return True, f"Successfully captured and saved {image_path}"
         except Exception as e:
             logging.error(f"Attempt {attempt + 1}: Error during photo capture: {e}")
             time.sleep(1)  # Wait for 1 second before retrying
-        finally:
-            # Stop the pipeline
-            pipeline.set_state(Gst.State.NULL)
-            logging.info("Camera released.")
 
     logging.error(f"Failed to capture image after {max_retries} attempts.")
     return False, "Failed to capture image after multiple attempts."
 
 # Example usage
 if __name__ == "__main__":
+    from src.utils.log_pipeline import configure_logging
+    configure_logging()
+
     # Capture a single photo
     success, message = capture_single_photo(
         output_folder="/home/boss/BASE/dev_tpu/coral/dashboard/media/time_lapse",  # Correct full path
@@ -121,4 +116,5 @@ if __name__ == "__main__":
     if success:
         print(message)
     else:
-        print(f"Error: {message}")
\ No newline at end of file
+        print(f"Error: {message}")
+    release_cameras()
\ No newline at end of file
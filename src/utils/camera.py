@@ -2,9 +2,137 @@
 import cv2
 import logging
 import os
+import threading
 import time
+from collections import deque, namedtuple
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+import numpy as np
+
+from src.utils import metrics
+from src.utils.frame_pool import FramePool
+
+class SyntheticCamera:
+    """
+    cv2.VideoCapture stand-in that renders a moving test pattern.
+
+    Frames are paced to `fps` like a real device; pass fps=0 to return frames
+    as fast as they are requested (useful for throughput benchmarks).
+    """
+
+    def __init__(self, width=640, height=480, fps=30, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_index = 0
+        self.opened = True
+        self.next_frame_at = time.monotonic()
+        rng = np.random.default_rng(seed)
+        # Textured background rendered once; each frame only copies it and draws the moving object
+        gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+        noise = rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+        self.background = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        # Geometry and pacing are fixed at construction, like a device that ignores the request
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def _pace(self):
+        if self.fps > 0:
+            self.next_frame_at += 1.0 / self.fps
+            delay = self.next_frame_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                self.next_frame_at = time.monotonic()
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        self._pace()
+        if image is None or image.shape != self.background.shape:
+            image = np.empty_like(self.background)
+        np.copyto(image, self.background)
+        size = max(20, self.height // 6)
+        x = int((self.frame_index * 4) % max(1, self.width - size))
+        y = int(self.height / 2 + (self.height / 4) * np.sin(self.frame_index / 15.0)) - size // 2
+        cv2.rectangle(image, (x, y), (x + size, y + size), (30, 160, 60), -1)
+        cv2.putText(image, str(self.frame_index), (10, self.height - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        self.frame_index += 1
+        return True, image
+
+    def release(self):
+        self.opened = False
+
+class ReplayCamera(SyntheticCamera):
+    """cv2.VideoCapture stand-in that loops over a video file or a directory of images."""
+
+    def __init__(self, path, width=640, height=480, fps=30):
+        super().__init__(width, height, fps)
+        self.frames = []
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith((".png", ".jpg", ".jpeg")):
+                    frame = cv2.imread(os.path.join(path, name))
+                    if frame is not None:
+                        self.frames.append(cv2.resize(frame, (width, height)))
+        else:
+            capture = cv2.VideoCapture(path)
+            while True:
+                success, frame = capture.read()
+                if not success:
+                    break
+                self.frames.append(cv2.resize(frame, (width, height)))
+            capture.release()
+        self.opened = bool(self.frames)
+        if not self.frames:
+            logging.error(f"No frames found to replay at {path}")
+
+    def read(self, image=None):
+        if not self.opened:
+            return False, None
+        self._pace()
+        frame = self.frames[self.frame_index % len(self.frames)]
+        self.frame_index += 1
+        if image is None or image.shape != frame.shape:
+            return True, frame.copy()
+        np.copyto(image, frame)
+        return True, image
+
+def open_capture(index, width=640, height=480):
+    """
+    Open a capture source by name.
+
+    "synthetic[@fps]" and "replay:<path>[@fps]" select the stand-ins above;
+    "gst:<device|videotestsrc|pipeline>[@fps]" selects the GStreamer backend;
+    anything else is passed to cv2.VideoCapture with the V4L2 backend.
+    """
+    if isinstance(index, str) and index.startswith("gst:"):
+        # Imported here so that the GStreamer bindings are only needed when selected
+        from src.utils.gst_camera import GstCamera
+        source, _, fps = index[len("gst:"):].rpartition("@")
+        if not source or not fps.replace(".", "", 1).isdigit():
+            source, fps = index[len("gst:"):], ""
+        return GstCamera(source, width, height, float(fps) if fps else 30)
+    if isinstance(index, str) and (index.startswith("synthetic") or index.startswith("replay:")):
+        source, _, fps = index.partition("@")
+        fps = float(fps) if fps else 30
+        if source.startswith("replay:"):
+            return ReplayCamera(source[len("replay:"):], width, height, fps)
+        return SyntheticCamera(width, height, fps)
+    return cv2.VideoCapture(index, cv2.CAP_V4L2)
 
 class CameraManager:
     def __init__(self, index=0, width=640, height=480, retries=3, delay=3):
@@ -22,7 +150,7 @@ class CameraManager:
         for attempt in range(self.retries):
             try:
                 logging.info(f"Attempting to open camera at index {self.index}, attempt {attempt + 1}")
-                self.camera = cv2.VideoCapture(self.index, cv2.CAP_V4L2)
+                self.camera = open_capture(self.index, self.width, self.height)
                 if not self.camera.isOpened():
                     logging.error(f"Failed to open camera at index {self.index}")
                     self.camera = None
@@ -87,4 +215,154 @@ class CameraManager:
             diagnostics["tips"].append("Check for conflicting processes: sudo fuser /dev/video*")
             diagnostics["tips"].append("Test camera: ffmpeg -i /dev/video0 -f null -")
         logging.info(f"Camera diagnostics: {diagnostics}")
-        return diagnostics
\ No newline at end of file
+        return diagnostics
+
+FrameSnapshot = namedtuple("FrameSnapshot", ["frame", "timestamp", "sequence", "stale"])
+
+CAPTURE_SECONDS = metrics.stage_timer("capture")
+RECONNECTS = metrics.registry.counter("camera_reconnects_total", "Camera reopen attempts made by the supervisor")
+
+def placeholder_frame(width, height, text="Camera reconnecting..."):
+    """Grey frame with a centred message, shown when no camera frame exists yet."""
+    frame = np.full((height, width, 3), 64, dtype=np.uint8)
+    (text_width, text_height), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+    origin = ((width - text_width) // 2, (height + text_height) // 2)
+    cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX, 0.8, (220, 220, 220), 2)
+    return frame
+
+class CameraSupervisor:
+    """
+    Own the capture device on a dedicated thread and hand out the newest frame.
+
+    Read failures and missing devices are handled here with exponential
+    backoff, so request handlers and stream generators never sleep on device
+    recovery: they get the last good frame flagged as stale, or no frame.
+    """
+
+    def __init__(self, manager, stale_after=1.0, max_failures=3, initial_backoff=0.5, max_backoff=30.0,
+                 history_size=10, pool_buffers=None, name="default"):
+        # The supervisor does its own retrying; make each open attempt a single non-sleeping try
+        manager.retries = 1
+        manager.delay = 0
+        self.manager = manager
+        self.name = name
+        self.stale_after = stale_after
+        self.max_failures = max_failures
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.frame = None
+        self.frame_time = 0.0
+        self.sequence = 0
+        self.state = "starting"
+        self.reconnects = 0
+        # Newest frames kept for snapshot bursts
+        self.history = deque(maxlen=history_size)
+        # Capture reads into a buffer nothing else references; published frames are never written again.
+        # Room for the history, the current frame and a few consumers still holding older frames.
+        self.pool = FramePool(history_size + 8 if pool_buffers is None else pool_buffers, name=name)
+        self.frame_shape = None
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name=f"camera-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        self.manager.release()
+
+    def _run(self):
+        backoff = self.initial_backoff
+        failures = 0
+        while not self.stop_event.is_set():
+            camera = self.manager.get_camera()
+            if camera is None:
+                self._set_state("reconnecting")
+                logging.warning(f"Camera unavailable; retrying in {backoff:.1f}s")
+                RECONNECTS.inc()
+                self.reconnects += 1
+                self.stop_event.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            buffer = self.pool.acquire(self.frame_shape) if self.frame_shape else None
+            with CAPTURE_SECONDS.time():
+                ret, frame = camera.read(buffer)
+            buffer = None
+            if not ret or frame is None:
+                failures += 1
+                if failures >= self.max_failures:
+                    logging.warning(f"Camera returned {failures} bad frames; reopening")
+                    self.manager.release()
+                    failures = 0
+                    self._set_state("reconnecting")
+                continue
+
+            failures = 0
+            backoff = self.initial_backoff
+            # The first read (or one after the camera changed size) tells the pool what to allocate
+            self.frame_shape = frame.shape
+            with self.condition:
+                self.frame = frame
+                self.frame_time = time.time()
+                self.sequence += 1
+                self.state = "streaming"
+                self.history.append(FrameSnapshot(frame, self.frame_time, self.sequence, False))
+                self.condition.notify_all()
+
+    def _set_state(self, state):
+        with self.condition:
+            self.state = state
+
+    def _snapshot(self):
+        stale = (self.state != "streaming" or time.time() - self.frame_time > self.stale_after)
+        return FrameSnapshot(self.frame, self.frame_time, self.sequence, stale)
+
+    def get_frame(self):
+        """Return the newest frame immediately; frame is None if the camera never delivered one."""
+        with self.condition:
+            return self._snapshot()
+
+    def wait_frame(self, after_sequence=0, timeout=1.0):
+        """
+        Block until a frame newer than `after_sequence` arrives or `timeout` expires.
+        :return: FrameSnapshot; on timeout it holds the last frame, marked stale.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.sequence > after_sequence or self.stop_event.is_set(),
+                timeout
+            )
+            return self._snapshot()
+
+    def recent_frames(self, count=1):
+        """Return copies of up to `count` of the newest good frames, oldest first."""
+        with self.condition:
+            frames = list(self.history)[-count:] if count > 0 else []
+            if self.state != "streaming" or time.time() - self.frame_time > self.stale_after:
+                frames = [snapshot._replace(stale=True) for snapshot in frames]
+        # Copy outside the lock; holding the frames keeps the pool from reusing them
+        return [snapshot._replace(frame=snapshot.frame.copy()) for snapshot in frames]
+
+    def is_healthy(self):
+        return not self.get_frame().stale
+
+    def status(self):
+        snapshot = self.get_frame()
+        return {
+            "state": self.state,
+            "stale": snapshot.stale,
+            "frame_age": round(time.time() - snapshot.timestamp, 3) if snapshot.frame is not None else None,
+            "frames": snapshot.sequence,
+            "reconnects": self.reconnects,
+            "frame_pool": self.pool.stats(),
+        }
+
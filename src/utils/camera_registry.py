@@ -0,0 +1,133 @@
+# src/utils/camera_registry.py
+import logging
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+CAMERA_NAME = re.compile(r"[A-Za-z0-9_-]+")
+V4L2_DEVICE = re.compile(r"/dev/video\d+")
+SOURCE_PREFIXES = ("gst:", "replay:", "synthetic")
+
+def parse_cameras(spec: str, default_device: str) -> Dict[str, str]:
+    """
+    Parse a camera list such as "bench1=/dev/video0,bench2=/dev/video2".
+    :param spec: Comma-separated name=device pairs; empty means one camera named "default".
+    :param default_device: Device for the single-camera setup (CAMERA_DEVICE).
+    :return: Ordered dictionary of camera name to device; the first entry is the default camera.
+    """
+    cameras = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, device = item.partition("=")
+        name, device = name.strip(), device.strip()
+        if not CAMERA_NAME.fullmatch(name) or not device:
+            raise ValueError(f"Camera entry '{item}' must be name=device with a name of letters, digits, _ or -")
+        if name in cameras:
+            raise ValueError(f"Camera {name} is listed twice")
+        cameras[name] = device
+    return cameras or {"default": default_device}
+
+def check_device(device: str, configured, allow_sources: bool = False) -> str:
+    """
+    Validate a device asked for at runtime (POST /cameras) and return it normalised.
+
+    Only V4L2 devices (/dev/videoN, or a bare index N) and devices already in
+    the configured camera list are accepted. gst: and replay: sources can build
+    arbitrary GStreamer pipelines or read arbitrary paths, so they (and the
+    synthetic stand-in) need `allow_sources` (CAMERA_ALLOW_SOURCES=1).
+    :raises ValueError: If the device is not allowed.
+    """
+    device = (device or "").strip()
+    if device.isdigit():
+        device = f"/dev/video{device}"
+    if V4L2_DEVICE.fullmatch(device) or device in configured:
+        return device
+    if allow_sources and device.startswith(SOURCE_PREFIXES):
+        return device
+    raise ValueError(f"Device {device or '(empty)'} is not allowed; use /dev/videoN or a configured camera device")
+
+class CameraRegistry:
+    """
+    One CameraSupervisor per device, each with its own capture thread and frame pool.
+
+    Cameras share nothing on the capture side, so adding one never slows the
+    others' capture or streams. The first camera is the default that the
+    single-camera routes (/video_feed, /snapshot, /inference_data) use.
+    Listeners are called with (name, supervisor or None) when a camera is
+    added or removed, so stream servers and schedulers can follow along.
+    """
+
+    def __init__(self, factory: Callable[[str, str], object]):
+        self.factory = factory
+        self.cameras: Dict[str, object] = {}
+        self.devices: Dict[str, str] = {}
+        self.listeners: List[Callable[[str, Optional[object]], None]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def default_name(self) -> Optional[str]:
+        with self.lock:
+            return next(iter(self.cameras), None)
+
+    def add(self, name: str, device: str):
+        """Start capturing from `device` under `name` and return its supervisor."""
+        if not CAMERA_NAME.fullmatch(name or ""):
+            raise ValueError("Camera names may only contain letters, digits, _ and -")
+        with self.lock:
+            if name in self.cameras:
+                raise ValueError(f"Camera {name} already exists")
+            # A V4L2 device can only be opened once; synthetic and replay sources can be repeated
+            if "/dev/" in device and device in self.devices.values():
+                raise ValueError(f"Device {device} is already in use")
+            supervisor = self.factory(name, device)
+            self.cameras[name] = supervisor
+            self.devices[name] = device
+            listeners = list(self.listeners)
+        logging.info(f"Camera {name} added on {device}")
+        for listener in listeners:
+            listener(name, supervisor)
+        return supervisor
+
+    def remove(self, name: str) -> bool:
+        with self.lock:
+            if name not in self.cameras:
+                return False
+            if name == next(iter(self.cameras)):
+                raise ValueError("The default camera cannot be removed")
+            supervisor = self.cameras.pop(name)
+            self.devices.pop(name)
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(name, None)
+        supervisor.stop()
+        logging.info(f"Camera {name} removed")
+        return True
+
+    def camera(self, name: Optional[str] = None):
+        """Return the supervisor for `name` (the default camera if None), or None."""
+        with self.lock:
+            if name is None:
+                return next(iter(self.cameras.values()), None)
+            return self.cameras.get(name)
+
+    def names(self) -> List[str]:
+        with self.lock:
+            return list(self.cameras)
+
+    def subscribe(self, listener: Callable[[str, Optional[object]], None]):
+        with self.lock:
+            self.listeners.append(listener)
+
+    def stop(self):
+        with self.lock:
+            supervisors = list(self.cameras.values())
+        for supervisor in supervisors:
+            supervisor.stop()
+
+    def status(self) -> Dict:
+        with self.lock:
+            cameras = list(self.cameras.items())
+            devices = dict(self.devices)
+        return {
+            "default": cameras[0][0] if cameras else None,
+            "cameras": {name: dict(device=devices[name], **supervisor.status()) for name, supervisor in cameras},
+        }
@@ -0,0 +1,177 @@
+# src/utils/db_pool.py
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dbutils.pooled_db import PooledDB
+
+from src.utils import metrics
+
+CHECKOUT_SECONDS = metrics.registry.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+CHECKOUTS = metrics.registry.counter("db_pool_checkouts_total", "Connections handed out by the pool")
+TIMEOUTS = metrics.registry.counter("db_pool_timeouts_total", "Checkouts that gave up because the pool was exhausted")
+FAILURES = metrics.registry.counter("db_pool_connect_failures_total", "Checkouts that failed to open or revive a connection")
+PREPARED = {
+    outcome: metrics.registry.counter("db_prepared_cursors_total", "Prepared cursor cache lookups",
+                                      labels={"outcome": outcome})
+    for outcome in ("hit", "miss")
+}
+
+def _ms(seconds: float) -> Optional[float]:
+    return None if math.isnan(seconds) else round(seconds * 1000, 3)
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the checkout timeout."""
+
+class PooledConnection:
+    """
+    A checked-out connection. Behaves like the DB-API connection and returns
+    its slot to the pool on `close()`.
+    """
+
+    def __init__(self, pool: "InstrumentedPool", connection):
+        self._pool = pool
+        self._connection = connection
+        self._closed = False
+
+    def prepared_cursor(self, query: str):
+        """
+        Return a cursor for `query` that is reused on every later checkout of
+        the same physical connection, so the server parses the statement once.
+        """
+        if self._pool.prepared_cache_size <= 0:
+            return self._connection.cursor()
+        steady = self._connection._con
+        cache = getattr(steady, "_prepared_cursors", None)
+        # A reconnect (pre-ping or failed query) invalidates statements prepared on the old session
+        if cache is None or cache.session is not steady._con:
+            cache = steady._prepared_cursors = _StatementCache(steady._con)
+        cursor = cache.get(query)
+        if cursor is not None:
+            PREPARED["hit"].inc()
+            return cursor
+        PREPARED["miss"].inc()
+        cursor = self._connection.cursor(prepared=True)
+        evicted = cache.put(query, cursor, self._pool.prepared_cache_size)
+        if evicted is not None:
+            try:
+                evicted.close()
+            except Exception:
+                pass
+        return cursor
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._connection.close()
+            self._pool._release()
+
+    def __del__(self):
+        # A connection dropped without close() must not leak its slot
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, attr: str):
+        return getattr(self._connection, attr)
+
+class _StatementCache(OrderedDict):
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    def get(self, query: str):
+        cursor = super().get(query)
+        if cursor is not None:
+            self.move_to_end(query)
+        return cursor
+
+    def put(self, query: str, cursor, size: int):
+        self[query] = cursor
+        if len(self) > size:
+            return self.popitem(last=False)[1]
+        return None
+
+class InstrumentedPool:
+    """
+    PooledDB with bounded, timed checkouts and usage statistics.
+
+    `min_cached` connections are opened up front so the first requests don't
+    pay for the handshake, and `ping` is passed through to DBUtils so a
+    connection the server dropped is revived on checkout instead of failing
+    the query. Checkouts wait at most `timeout` seconds for a free slot and
+    then raise PoolTimeout.
+    """
+
+    def __init__(self, creator, min_cached: int = 1, max_cached: int = 5, max_connections: int = 5,
+                 ping: int = 1, timeout: float = 5.0, prepared_cache_size: int = 32, **connect_kwargs):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.prepared_cache_size = prepared_cache_size
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.max_wait = 0.0
+        self.pool = PooledDB(
+            creator=creator,
+            mincached=min_cached,
+            maxcached=max_cached,
+            maxconnections=max_connections,
+            blocking=True,
+            ping=ping,
+            **connect_kwargs
+        )
+
+    def connection(self, timeout: Optional[float] = None) -> PooledConnection:
+        started = time.perf_counter()
+        if not self.slots.acquire(timeout=self.timeout if timeout is None else timeout):
+            TIMEOUTS.inc()
+            raise PoolTimeout(f"No database connection free after {time.perf_counter() - started:.2f}s "
+                              f"({self.max_connections} in use)")
+        try:
+            connection = self.pool.connection()
+        except Exception:
+            FAILURES.inc()
+            self.slots.release()
+            raise
+        waited = time.perf_counter() - started
+        CHECKOUT_SECONDS.observe(waited)
+        CHECKOUTS.inc()
+        with self.lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.max_wait = max(self.max_wait, waited)
+        return PooledConnection(self, connection)
+
+    def _release(self):
+        with self.lock:
+            self.in_use -= 1
+        self.slots.release()
+
+    def idle(self) -> int:
+        return len(self.pool._idle_cache)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            in_use, peak, max_wait = self.in_use, self.peak_in_use, self.max_wait
+        return {
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "peak_in_use": peak,
+            "idle": self.idle(),
+            "checkouts": int(CHECKOUTS.value),
+            "timeouts": int(TIMEOUTS.value),
+            "connect_failures": int(FAILURES.value),
+            "wait_p50_ms": _ms(CHECKOUT_SECONDS.quantile(0.5)),
+            "wait_p99_ms": _ms(CHECKOUT_SECONDS.quantile(0.99)),
+            "wait_max_ms": _ms(max_wait),
+            "prepared_hits": int(PREPARED["hit"].value),
+            "prepared_misses": int(PREPARED["miss"].value),
+        }
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,195 @@
+# src/utils/detection_store.py
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import metrics
+
+Detection = namedtuple("Detection", ["timestamp", "category", "label_id", "label", "confidence"])
+
+DETECTION_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS detections (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        detected_at DATETIME NOT NULL,
+        category VARCHAR(32) NOT NULL,
+        label_id INT NOT NULL,
+        label VARCHAR(255),
+        confidence FLOAT
+    ) ENGINE=InnoDB
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_detections_time ON detections (detected_at)",
+    "CREATE INDEX IF NOT EXISTS idx_detections_label_time ON detections (category, label_id, detected_at)",
+    """
+    CREATE TABLE IF NOT EXISTS detection_rollups (
+        bucket DATETIME NOT NULL,
+        category VARCHAR(32) NOT NULL,
+        label_id INT NOT NULL,
+        label VARCHAR(255),
+        detection_count INT NOT NULL,
+        max_confidence FLOAT,
+        PRIMARY KEY (bucket, category, label_id)
+    ) ENGINE=InnoDB
+    """,
+]
+
+INSERT_DETECTIONS = """
+    INSERT INTO detections (detected_at, category, label_id, label, confidence)
+    VALUES (FROM_UNIXTIME(%s), %s, %s, %s, %s)
+"""
+
+# Hourly rollups are maintained on write, so summaries never scan raw detections
+UPSERT_ROLLUPS = """
+    INSERT INTO detection_rollups (bucket, category, label_id, label, detection_count, max_confidence)
+    VALUES (FROM_UNIXTIME(%s), %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        detection_count = detection_count + VALUES(detection_count),
+        max_confidence = GREATEST(max_confidence, VALUES(max_confidence))
+"""
+
+WRITTEN = metrics.registry.counter("detections_written_total", "Detections persisted to the database")
+DROPPED = metrics.registry.counter("detections_dropped_total", "Detections lost to a full queue or failed write")
+FLUSH_SECONDS = metrics.stage_timer("detection_flush")
+
+def hour_start(timestamp: float) -> float:
+    """
+    Unix time of the start of the local hour containing `timestamp`.
+    Buckets are stored with FROM_UNIXTIME, which renders local time, so flooring
+    on the UTC epoch would put them at :30 or :45 in zones with such offsets.
+    """
+    return datetime.fromtimestamp(timestamp).replace(minute=0, second=0, microsecond=0).timestamp()
+
+def rollup(detections: List[Detection]) -> List[Tuple]:
+    """Collapse detections into (hour bucket, category, label_id, label, count, max confidence) rows."""
+    buckets: Dict[Tuple, List] = {}
+    for detection in detections:
+        hour = hour_start(detection.timestamp)
+        key = (hour, detection.category, detection.label_id)
+        entry = buckets.get(key)
+        if entry is None:
+            buckets[key] = [detection.label, 1, detection.confidence]
+        else:
+            entry[1] += 1
+            entry[2] = max(entry[2], detection.confidence)
+    return [key + tuple(entry) for key, entry in buckets.items()]
+
+class DetectionWriter:
+    """
+    Persist detections from a background thread in batches.
+
+    `submit()` never touches the database; rows are flushed every
+    `flush_interval` seconds or once `batch_size` are pending, together with
+    the matching hourly rollup updates in the same transaction.
+    """
+
+    def __init__(self, db, batch_size: int = 200, flush_interval: float = 2.0, max_pending: int = 10000):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.stop_event = threading.Event()
+        self.thread = None
+        metrics.registry.gauge("detections_queue_depth", "Detections waiting to be written").set_function(self.queue.qsize)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="detection-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def submit(self, detections: List[Detection]):
+        for detection in detections:
+            try:
+                self.queue.put_nowait(detection)
+            except queue.Full:
+                DROPPED.inc()
+
+    def _drain(self, deadline: float) -> List[Detection]:
+        batch = []
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, timeout)) if timeout > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, batch: List[Detection]) -> bool:
+        if not batch:
+            return True
+        with FLUSH_SECONDS.time():
+            ok = self.db.execute_batches([
+                (INSERT_DETECTIONS, [tuple(detection) for detection in batch]),
+                (UPSERT_ROLLUPS, rollup(batch)),
+            ])
+        if ok:
+            WRITTEN.inc(len(batch))
+        else:
+            DROPPED.inc(len(batch))
+            logging.error(f"Dropped {len(batch)} detections after a failed write")
+        return ok
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.flush(self._drain(time.monotonic() + self.flush_interval))
+        # Final flush so a clean shutdown loses nothing
+        while not self.queue.empty():
+            self.flush(self._drain(time.monotonic()))
+
+def summarize(db, period: str = "hour", start: Optional[float] = None, end: Optional[float] = None,
+              category: Optional[str] = None, label: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    Count detections and max confidence per species per hour or day from the rollup table.
+    :return: List of {"bucket", "category", "label_id", "label", "count", "max_confidence"}, or None on error.
+    """
+    if period not in ("hour", "day"):
+        raise ValueError("period must be hour or day")
+    bucket = "bucket" if period == "hour" else "DATE(bucket)"
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("bucket >= FROM_UNIXTIME(%s)")
+        params.append(hour_start(start))
+    if end is not None:
+        conditions.append("bucket < FROM_UNIXTIME(%s)")
+        params.append(end)
+    if category:
+        conditions.append("category = %s")
+        params.append(category)
+    if label:
+        conditions.append("label = %s")
+        params.append(label)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = db.execute_query(
+        f"""
+        SELECT {bucket} AS period, category, label_id, MAX(label), SUM(detection_count), MAX(max_confidence)
+        FROM detection_rollups
+        {where}
+        GROUP BY period, category, label_id
+        ORDER BY period, SUM(detection_count) DESC
+        """,
+        tuple(params)
+    )
+    if rows is None:
+        return None
+    return [
+        {
+            "bucket": str(row[0]),
+            "category": row[1],
+            "label_id": int(row[2]),
+            "label": row[3],
+            "count": int(row[4]),
+            "max_confidence": float(row[5]) if row[5] is not None else None,
+        }
+        for row in rows
+    ]
@@ -1,41 +1,20 @@
-import tflite_runtime.interpreter as tflite
 import logging
 import os
 
-# Configure logging to match app.py
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()]
-)
-
-def load_models(models):
-    """Load all interpreters and labels for Edge TPU classification."""
+def load_models(models, registry=None):
+    """
+    Load all interpreters and labels for Edge TPU classification.
+    Each category's model files go through the model registry, so the backend and thread count it chose
+    (Edge TPU, XNNPACK or builtin CPU) are used here too.
+    :param registry: ModelRegistry to choose with; a fresh one without a disk cache by default.
+    """
+    # Imported here so that importing src.models does not load the TFLite runtime
+    from src.utils.model_registry import ModelRegistry
+
+    registry = registry or ModelRegistry()
     interpreters = {}
     labels = {}
 
-    # Try standard Edge TPU library locations
-    delegate_paths = [
-        "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1.0",
-        "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1",
-        "/usr/lib/libedgetpu.so.1",
-        "/usr/local/lib/libedgetpu.so.1"
-    ]
-
-    delegate = None
-    for path in delegate_paths:
-        if os.path.exists(path):
-            try:
-                delegate = tflite.load_delegate(path)
-                logging.info(f"Found Edge TPU delegate at {path}")
-                break
-            except ValueError as e:
-                logging.warning(f"Failed to load delegate from {path}: {e}")
-                continue
-
-    if delegate is None:
-        logging.warning("No valid Edge TPU delegate found; using CPU for inference")
-
     for category, paths in models.items():
         model_path = paths.get("model_path")
         label_path = paths.get("label_path")
@@ -48,20 +27,17 @@ def load_models(models):
             logging.error(f"Label file not found for {category}: {label_path}")
             continue
 
+        variants = {"edgetpu" if "_edgetpu" in os.path.basename(model_path) else "cpu": model_path}
         try:
-            # Initialize interpreter with Edge TPU delegate if applicable
-            interpreter = tflite.Interpreter(
-                model_path=model_path,
-                experimental_delegates=[delegate] if delegate and "_edgetpu" in model_path else []
-            )
-            interpreter.allocate_tensors()
+            interpreter, category_labels = registry.load(category, variants=variants, label_path=label_path)
+            if interpreter is None:
+                logging.error(f"No working backend for {category} model {model_path}")
+                continue
             interpreters[category] = interpreter
-
-            # Load and clean labels
-            with open(label_path, "r") as f:
-                labels[category] = [line.strip() for line in f if line.strip()]
-
-            logging.info(f"Model loaded successfully for {category} classification")
+            labels[category] = category_labels
+            choice = registry.choices[category]
+            logging.info(f"Model loaded successfully for {category} classification "
+                         f"({choice.backend}, threads={choice.num_threads})")
         except ValueError as e:
             logging.error(f"Failed to initialize interpreter for {category}: {e}")
         except IOError as e:
@@ -72,6 +48,9 @@ def load_models(models):
     return interpreters, labels
 
 if __name__ == "__main__":
+    from src.utils.log_pipeline import configure_logging
+    configure_logging()
+
     test_models = {
         "plants": {
             "model_path": "data_model/mobilenet_v2_1.0_224_inat_plant_quant.tflite",
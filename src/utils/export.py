@@ -0,0 +1,56 @@
+# src/utils/export.py
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Sequence
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
+
+def csv_chunks(columns: Sequence[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as CSV, one output block per input chunk, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def ndjson_chunks(columns: Sequence[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as newline-delimited JSON objects."""
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, (_plain(value) for value in row))), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member without buffering it."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def encode(columns: Sequence[str], chunks: Iterable[List[tuple]], fmt: str, compress: bool) -> Iterator[bytes]:
+    stream = csv_chunks(columns, chunks) if fmt == "csv" else ndjson_chunks(columns, chunks)
+    return gzip_chunks(stream) if compress else stream
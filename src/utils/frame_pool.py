@@ -0,0 +1,106 @@
+# src/utils/frame_pool.py
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils import metrics
+
+REUSED = metrics.registry.counter("frame_pool_reused_total", "Frame buffers handed out again from the pool")
+ALLOCATED = metrics.registry.counter("frame_pool_allocated_total", "Frame buffers the pool had to allocate")
+
+def _refcount(buffers: List[np.ndarray], index: int) -> int:
+    return sys.getrefcount(buffers[index])
+
+# What _refcount() reports for a buffer only the pool's list holds; measured rather than
+# assumed, since what getrefcount() counts varies between interpreter versions
+_UNREFERENCED = _refcount([np.empty(1)], 0)
+
+class FramePool:
+    """
+    Reusable capture buffers for one frame shape.
+
+    Ownership follows CPython's own reference count: a buffer is handed out
+    again only once nothing outside the pool references it (no published
+    frame, queued snapshot, view or in-flight encode), so consumers can hold
+    frames as long as they like without an explicit release. When every
+    buffer is busy a new one is allocated, up to `max_buffers`; past that
+    the allocation is left to the caller and the buffer is not pooled.
+    """
+
+    def __init__(self, max_buffers: int = 16, name: str = "default"):
+        self.max_buffers = max_buffers
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.dtype = np.uint8
+        self.buffers: List[np.ndarray] = []
+        self.lock = threading.Lock()
+        metrics.registry.gauge("frame_pool_buffers", "Capture buffers held by the frame pool",
+                               labels={"pool": name}).set_function(lambda: len(self.buffers))
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> Optional[np.ndarray]:
+        """
+        Return a buffer of `shape` that no one else references, or None if the pool is full.
+        A new shape (e.g. the camera renegotiated) drops the old buffers.
+        """
+        if self.max_buffers <= 0:
+            return None
+        with self.lock:
+            if shape != self.shape or dtype != self.dtype:
+                self.shape, self.dtype, self.buffers = shape, dtype, []
+            for index in range(len(self.buffers)):
+                if _refcount(self.buffers, index) <= _UNREFERENCED:
+                    REUSED.inc()
+                    return self.buffers[index]
+            if len(self.buffers) >= self.max_buffers:
+                return None
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffers.append(buffer)
+        ALLOCATED.inc()
+        return buffer
+
+    def stats(self) -> Dict:
+        with self.lock:
+            free = sum(1 for index in range(len(self.buffers)) if _refcount(self.buffers, index) <= _UNREFERENCED)
+            return {
+                "shape": list(self.shape) if self.shape else None,
+                "buffers": len(self.buffers),
+                "max_buffers": self.max_buffers,
+                "free": free,
+                "reused": int(REUSED.value),
+                "allocated": int(ALLOCATED.value),
+            }
+
+_scratch = threading.local()
+
+def scratch(name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    """
+    Per-thread working buffer for intermediate results (resize, colour conversion).
+    Its contents are only valid until the same thread asks for `name` again.
+    """
+    buffers = getattr(_scratch, "buffers", None)
+    if buffers is None:
+        buffers = _scratch.buffers = {}
+    buffer = buffers.get(name)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = buffers[name] = np.empty(shape, dtype=dtype)
+    return buffer
+
+def model_input(frame: np.ndarray, width: int, height: int, name: str = "model_input") -> np.ndarray:
+    """
+    Resize a BGR frame and convert it to an RGB (1, height, width, 3) uint8 batch, in scratch buffers.
+    Replaces resize + cvtColor + expand_dims + astype, which allocated three arrays per frame.
+    """
+    resized = cv2.resize(frame, (width, height), dst=scratch(name + "_bgr", (height, width, 3)))
+    batch = scratch(name, (1, height, width, 3))
+    cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=batch[0])
+    return batch
+
+def encode_jpeg(frame: np.ndarray, quality: int) -> Optional[memoryview]:
+    """
+    JPEG-encode a frame; returns a byte view of OpenCV's output instead of copying it with tobytes().
+    bytes concatenation, len() and socket sends all accept the view.
+    """
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return memoryview(buffer).cast("B") if ok else None
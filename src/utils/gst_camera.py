@@ -0,0 +1,178 @@
+# src/utils/gst_camera.py
+import logging
+import threading
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+import gi
+gi.require_version('Gst', '1.0')
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GstVideo
+
+_init_lock = threading.Lock()
+_initialized = False
+
+def init_gstreamer():
+    """Gst.init() once per process, however many cameras are opened."""
+    global _initialized
+    with _init_lock:
+        if not _initialized:
+            Gst.init(None)
+            _initialized = True
+
+def build_pipeline(source, width=640, height=480, fps=30, input_format="mjpeg", max_buffers=2):
+    """
+    GStreamer pipeline description ending in a BGR appsink named "sink".
+
+    `source` is a V4L2 device path, "videotestsrc" (a live test pattern, for
+    running without a camera) or a pipeline fragment containing "!" that is
+    used as-is. `input_format` is "mjpeg", "raw" (any raw format) or a raw
+    pixel format such as "YUY2". With `fps` None the camera picks its rate;
+    the negotiated one is read back from the caps. appsink keeps at most
+    `max_buffers` frames and drops the oldest, so a slow reader always gets
+    a recent frame and never backs up the camera.
+    """
+    size = f"width={width},height={height}" + (f",framerate={int(round(fps))}/1" if fps else "")
+    if "!" in source:
+        head = source
+    elif source == "videotestsrc":
+        head = f"videotestsrc is-live=true pattern=ball ! video/x-raw,{size}"
+    elif input_format == "mjpeg":
+        # Most USB cameras only reach full frame rate at 640x480 and above in MJPEG
+        head = f"v4l2src device={source} ! image/jpeg,{size} ! jpegdec"
+    elif input_format == "raw":
+        head = f"v4l2src device={source} ! video/x-raw,{size}"
+    else:
+        head = f"v4l2src device={source} ! video/x-raw,format={input_format},{size}"
+    return (
+        f"{head} ! videoconvert ! video/x-raw,format=BGR ! "
+        f"appsink name=sink max-buffers={max_buffers} drop=true sync=false emit-signals=false"
+    )
+
+class GstCamera:
+    """
+    cv2.VideoCapture-compatible camera backed by one long-lived GStreamer pipeline.
+
+    The pipeline is built and started once; every read pulls the newest
+    sample from the appsink and maps its buffer straight into a NumPy view
+    using the negotiated width, height and row stride. `read()` copies that
+    view once into the caller's (or a fresh) array and unmaps the buffer
+    right away so GStreamer can recycle it; `mapped()` hands out the view
+    itself for consumers that are done with the frame before the block ends.
+    """
+
+    def __init__(self, source="/dev/video0", width=640, height=480, fps=30, input_format="mjpeg",
+                 max_buffers=2, timeout=2.0):
+        init_gstreamer()
+        self.source = source
+        self.fps = fps or 0
+        self.timeout_ns = int(timeout * Gst.SECOND)
+        self.width = width
+        self.height = height
+        self.stride = None
+        self.opened = False
+        self.description = build_pipeline(source, width, height, fps, input_format, max_buffers)
+        try:
+            self.pipeline = Gst.parse_launch(self.description)
+        except Exception as e:
+            logging.error(f"Could not build GStreamer pipeline '{self.description}': {e}")
+            self.pipeline = None
+            return
+        self.sink = self.pipeline.get_by_name("sink")
+        self.bus = self.pipeline.get_bus()
+        if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            logging.error(f"GStreamer pipeline for {source} failed to start")
+            self.release()
+            return
+        self.opened = True
+        # Pull one sample so the negotiated caps are known before the first read
+        sample = self._pull()
+        if sample is None:
+            logging.error(f"GStreamer pipeline for {source} produced no frames")
+            self.release()
+            return
+        self._negotiate(sample)
+        logging.info(f"GStreamer capture on {source}: {self.width}x{self.height} BGR, stride {self.stride}")
+
+    def _negotiate(self, sample):
+        # Size, rate and row stride (BGR rows may be padded) as the pipeline negotiated them
+        info = GstVideo.VideoInfo.new_from_caps(sample.get_caps())
+        self.width = info.width
+        self.height = info.height
+        self.stride = info.stride[0]
+        if info.fps_n and info.fps_d:
+            self.fps = info.fps_n / info.fps_d
+
+    def _pull(self):
+        sample = self.sink.emit("try-pull-sample", self.timeout_ns)
+        if sample is None:
+            message = self.bus.pop_filtered(Gst.MessageType.ERROR | Gst.MessageType.EOS)
+            if message is not None:
+                if message.type == Gst.MessageType.ERROR:
+                    error, _ = message.parse_error()
+                    logging.error(f"GStreamer capture on {self.source} failed: {error.message}")
+                else:
+                    logging.error(f"GStreamer capture on {self.source} reached end of stream")
+                # isOpened() turns False so CameraManager reopens the pipeline
+                self.opened = False
+        return sample
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        # Geometry and rate are negotiated when the pipeline starts
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    @contextmanager
+    def mapped(self):
+        """
+        Yield the newest frame as a read-only view of the GStreamer buffer, or None.
+        The view is only valid inside the block, and the caller must not keep a
+        reference to it past the block: the buffer is unmapped on exit.
+        """
+        sample = self._pull() if self.opened else None
+        if sample is None:
+            yield None
+            return
+        buffer = sample.get_buffer()
+        success, map_info = buffer.map(Gst.MapFlags.READ)
+        if not success:
+            yield None
+            return
+        frame = None
+        try:
+            frame = np.ndarray((self.height, self.width, 3), dtype=np.uint8, buffer=map_info.data,
+                               strides=(self.stride, 3, 1))
+            yield frame
+        finally:
+            # Drop the view before unmapping; the memory goes back to the pipeline
+            del frame
+            buffer.unmap(map_info)
+
+    def read(self, image=None):
+        with self.mapped() as frame:
+            if frame is None:
+                return False, None
+            if image is None or image.shape != frame.shape:
+                image = np.empty(frame.shape, dtype=np.uint8)
+            np.copyto(image, frame)
+            del frame
+        return True, image
+
+    def release(self):
+        self.opened = False
+        if self.pipeline is not None:
+            self.pipeline.set_state(Gst.State.NULL)
+            self.pipeline = None
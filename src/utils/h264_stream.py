@@ -0,0 +1,243 @@
+# src/utils/h264_stream.py
+import io
+import logging
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import av
+
+from src.utils import metrics
+
+FRAGMENT_BYTES = metrics.registry.counter("h264_fragment_bytes_total", "Encoded fMP4 bytes produced by the shared encoder")
+BYTES_SENT = metrics.registry.counter("h264_bytes_sent_total", "fMP4 bytes sent to viewers")
+ENCODE_SECONDS = metrics.stage_timer("h264_encode")
+
+class FragmentSink(io.RawIOBase):
+    """
+    Write target for the MP4 muxer that splits its output into top-level boxes.
+
+    ftyp+moov become the init segment; every moof+mdat pair is one fragment.
+    With movflags=frag_keyframe each fragment starts on a keyframe, so a new
+    viewer can join at any fragment boundary.
+    """
+
+    def __init__(self, on_init, on_fragment):
+        super().__init__()
+        self.on_init = on_init
+        self.on_fragment = on_fragment
+        self.pending = bytearray()
+        self.init_segment = bytearray()
+        self.fragment = bytearray()
+        self.init_done = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.pending += data
+        while len(self.pending) >= 8:
+            size = int.from_bytes(self.pending[:4], "big")
+            kind = bytes(self.pending[4:8])
+            if size < 8:
+                raise ValueError(f"Unsupported MP4 box size {size} for {kind!r}")
+            if len(self.pending) < size:
+                break
+            box = bytes(self.pending[:size])
+            del self.pending[:size]
+            self._box(kind, box)
+        return len(data)
+
+    def _box(self, kind: bytes, box: bytes):
+        if not self.init_done:
+            if kind in (b"ftyp", b"moov"):
+                self.init_segment += box
+                if kind == b"moov":
+                    self.init_done = True
+                    self.on_init(bytes(self.init_segment))
+            return
+        if kind == b"moof":
+            self.fragment = bytearray(box)
+        elif kind == b"mdat" and self.fragment:
+            self.fragment += box
+            self.on_fragment(bytes(self.fragment))
+            self.fragment = bytearray()
+
+class H264Broadcaster:
+    """
+    Encode the supervised camera once and share the fragmented MP4 with every viewer.
+
+    The encoder thread starts with the first viewer and stops after
+    `idle_timeout` seconds without one. Viewers that fall more than
+    `max_lag` fragments behind skip ahead to the newest fragment, which is
+    safe because every fragment begins with a keyframe.
+    """
+
+    def __init__(self, supervisor, fps: int, bitrate: int = 1_000_000, gop: Optional[int] = None,
+                 encoder: str = "libx264", idle_timeout: float = 10.0, max_lag: int = 3):
+        self.supervisor = supervisor
+        self.fps = fps
+        self.bitrate = bitrate
+        self.gop = gop or fps
+        self.encoder = encoder
+        self.idle_timeout = idle_timeout
+        self.max_lag = max_lag
+        self.init_segment: Optional[bytes] = None
+        self.fragments: List[Tuple[int, bytes]] = []
+        self.fragment_sequence = 0
+        self.viewers = 0
+        self.last_viewer_left = time.monotonic()
+        self.running = False
+        self.condition = threading.Condition()
+        self.start_lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def _on_init(self, segment: bytes):
+        with self.condition:
+            self.init_segment = segment
+            self.condition.notify_all()
+
+    def _on_fragment(self, fragment: bytes):
+        FRAGMENT_BYTES.inc(len(fragment))
+        with self.condition:
+            self.fragment_sequence += 1
+            self.fragments.append((self.fragment_sequence, fragment))
+            del self.fragments[:-self.max_lag]
+            self.condition.notify_all()
+
+    def _ensure_running(self):
+        with self.start_lock:
+            with self.condition:
+                if self.running:
+                    return
+                self.running = True
+                self.init_segment = None
+                self.fragments = []
+            if self.thread:
+                # A previous encoder decided to go idle and is shutting down
+                self.thread.join(5.0)
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="h264-encoder", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def _open_stream(self, container, width: int, height: int):
+        stream = container.add_stream(self.encoder, rate=self.fps)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p"
+        stream.bit_rate = self.bitrate
+        stream.gop_size = self.gop
+        if self.encoder in ("libx264", "h264"):
+            stream.options = {"preset": "ultrafast", "tune": "zerolatency", "bframes": "0"}
+        return stream
+
+    def _idle(self) -> bool:
+        with self.condition:
+            if self.viewers == 0 and time.monotonic() - self.last_viewer_left > self.idle_timeout:
+                # Decided under the lock so a viewer arriving now starts a fresh encoder
+                self.running = False
+            return not self.running
+
+    def _run(self):
+        sink = FragmentSink(self._on_init, self._on_fragment)
+        container = None
+        try:
+            snapshot = self.supervisor.get_frame()
+            while snapshot.frame is None:
+                if self.stop_event.is_set() or self._idle():
+                    return
+                snapshot = self.supervisor.wait_frame(snapshot.sequence, timeout=1.0)
+            # Encoder geometry follows what the camera actually delivers
+            height, width = snapshot.frame.shape[:2]
+            container = av.open(sink, mode="w", format="mp4", options={
+                "movflags": "frag_keyframe+empty_moov+default_base_moof",
+                "flush_packets": "1",
+            })
+            stream = self._open_stream(container, width, height)
+            logging.info(f"H.264 encoder started: {self.encoder} {width}x{height}@{self.fps} "
+                         f"{self.bitrate // 1000} kbit/s, GOP {self.gop}")
+            started = time.monotonic()
+            last_pts = -1
+            sequence = 0
+            while not self.stop_event.is_set() and not self._idle():
+                snapshot = self.supervisor.wait_frame(sequence, timeout=1.0)
+                sequence = snapshot.sequence
+                # Wall-clock timestamps keep playback speed right when capture drops frames
+                pts = int((time.monotonic() - started) * self.fps)
+                if pts <= last_pts:
+                    continue
+                last_pts = pts
+                with ENCODE_SECONDS.time():
+                    frame = av.VideoFrame.from_ndarray(snapshot.frame, format="bgr24")
+                    frame.pts = pts
+                    for packet in stream.encode(frame):
+                        container.mux(packet)
+        except Exception as e:
+            logging.error(f"H.264 encoder failed: {e}")
+        finally:
+            if container is not None:
+                try:
+                    container.close()
+                except Exception:
+                    pass
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            logging.info("H.264 encoder stopped")
+
+    def stream(self) -> Iterator[bytes]:
+        """Yield the init segment, then every new fragment starting from the next keyframe."""
+        with self.condition:
+            self.viewers += 1
+        self._ensure_running()
+        try:
+            with self.condition:
+                if not self.condition.wait_for(lambda: self.init_segment is not None or not self.running,
+                                               timeout=10.0) or self.init_segment is None:
+                    return
+                init_segment = self.init_segment
+                sequence = self.fragments[-1][0] if self.fragments else self.fragment_sequence
+            BYTES_SENT.inc(len(init_segment))
+            yield init_segment
+            while True:
+                with self.condition:
+                    self.condition.wait_for(
+                        lambda: self.fragment_sequence > sequence or not self.running,
+                        timeout=5.0
+                    )
+                    if not self.running:
+                        return
+                    ready = [(seq, data) for seq, data in self.fragments if seq > sequence]
+                if ready and ready[0][0] != sequence + 1:
+                    logging.debug(f"H.264 viewer skipped {ready[0][0] - sequence - 1} fragments")
+                for seq, data in ready:
+                    sequence = seq
+                    BYTES_SENT.inc(len(data))
+                    yield data
+        finally:
+            with self.condition:
+                self.viewers -= 1
+                if self.viewers == 0:
+                    self.last_viewer_left = time.monotonic()
+
+    def status(self) -> dict:
+        with self.condition:
+            sizes = [len(data) for _, data in self.fragments]
+            return {
+                "running": self.running,
+                "viewers": self.viewers,
+                "encoder": self.encoder,
+                "bitrate": self.bitrate,
+                "gop": self.gop,
+                "fragments": self.fragment_sequence,
+                "recent_fragment_bytes": sizes,
+                "bytes_per_second": round(sum(sizes) * self.fps / (self.gop * len(sizes)), 1) if sizes else None,
+            }
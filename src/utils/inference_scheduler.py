@@ -0,0 +1,178 @@
+# src/utils/inference_scheduler.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.utils import metrics
+
+COALESCED = metrics.registry.counter("inference_requests_coalesced_total",
+                                     "Inference requests answered by a run another request already queued")
+THROTTLE_SECONDS = metrics.registry.counter("inference_throttle_seconds_total",
+                                            "Time the inference worker idled to stay within its CPU budget")
+
+class _CameraState:
+    __slots__ = ("pending", "completed", "sequence", "detections", "error", "runs", "busy", "last_run", "counter")
+
+    def __init__(self, name: str, history: int):
+        self.pending = False
+        self.completed = 0
+        self.sequence = 0
+        self.detections = deque(maxlen=history)
+        self.error: Optional[str] = None
+        self.runs = 0
+        self.busy = 0.0
+        self.last_run: Optional[float] = None
+        self.counter = metrics.registry.counter("inference_runs_total", "Frames classified per camera",
+                                                labels={"camera": name})
+
+class InferenceScheduler:
+    """
+    Classify frames for every camera on one worker thread, fairly and within a CPU budget.
+
+    Requests never run the model themselves: they mark their camera pending
+    and wait briefly for its next result, so concurrent requests for one
+    camera share a single run and the interpreter is only ever used from one
+    thread. The worker serves pending cameras round-robin, one frame per turn,
+    so a camera polled more often cannot starve the others. After each run it
+    idles long enough that inference takes at most `budget` of one core;
+    with more cameras each gets a smaller share of the same budget, leaving
+    capture and streaming their CPU.
+    """
+
+    def __init__(self, registry, classify: Callable[[str, object], List[Dict]], budget: float = 0.5,
+                 history: int = 5):
+        self.registry = registry
+        self.classify = classify
+        self.budget = budget
+        self.history = history
+        self.states: Dict[str, _CameraState] = {}
+        self.cursor = -1
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+        registry.subscribe(self._camera_changed)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _camera_changed(self, name: str, supervisor):
+        if supervisor is None:
+            with self.condition:
+                self.states.pop(name, None)
+                self.condition.notify_all()
+
+    def _state(self, camera: str) -> _CameraState:
+        state = self.states.get(camera)
+        if state is None:
+            state = self.states[camera] = _CameraState(camera, self.history)
+        return state
+
+    def request(self, camera: str, timeout: float = 2.0) -> Tuple[List[Dict], Optional[str], bool]:
+        """
+        Ask for a classification of the camera's newest frame and wait up to `timeout` for it.
+        :return: (recent detections, error of the last run or None, whether a new run finished in time).
+        """
+        with self.condition:
+            state = self._state(camera)
+            if state.pending:
+                COALESCED.inc()
+            state.pending = True
+            # The run already queued (or the next one) answers this request
+            target = state.completed + 1
+            self.condition.notify_all()
+            fresh = self.condition.wait_for(
+                lambda: state.completed >= target or self.stop_event.is_set(), timeout
+            ) and state.completed >= target
+            return list(state.detections), state.error, fresh
+
+    def latest(self, camera: str) -> List[Dict]:
+        with self.condition:
+            state = self.states.get(camera)
+            return list(state.detections) if state else []
+
+    def _next(self) -> Optional[str]:
+        # Round-robin in registry order, starting after the camera served last
+        names = [name for name in self.registry.names() if name in self.states]
+        for offset in range(1, len(names) + 1):
+            index = (self.cursor + offset) % len(names)
+            if self.states[names[index]].pending:
+                self.cursor = index
+                return names[index]
+        return None
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.stop_event.is_set() or any(state.pending for state in self.states.values()),
+                    timeout=1.0
+                )
+                camera = self._next()
+                if camera is None:
+                    continue
+                state = self.states[camera]
+                state.pending = False
+            supervisor = self.registry.camera(camera)
+            snapshot = supervisor.get_frame() if supervisor is not None else None
+            started = time.perf_counter()
+            results, error = None, None
+            if snapshot is None or snapshot.frame is None or snapshot.stale:
+                # Nothing new to look at; answer with the detections already held
+                pass
+            elif snapshot.sequence != state.sequence:
+                try:
+                    results = self.classify(camera, snapshot)
+                except Exception as e:
+                    logging.error(f"Inference error on camera {camera}: {e}")
+                    error = str(e)
+            elapsed = time.perf_counter() - started
+            with self.condition:
+                if results is not None:
+                    state.detections.extend(results)
+                    state.sequence = snapshot.sequence
+                    state.runs += 1
+                    state.busy += elapsed
+                    state.last_run = time.time()
+                    state.counter.inc()
+                state.error = error
+                state.completed += 1
+                self.condition.notify_all()
+            if results is not None and self.budget < 1:
+                # Duty cycle: run for `elapsed`, then idle so runs take at most `budget` of the time
+                idle = elapsed * (1 - self.budget) / self.budget
+                THROTTLE_SECONDS.inc(idle)
+                self.stop_event.wait(idle)
+
+    def status(self) -> Dict:
+        with self.condition:
+            return {
+                "budget": self.budget,
+                "running": bool(self.thread and self.thread.is_alive()),
+                "coalesced": int(COALESCED.value),
+                "throttled_seconds": round(THROTTLE_SECONDS.value, 3),
+                "cameras": {
+                    name: {
+                        "runs": state.runs,
+                        "pending": state.pending,
+                        "busy_seconds": round(state.busy, 3),
+                        "mean_ms": round(state.busy / state.runs * 1000, 2) if state.runs else None,
+                        "last_run": state.last_run,
+                        "last_error": state.error,
+                    }
+                    for name, state in self.states.items()
+                },
+            }
@@ -0,0 +1,111 @@
+# src/utils/lazy.py
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from src.utils import metrics
+
+class StartupTracker:
+    """Record how long each subsystem took to initialize and on which thread."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, error: Optional[str] = None):
+        with self.lock:
+            self.timings[name] = {
+                "seconds": round(seconds, 4),
+                "thread": threading.current_thread().name,
+                "ready_after": round(time.perf_counter() - self.started, 4),
+                "error": error,
+            }
+        metrics.registry.gauge("startup_seconds", "Time spent initializing each subsystem",
+                               labels={"subsystem": name}).set(seconds)
+
+    def report(self) -> Dict:
+        with self.lock:
+            return dict(self.timings)
+
+    def log_report(self):
+        lines = [
+            f"  {name:<16} {timing['seconds'] * 1000:9.1f} ms  ({timing['thread']}"
+            + (f", failed: {timing['error']}" if timing["error"] else "") + ")"
+            for name, timing in sorted(self.report().items(), key=lambda item: item[1]["ready_after"])
+        ]
+        logging.info("Startup timing per subsystem:\n" + "\n".join(lines))
+
+startup = StartupTracker()
+
+class LazyResource:
+    """
+    Build a subsystem on first use instead of at import time.
+
+    Attribute access is forwarded to the built object, so call sites keep
+    using the resource as if it were the object itself. Use `get()` where the
+    factory may return None. Construction runs once even when several threads
+    (requests or the warm-up) race for it.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], object]):
+        self._name = name
+        self._factory = factory
+        self._value = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._ready
+
+    def get(self):
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                started = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    startup.record(self._name, time.perf_counter() - started, error=str(e))
+                    raise
+                startup.record(self._name, time.perf_counter() - started)
+                self._ready = True
+        return self._value
+
+    def set(self, value):
+        """Replace the resource, e.g. with a stand-in for benchmarks."""
+        with self._lock:
+            self._value = value
+            self._ready = True
+
+    def __getattr__(self, attr: str):
+        return getattr(self.get(), attr)
+
+def warm_up(resources: Iterable[LazyResource], on_done: Optional[Callable[[], None]] = None) -> threading.Thread:
+    """
+    Initialize resources in parallel on background threads.
+    :param on_done: Called once every resource has finished (or failed).
+    :return: The coordinating thread.
+    """
+    def initialize(resource: LazyResource):
+        try:
+            resource.get()
+        except Exception as e:
+            logging.error(f"Warm-up of {resource._name} failed: {e}")
+
+    def run():
+        threads = [threading.Thread(target=initialize, args=(resource,), name=f"warm-up-{resource._name}",
+                                    daemon=True) for resource in resources]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if on_done:
+            on_done()
+
+    coordinator = threading.Thread(target=run, name="warm-up", daemon=True)
+    coordinator.start()
+    return coordinator
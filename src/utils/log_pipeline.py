@@ -0,0 +1,215 @@
+# src/utils/log_pipeline.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import metrics
+
+DEFAULT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+SUPPRESSED = metrics.registry.counter("log_records_suppressed_total", "Log records dropped by the per-call-site rate limit")
+DROPPED = metrics.registry.counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+
+class _Window:
+    __slots__ = ("start", "count", "suppressed", "last")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.count = 0
+        self.suppressed = 0
+        self.last: Optional[logging.LogRecord] = None
+
+class RateLimiter:
+    """
+    Let at most `burst` records per key through in each `window` seconds.
+
+    The key is the call site (file and line) unless the record carries a
+    `log_key` extra, so f-string messages that differ only in their numbers
+    still count as one message. Suppressed records are counted, and once the
+    window is over a single summary record reports how many were dropped.
+    INFO and lower records from the `exempt` loggers always pass: werkzeug
+    logs every request from one call site, and its access log would
+    otherwise stop after `burst` requests a window.
+    """
+
+    def __init__(self, burst: int = 5, window: float = 60.0, exempt: Tuple[str, ...] = ("werkzeug",)):
+        self.burst = burst
+        self.window = window
+        self.exempt = exempt
+        self.lock = threading.Lock()
+        self.windows: Dict[Tuple, _Window] = {}
+        self.next_sweep = time.monotonic() + window
+
+    @staticmethod
+    def key(record: logging.LogRecord) -> Tuple:
+        return getattr(record, "log_key", None) or (record.pathname, record.lineno)
+
+    def is_exempt(self, record: logging.LogRecord) -> bool:
+        return record.levelno <= logging.INFO and any(
+            record.name == name or record.name.startswith(name + ".") for name in self.exempt)
+
+    def check(self, record: logging.LogRecord) -> Tuple[bool, List[logging.LogRecord]]:
+        """Return (whether to emit the record, summary records for windows that just ended)."""
+        if self.is_exempt(record):
+            return True, []
+        now = time.monotonic()
+        key = self.key(record)
+        summaries = []
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window.start >= self.window:
+                if window is not None and window.suppressed:
+                    summaries.append(self._summary(window, now))
+                window = self.windows[key] = _Window(now)
+            window.count += 1
+            allowed = window.count <= self.burst
+            if not allowed:
+                window.suppressed += 1
+                window.last = record
+            if now >= self.next_sweep:
+                summaries += self._sweep(now)
+        if not allowed:
+            SUPPRESSED.inc()
+        return allowed, summaries
+
+    def _sweep(self, now: float, force: bool = False) -> List[logging.LogRecord]:
+        # Report keys that went quiet after being suppressed, and forget expired windows
+        self.next_sweep = now + self.window
+        summaries = []
+        for key, window in list(self.windows.items()):
+            if force or now - window.start >= self.window:
+                if window.suppressed:
+                    summaries.append(self._summary(window, now))
+                del self.windows[key]
+        return summaries
+
+    def flush(self) -> List[logging.LogRecord]:
+        with self.lock:
+            return self._sweep(time.monotonic(), force=True)
+
+    def _summary(self, window: _Window, now: float) -> logging.LogRecord:
+        last = window.last
+        return logging.LogRecord(
+            last.name, last.levelno, last.pathname, last.lineno,
+            "Suppressed %d repeats of %r from %s:%d in the last %.0fs",
+            (window.suppressed, last.getMessage(), os.path.basename(last.pathname), last.lineno, now - window.start),
+            None
+        )
+
+    def active_keys(self) -> int:
+        with self.lock:
+            return len(self.windows)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that rate-limits and never waits: a full queue drops the record."""
+
+    def __init__(self, log_queue: queue.Queue, limiter: RateLimiter):
+        super().__init__(log_queue)
+        self.limiter = limiter
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        allowed, summaries = self.limiter.check(record)
+        for summary in summaries:
+            self.enqueue(summary)
+        return super().handle(record) if allowed else False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener is a thread in this process, so the record does not need
+        # pickling; only resolve the message so later changes to args don't leak in.
+        # Timestamps and tracebacks are formatted on the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+class LogPipeline:
+    """
+    Route all logging through a bounded queue to one listener thread.
+
+    Threads that log (capture, inference, request handlers) only pay for the
+    rate-limit check and a put_nowait(); formatting and file/console I/O
+    happen on the listener thread, so a slow SD card never stalls them.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], level: int = logging.INFO, burst: int = 5,
+                 window: float = 60.0, queue_size: int = 10000):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.limiter = RateLimiter(burst, window)
+        self.handler = NonBlockingQueueHandler(self.queue, self.limiter)
+        self.handlers = handlers
+        self.level = level
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.started = False
+        metrics.registry.gauge("log_queue_depth", "Log records waiting for the listener thread").set_function(
+            lambda: self.queue.qsize()
+        )
+
+    def start(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        self.listener.start()
+        self.started = True
+
+    def stop(self):
+        if not self.started:
+            return
+        for summary in self.limiter.flush():
+            self.handler.enqueue(summary)
+        # Writes out everything still queued before returning
+        self.listener.stop()
+        logging.getLogger().removeHandler(self.handler)
+        for handler in self.handlers:
+            handler.close()
+        self.started = False
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "rate_limit": {"burst": self.limiter.burst, "window_seconds": self.limiter.window},
+            "active_keys": self.limiter.active_keys(),
+            "suppressed": int(SUPPRESSED.value),
+            "dropped": int(DROPPED.value),
+        }
+
+_pipeline: Optional[LogPipeline] = None
+
+def configure_logging(handlers: Optional[List[logging.Handler]] = None, level=logging.INFO,
+                      fmt: str = DEFAULT_FORMAT, burst: int = 5, window: float = 60.0,
+                      queue_size: int = 10000) -> LogPipeline:
+    """
+    Install the queue-based pipeline on the root logger once per process.
+
+    Modules only call logging.info() and friends; the entry point (app.py or a
+    script's __main__) calls this. Later calls return the running pipeline.
+    :param handlers: Output handlers run on the listener thread; defaults to stderr.
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+    handlers = handlers or [logging.StreamHandler()]
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(logging.Formatter(fmt))
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    _pipeline = LogPipeline(handlers, level, burst, window, queue_size)
+    _pipeline.start()
+    atexit.register(_pipeline.stop)
+    return _pipeline
+
+def pipeline() -> Optional[LogPipeline]:
+    return _pipeline
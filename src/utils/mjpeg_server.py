@@ -0,0 +1,344 @@
+# src/utils/mjpeg_server.py
+import logging
+import selectors
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.utils import metrics
+
+VIEWERS = metrics.registry.gauge("mjpeg_viewers", "Viewers connected to the MJPEG stream server")
+FRAMES_SENT = metrics.registry.counter("mjpeg_frames_sent_total", "JPEG frames delivered to viewers")
+FRAMES_SKIPPED = metrics.registry.counter("mjpeg_frames_skipped_total", "Frames a slow viewer skipped to stay current")
+BYTES_SENT = metrics.registry.counter("mjpeg_bytes_sent_total", "MJPEG bytes sent to viewers")
+
+RESPONSE_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: multipart/x-mixed-replace; boundary=frame\r\n"
+    b"Cache-Control: no-store\r\n"
+    b"Connection: close\r\n\r\n"
+)
+NOT_FOUND = b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+class _Feed:
+    __slots__ = ("path", "supervisor", "part", "sequence", "viewers", "removed", "thread")
+
+    def __init__(self, path: str, supervisor):
+        self.path = path
+        self.supervisor = supervisor
+        self.part: Optional[bytes] = None
+        self.sequence = 0
+        self.viewers = 0
+        self.removed = False
+        self.thread: Optional[threading.Thread] = None
+
+class _Client:
+    __slots__ = ("sock", "address", "request", "out", "feed", "sequence", "streaming", "last_progress")
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.request = b""
+        self.out: Optional[memoryview] = None
+        self.feed: Optional[_Feed] = None
+        self.sequence = 0
+        self.streaming = False
+        self.last_progress = time.monotonic()
+
+class MjpegServer:
+    """
+    Serve live MJPEG feeds from one selector loop instead of one thread per viewer.
+
+    Each feed (one per camera, under its own path) has an encoder thread that
+    JPEG-encodes each new frame once while at least one viewer of that feed
+    is connected and the feed is active; the loop thread fans the shared
+    bytes out over non-blocking sockets. A viewer that has not finished
+    receiving one frame is never queued more: it gets the newest frame once its
+    socket drains, so slow clients skip frames instead of blocking anyone.
+    Idle or paused viewers are just registered sockets. Viewers that make no
+    progress for `stall_timeout` seconds are disconnected.
+    """
+
+    def __init__(self, supervisor, encode: Callable, feed_active: threading.Event, host: str = "0.0.0.0",
+                 port: int = 5001, path: str = "/video_feed", max_viewers: int = 64, stall_timeout: float = 30.0):
+        self.encode = encode
+        self.feed_active = feed_active
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_viewers = max_viewers
+        self.stall_timeout = stall_timeout
+        self.clients: Dict[int, _Client] = {}
+        self.feeds: Dict[str, _Feed] = {path: _Feed(path, supervisor)}
+        self.frames_encoded = 0
+        self.viewers = 0
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.selector = None
+        self.listener = None
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.threads = []
+
+    @property
+    def listening(self) -> bool:
+        return self.listener is not None
+
+    def start(self) -> bool:
+        """Bind and start serving; False if the port is taken (e.g. by another worker process)."""
+        try:
+            listener = socket.create_server((self.host, self.port), reuse_port=False, backlog=128)
+        except OSError as e:
+            logging.warning(f"MJPEG stream server not started on {self.host}:{self.port}: {e}")
+            return False
+        if self.port == 0:
+            self.port = listener.getsockname()[1]
+        listener.setblocking(False)
+        self.listener = listener
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(listener, selectors.EVENT_READ, "accept")
+        self.wake_reader.setblocking(False)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ, "wake")
+        self.stop_event.clear()
+        self.threads = [threading.Thread(target=self._loop, name="mjpeg-loop", daemon=True)]
+        self.threads[0].start()
+        with self.condition:
+            for feed in self.feeds.values():
+                self._start_encoder(feed)
+        logging.info(f"MJPEG stream server listening on {self.host}:{self.port}{self.path}")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        self._wake()
+        with self.condition:
+            self.condition.notify_all()
+            threads = self.threads + [feed.thread for feed in self.feeds.values() if feed.thread]
+        for thread in threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def _start_encoder(self, feed: _Feed):
+        feed.thread = threading.Thread(target=self._encode_loop, args=(feed,), daemon=True,
+                                       name=f"mjpeg-encoder{feed.path.replace('/', '-')}")
+        feed.thread.start()
+
+    def add_feed(self, path: str, supervisor):
+        """Serve another camera under `path`; its encoder idles until someone watches it."""
+        with self.condition:
+            if path in self.feeds:
+                raise ValueError(f"MJPEG feed {path} already exists")
+            feed = self.feeds[path] = _Feed(path, supervisor)
+            if self.listening:
+                self._start_encoder(feed)
+
+    def remove_feed(self, path: str):
+        """Stop serving `path`; its viewers are disconnected."""
+        with self.condition:
+            feed = self.feeds.pop(path, None)
+            if feed is None:
+                return
+            feed.removed = True
+            self.condition.notify_all()
+        self._wake()
+
+    def _wake(self):
+        try:
+            self.wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def _encode_loop(self, feed: _Feed):
+        sequence = 0
+        while not self.stop_event.is_set() and not feed.removed:
+            with self.condition:
+                # Nothing to do without viewers: sleep until one arrives
+                if not self.condition.wait_for(
+                        lambda: feed.viewers > 0 or feed.removed or self.stop_event.is_set(), timeout=5.0):
+                    continue
+                if feed.removed:
+                    break
+            if not self.feed_active.wait(timeout=1.0):
+                continue
+            snapshot = feed.supervisor.wait_frame(sequence, timeout=1.0)
+            if snapshot.sequence == sequence and snapshot.frame is not None and not snapshot.stale:
+                continue
+            sequence = snapshot.sequence
+            jpeg = self.encode(snapshot)
+            if jpeg is None:
+                continue
+            part = (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(jpeg)).encode()
+                    + b"\r\n\r\n" + jpeg + b"\r\n")
+            with self.condition:
+                feed.part = part
+                feed.sequence += 1
+                self.frames_encoded += 1
+            self._wake()
+
+    def _loop(self):
+        last_sweep = time.monotonic()
+        while not self.stop_event.is_set():
+            for key, events in self.selector.select(timeout=1.0):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self.wake_reader.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    self._publish()
+                else:
+                    client = key.data
+                    if events & selectors.EVENT_READ:
+                        self._read(client)
+                    if events & selectors.EVENT_WRITE and client.sock.fileno() in self.clients:
+                        self._write(client)
+            if time.monotonic() - last_sweep > 1.0:
+                last_sweep = time.monotonic()
+                self._drop_stalled()
+        for client in list(self.clients.values()):
+            self._close(client)
+        self.selector.close()
+        self.listener.close()
+        self.listener = None
+
+    def _accept(self):
+        try:
+            sock, address = self.listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        if len(self.clients) >= self.max_viewers:
+            sock.close()
+            return
+        sock.setblocking(False)
+        client = _Client(sock, address)
+        self.clients[sock.fileno()] = client
+        self.selector.register(sock, selectors.EVENT_READ, client)
+
+    def _read(self, client: _Client):
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(client)
+            return
+        if client.streaming:
+            # Viewers have nothing more to say; ignore anything they send
+            return
+        client.request += data
+        if b"\r\n\r\n" not in client.request:
+            if len(client.request) > 8192:
+                self._close(client)
+            return
+        parts = client.request.split(b"\r\n", 1)[0].split()
+        target = parts[1].decode("latin-1").split("?", 1)[0] if len(parts) >= 2 else ""
+        with self.condition:
+            feed = self.feeds.get(target)
+        if len(parts) < 2 or parts[0] != b"GET" or feed is None:
+            self._send(client, NOT_FOUND)
+            client.sequence = -1  # close once the 404 is out
+            return
+        client.streaming = True
+        client.feed = feed
+        with self.condition:
+            feed.viewers += 1
+            self.viewers += 1
+            self.condition.notify_all()
+        VIEWERS.set(self.viewers)
+        self._send(client, RESPONSE_HEADERS)
+
+    def _send(self, client: _Client, data: bytes):
+        client.out = memoryview(data)
+        client.last_progress = time.monotonic()
+        self.selector.modify(client.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, client)
+
+    def _publish(self):
+        with self.condition:
+            parts = {feed.path: (feed.part, feed.sequence) for feed in self.feeds.values()}
+        for client in list(self.clients.values()):
+            if not client.streaming:
+                continue
+            if client.feed.removed:
+                self._close(client)
+                continue
+            part, sequence = parts[client.feed.path]
+            if part is None or client.sequence >= sequence:
+                continue
+            if client.out is None:
+                self._queue_frame(client, part, sequence)
+            # else: still sending an older frame; it picks up the newest one when done
+
+    def _queue_frame(self, client: _Client, part: bytes, sequence: int):
+        if client.sequence and sequence - client.sequence > 1:
+            FRAMES_SKIPPED.inc(sequence - client.sequence - 1)
+        client.sequence = sequence
+        FRAMES_SENT.inc()
+        self._send(client, part)
+
+    def _write(self, client: _Client):
+        try:
+            sent = client.sock.send(client.out)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._close(client)
+            return
+        BYTES_SENT.inc(sent)
+        client.last_progress = time.monotonic()
+        client.out = client.out[sent:]
+        if len(client.out):
+            return
+        client.out = None
+        if client.sequence < 0:
+            self._close(client)
+            return
+        with self.condition:
+            part, sequence = (client.feed.part, client.feed.sequence) if client.streaming else (None, 0)
+        if part is not None and sequence > client.sequence:
+            self._queue_frame(client, part, sequence)
+        else:
+            self.selector.modify(client.sock, selectors.EVENT_READ, client)
+
+    def _drop_stalled(self):
+        now = time.monotonic()
+        for client in list(self.clients.values()):
+            waiting = client.out is not None or not client.streaming
+            if waiting and now - client.last_progress > self.stall_timeout:
+                logging.info(f"Dropping stalled MJPEG viewer {client.address}")
+                self._close(client)
+
+    def _close(self, client: _Client):
+        fileno = client.sock.fileno()
+        if self.clients.pop(fileno, None) is None:
+            return
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        if client.streaming:
+            with self.condition:
+                client.feed.viewers -= 1
+                self.viewers -= 1
+            VIEWERS.set(self.viewers)
+
+    def status(self) -> dict:
+        with self.condition:
+            viewers = self.viewers
+            feeds = {feed.path: {"viewers": feed.viewers, "frames_encoded": feed.sequence}
+                     for feed in self.feeds.values()}
+        return {
+            "listening": self.listening,
+            "port": self.port,
+            "viewers": viewers,
+            "feeds": feeds,
+            "connections": len(self.clients),
+            "frames_encoded": self.frames_encoded,
+            "frames_sent": int(FRAMES_SENT.value),
+            "frames_skipped": int(FRAMES_SKIPPED.value),
+            "bytes_sent": int(BYTES_SENT.value),
+        }
@@ -0,0 +1,242 @@
+# src/utils/model_registry.py
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import tflite_runtime
+import tflite_runtime.interpreter as tflite
+
+EDGETPU_DELEGATE_PATHS = [
+    "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1.0",
+    "/usr/lib/aarch64-linux-gnu/libedgetpu.so.1",
+    "/usr/lib/libedgetpu.so.1",
+    "/usr/local/lib/libedgetpu.so.1"
+]
+
+# backend name -> op resolver; "xnnpack" keeps TFLite's default delegates, "builtin" disables them
+CPU_BACKENDS = {
+    "xnnpack": tflite.OpResolverType.AUTO,
+    "builtin": tflite.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES,
+}
+
+ModelChoice = namedtuple("ModelChoice", ["category", "model_path", "label_path", "backend", "num_threads", "invoke_ms"])
+
+_delegate = None
+_delegate_lock = threading.Lock()
+
+def load_edgetpu_delegate():
+    """Load the Edge TPU delegate once per process; None if no library or device is present."""
+    global _delegate
+    with _delegate_lock:
+        if _delegate is None:
+            _delegate = False
+            for path in EDGETPU_DELEGATE_PATHS:
+                if os.path.exists(path):
+                    try:
+                        _delegate = tflite.load_delegate(path)
+                        logging.info(f"Found Edge TPU delegate at {path}")
+                        break
+                    except Exception as e:
+                        logging.warning(f"Failed to load delegate from {path}: {e}")
+        return _delegate or None
+
+def find_variants(model_dir: str, category: str) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    Find the model files and label file for a category such as "plant".
+    :return: Tuple of ({"edgetpu"|"cpu": model_path}, label_path or None).
+    """
+    variants = {}
+    for path in sorted(glob.glob(os.path.join(model_dir, f"*_{category}_*.tflite"))):
+        kind = "edgetpu" if "_edgetpu" in os.path.basename(path) else "cpu"
+        variants.setdefault(kind, path)
+    label_path = os.path.join(model_dir, f"inat_{category}_labels.txt")
+    return variants, label_path if os.path.exists(label_path) else None
+
+def create_interpreter(model_path: str, backend: str, num_threads: Optional[int] = None):
+    if backend == "edgetpu":
+        delegate = load_edgetpu_delegate()
+        if delegate is None:
+            raise RuntimeError("Edge TPU delegate not available")
+        return tflite.Interpreter(model_path=model_path, experimental_delegates=[delegate])
+    return tflite.Interpreter(
+        model_path=model_path,
+        num_threads=num_threads,
+        experimental_op_resolver_type=CPU_BACKENDS[backend]
+    )
+
+class ModelRegistry:
+    """
+    Pick the fastest working model variant and TFLite backend per category.
+
+    Every candidate (Edge TPU model with the delegate, CPU model with and
+    without XNNPACK at several thread counts) is loaded and timed after a few
+    warm-up invokes. The winner is cached in `cache_path` keyed by the model
+    files, TFLite version and hardware, so later boots skip the probe.
+    """
+
+    def __init__(self, model_dir: str = "data_model", cache_path: Optional[str] = None,
+                 warmup: int = 2, runs: int = 5, thread_options: Optional[List[int]] = None):
+        self.model_dir = model_dir
+        self.cache_path = cache_path
+        self.warmup = warmup
+        self.runs = runs
+        cpus = os.cpu_count() or 1
+        self.thread_options = thread_options or sorted({1, min(2, cpus), min(4, cpus), cpus})
+        self.choices: Dict[str, ModelChoice] = {}
+        self.probe_results: Dict[str, List[Dict]] = {}
+        self.lock = threading.Lock()
+
+    def _fingerprint(self, variants: Dict[str, str]) -> Dict:
+        return {
+            "models": {kind: [os.path.basename(path), os.path.getsize(path), int(os.path.getmtime(path))]
+                       for kind, path in sorted(variants.items())},
+            "tflite": tflite_runtime.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "edgetpu": any(os.path.exists(path) for path in EDGETPU_DELEGATE_PATHS),
+            "thread_options": self.thread_options,
+        }
+
+    def _read_cache(self) -> Dict:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable model cache {self.cache_path}: {e}")
+            return {}
+
+    def _write_cache(self, category: str, fingerprint: Dict, choice: ModelChoice):
+        if not self.cache_path:
+            return
+        cache = self._read_cache()
+        cache[category] = {"fingerprint": fingerprint, "choice": choice._asdict()}
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        temporary = self.cache_path + ".tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temporary, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Failed to write model cache {self.cache_path}: {e}")
+
+    def _candidates(self, variants: Dict[str, str]) -> List[Tuple[str, str, Optional[int]]]:
+        candidates = []
+        if "edgetpu" in variants:
+            candidates.append((variants["edgetpu"], "edgetpu", None))
+        if "cpu" in variants:
+            for backend in CPU_BACKENDS:
+                for threads in self.thread_options:
+                    candidates.append((variants["cpu"], backend, threads))
+        return candidates
+
+    def _time_candidate(self, model_path: str, backend: str, num_threads: Optional[int]) -> float:
+        interpreter = create_interpreter(model_path, backend, num_threads)
+        interpreter.allocate_tensors()
+        details = interpreter.get_input_details()[0]
+        data = np.zeros(details["shape"], dtype=details["dtype"])
+        timings = []
+        for i in range(self.warmup + self.runs):
+            start = time.perf_counter()
+            interpreter.set_tensor(details["index"], data)
+            interpreter.invoke()
+            if i >= self.warmup:
+                timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
+
+    def probe(self, category: str, variants: Dict[str, str], label_path: Optional[str]) -> Optional[ModelChoice]:
+        """Time every candidate configuration and return the fastest one that works."""
+        results = []
+        best = None
+        for model_path, backend, threads in self._candidates(variants):
+            try:
+                invoke_ms = self._time_candidate(model_path, backend, threads)
+            except Exception as e:
+                results.append({"model": os.path.basename(model_path), "backend": backend,
+                                "num_threads": threads, "error": str(e)})
+                continue
+            results.append({"model": os.path.basename(model_path), "backend": backend,
+                            "num_threads": threads, "invoke_ms": round(invoke_ms, 3)})
+            if best is None or invoke_ms < best.invoke_ms:
+                best = ModelChoice(category, model_path, label_path, backend, threads, round(invoke_ms, 3))
+        self.probe_results[category] = results
+        return best
+
+    def select(self, category: str, refresh: bool = False, variants: Optional[Dict[str, str]] = None,
+               label_path: Optional[str] = None) -> Optional[ModelChoice]:
+        """
+        Return the configuration to use for a category, probing only if the cache is stale.
+        :param category: Model category, e.g. "plant", "bird" or "insect".
+        :param refresh: Ignore the memory and disk caches and probe again.
+        :param variants: {"edgetpu"|"cpu": model_path} to choose from instead of searching model_dir.
+        :param label_path: Label file that goes with `variants`.
+        :return: ModelChoice, or None if no variant loads.
+        """
+        with self.lock:
+            chosen = self.choices.get(category)
+            if chosen and not refresh and (variants is None or chosen.model_path in variants.values()):
+                return chosen
+            if variants is None:
+                variants, label_path = find_variants(self.model_dir, category)
+            if not variants:
+                logging.error(f"No model found for {category} in {self.model_dir}")
+                return None
+            fingerprint = self._fingerprint(variants)
+            cached = None if refresh else self._read_cache().get(category)
+            if cached and cached.get("fingerprint") == fingerprint:
+                choice = ModelChoice(**cached["choice"])
+                logging.info(f"Using cached model choice for {category}: {choice.backend} "
+                             f"threads={choice.num_threads} ({choice.invoke_ms} ms)")
+            else:
+                started = time.perf_counter()
+                choice = self.probe(category, variants, label_path)
+                if choice is None:
+                    logging.error(f"No working backend for {category}: {self.probe_results.get(category)}")
+                    return None
+                logging.info(f"Probed {len(self.probe_results[category])} configurations for {category} in "
+                             f"{time.perf_counter() - started:.2f}s; chose {os.path.basename(choice.model_path)} "
+                             f"{choice.backend} threads={choice.num_threads} ({choice.invoke_ms} ms)")
+                self._write_cache(category, fingerprint, choice)
+            self.choices[category] = choice
+            return choice
+
+    def load(self, category: str, variants: Optional[Dict[str, str]] = None, label_path: Optional[str] = None):
+        """
+        Create and allocate an interpreter with the selected configuration.
+        :param variants: Explicit model files to choose from, as for select().
+        :return: Tuple of (interpreter or None, labels list).
+        """
+        choice = self.select(category, variants=variants, label_path=label_path)
+        if choice is None:
+            return None, []
+        labels = []
+        if choice.label_path:
+            with open(choice.label_path, "r") as f:
+                labels = [line.strip() for line in f if line.strip()]
+        try:
+            interpreter = create_interpreter(choice.model_path, choice.backend, choice.num_threads)
+        except Exception as e:
+            # e.g. the Edge TPU was unplugged since the choice was cached
+            logging.warning(f"Cached {choice.backend} configuration for {category} failed ({e}); probing again")
+            choice = self.select(category, refresh=True, variants=variants, label_path=label_path)
+            if choice is None:
+                return None, labels
+            interpreter = create_interpreter(choice.model_path, choice.backend, choice.num_threads)
+        interpreter.allocate_tensors()
+        return interpreter, labels
+
+    def status(self) -> Dict:
+        with self.lock:
+            return {
+                "choices": {category: choice._asdict() for category, choice in self.choices.items()},
+                "probes": dict(self.probe_results),
+            }
@@ -0,0 +1,221 @@
+# src/utils/profiler.py
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from typing import Dict, List, Optional, Set
+
+from src.utils import metrics
+
+SESSION_ID = re.compile(r"\d{8}_\d{6}_[0-9a-f]{8}")
+
+SAMPLES = metrics.registry.counter("profile_samples_total", "Thread stacks recorded by the sampling profiler")
+
+def _cpu_clock(ident: int) -> Optional[int]:
+    try:
+        return time.clock_gettime_ns(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+def _frame_label(code) -> str:
+    # Definition line rather than the current line, so one function is one flame graph node
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class _Session:
+    __slots__ = ("id", "label", "threads", "mode", "started", "deadline", "finished", "stacks", "samples", "path")
+
+    def __init__(self, label: str, threads: Optional[Set[int]], mode: str, seconds: float):
+        self.id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.threads = threads
+        self.mode = mode
+        self.started = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.finished: Optional[float] = None
+        self.stacks = StackCounter()
+        self.samples = 0
+        self.path: Optional[str] = None
+
+    def info(self) -> Dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "mode": self.mode,
+            "started": self.started,
+            "finished": self.finished,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+        }
+
+class SamplingProfiler:
+    """
+    Statistical profiler over every Python thread, written out as collapsed stacks.
+
+    While a session is active one sampler thread wakes every `interval`
+    seconds, reads all thread stacks with sys._current_frames() and counts
+    each as "thread;outer;...;inner". Nothing is hooked into the profiled
+    code, so generators, worker loops and request threads are all seen as
+    they run, and with no session active there is no sampler thread at all.
+    In "cpu" mode a thread is only counted if its CPU clock advanced since
+    the previous sample, which leaves out threads blocked on sockets, locks
+    or sleeps; "wall" counts every thread. Sessions can cover all threads
+    or only some (a single request's thread) and run side by side.
+    Finished profiles are written to `directory` in the format flamegraph.pl,
+    speedscope and inferno read.
+    """
+
+    MODES = ("cpu", "wall")
+
+    def __init__(self, directory: str, interval: float = 0.01, max_seconds: float = 120.0,
+                 max_sessions: int = 4, keep: int = 20):
+        if interval <= 0 or max_seconds <= 0 or max_sessions <= 0 or keep <= 0:
+            raise ValueError("Profiler interval, max seconds, max sessions and keep must be positive")
+        self.directory = directory
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_sessions = max_sessions
+        self.keep = keep
+        self.sessions: Dict[str, _Session] = {}
+        self.finished: List[Dict] = []
+        self.lock = threading.Lock()
+        self.thread = None
+        os.makedirs(directory, exist_ok=True)
+        metrics.registry.gauge("profile_sessions_active", "Profiling sessions currently sampling").set_function(
+            lambda: len(self.sessions))
+
+    def start(self, seconds: float, threads: Optional[Set[int]] = None, mode: str = "cpu",
+              label: str = "all threads") -> Optional[str]:
+        """
+        Sample for up to `seconds` (capped at max_seconds); `threads` limits it to those thread idents.
+        :return: The session id, or None if max_sessions are already running.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Profile mode must be one of {', '.join(self.MODES)}")
+        if seconds <= 0:
+            raise ValueError("Profile duration must be positive")
+        session = _Session(label, threads, mode, min(seconds, self.max_seconds))
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                return None
+            self.sessions[session.id] = session
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self.thread.start()
+        logging.info(f"Profiling {label} ({mode}) for up to {min(seconds, self.max_seconds):.0f}s as {session.id}")
+        return session.id
+
+    def stop(self, session_id: str) -> Optional[Dict]:
+        """End a session early and write it out; returns its summary, or None if it is not running."""
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        return self._finish(session)
+
+    def stop_all(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            self._finish(session)
+
+    def _run(self):
+        names: Dict[int, str] = {}
+        clocks: Dict[int, int] = {}
+        own = threading.get_ident()
+        while True:
+            started = time.monotonic()
+            with self.lock:
+                for session in [s for s in self.sessions.values() if s.deadline <= started]:
+                    del self.sessions[session.id]
+                    threading.Thread(target=self._finish, args=(session,), name="profiler-writer").start()
+                sessions = list(self.sessions.values())
+                if not sessions:
+                    self.thread = None
+                    return
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            on_cpu = set()
+            if any(session.mode == "cpu" for session in sessions):
+                for ident in frames:
+                    clock = _cpu_clock(ident)
+                    # Without per-thread CPU clocks every thread counts, as in wall mode
+                    if clock is None or clock > clocks.get(ident, clock - 1):
+                        on_cpu.add(ident)
+                    if clock is not None:
+                        clocks[ident] = clock
+            stacks = {}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                wanted = [session for session in sessions
+                          if (session.threads is None or ident in session.threads)
+                          and (session.mode == "wall" or ident in on_cpu)]
+                if not wanted:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stacks[ident] = (";".join(reversed(stack)), wanted)
+            # Under the lock so a session being stopped is not written out mid-update
+            with self.lock:
+                for stack, wanted in stacks.values():
+                    for session in wanted:
+                        if session.finished is not None:
+                            continue
+                        session.stacks[stack] += 1
+                        session.samples += 1
+            SAMPLES.inc(len(stacks))
+            del frames
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def _finish(self, session: _Session) -> Dict:
+        with self.lock:
+            session.finished = time.time()
+            stacks = sorted(session.stacks.items())
+        path = os.path.join(self.directory, f"{session.id}.collapsed")
+        try:
+            with open(path, "w") as f:
+                for stack, count in stacks:
+                    f.write(f"{stack} {count}\n")
+            session.path = path
+        except OSError as e:
+            logging.error(f"Failed to write profile {session.id}: {e}")
+        info = session.info()
+        with self.lock:
+            self.finished.append(info)
+            expired, self.finished = self.finished[:-self.keep], self.finished[-self.keep:]
+        for old in expired:
+            try:
+                os.remove(os.path.join(self.directory, f"{old['id']}.collapsed"))
+            except OSError:
+                pass
+        logging.info(f"Profile {session.id} written: {session.samples} samples, {len(session.stacks)} stacks")
+        return info
+
+    def path(self, session_id: str) -> Optional[str]:
+        """
+        The collapsed-stack file of a finished session, or None.
+        Looked up on disk, so any worker process sharing the directory can serve it.
+        """
+        if not SESSION_ID.fullmatch(session_id):
+            return None
+        path = os.path.join(self.directory, f"{session_id}.collapsed")
+        return path if os.path.exists(path) else None
+
+    def status(self) -> Dict:
+        with self.lock:
+            return {
+                "interval": self.interval,
+                "max_seconds": self.max_seconds,
+                "sampling": self.thread is not None,
+                "active": [session.info() for session in self.sessions.values()],
+                "finished": list(reversed(self.finished)),
+            }
@@ -0,0 +1,280 @@
+# src/utils/retention.py
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import metrics
+
+ROWS_PURGED = metrics.registry.counter("retention_rows_purged_total", "Expired rows removed by the retention policy")
+BYTES_RECLAIMED = metrics.registry.counter("retention_bytes_reclaimed_total", "Table bytes reclaimed by the retention policy")
+RUN_SECONDS = metrics.stage_timer("retention_run")
+
+def to_days(day: date) -> int:
+    """MariaDB TO_DAYS() of a date."""
+    return day.toordinal() + 365
+
+def from_days(days: int) -> date:
+    return date.fromordinal(days - 365)
+
+def partition_name(day: date) -> str:
+    return f"p{day:%Y%m%d}"
+
+class RetentionPolicy:
+    """
+    Keep a time-series table to its last `keep_days` days.
+
+    On MariaDB the table is range-partitioned by day on `column`, so expiring
+    a day is a metadata-only DROP PARTITION and future partitions are created
+    `days_ahead` in advance. Where partitioning is off, unavailable or not
+    yet migrated (and always on SQLite) expired rows are deleted in
+    primary-key ordered chunks of `chunk_size`, each its own short
+    transaction with `pause` seconds between chunks, so live inserts never
+    wait behind one long delete. Chunked purges are followed by an online
+    OPTIMIZE TABLE on MariaDB to return the freed space.
+    """
+
+    def __init__(self, db, backend: str, table: str = "sensor_data", column: str = "timestamp",
+                 keep_days: float = 90, partition: bool = True, days_ahead: int = 3,
+                 chunk_size: int = 5000, pause: float = 0.05, compact: bool = True):
+        self.db = db
+        self.backend = backend
+        self.table = table
+        self.column = column
+        self.keep_days = keep_days
+        self.partition = partition and backend == "mariadb"
+        self.days_ahead = days_ahead
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.compact = compact
+        self.lock = threading.Lock()
+        self.last_report: Optional[Dict] = None
+
+    def _scalar(self, query: str, params: tuple = None):
+        rows = self.db.execute_query(query, params)
+        return rows[0][0] if rows else None
+
+    def table_bytes(self) -> Optional[int]:
+        """Bytes held by the table and its indexes (pages in use for SQLite, which has no per-table size)."""
+        if self.backend == "mariadb":
+            value = self._scalar(
+                "SELECT DATA_LENGTH + INDEX_LENGTH FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                (self.table,)
+            )
+            return int(value) if value is not None else None
+        pages = self._scalar("PRAGMA page_count")
+        free = self._scalar("PRAGMA freelist_count")
+        size = self._scalar("PRAGMA page_size")
+        if None in (pages, free, size):
+            return None
+        return (int(pages) - int(free)) * int(size)
+
+    def partitions(self) -> List[Tuple[str, Optional[int]]]:
+        """Return [(partition name, exclusive upper bound in TO_DAYS or None for MAXVALUE)] in order."""
+        if self.backend != "mariadb":
+            return []
+        rows = self.db.execute_query(
+            """
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+            """,
+            (self.table,)
+        ) or []
+        return [(name, None if str(bound).upper() == "MAXVALUE" else int(bound)) for name, bound in rows]
+
+    def _partition_clauses(self, first: date, last: date) -> List[str]:
+        clauses = []
+        day = first
+        while day <= last:
+            clauses.append(f"PARTITION {partition_name(day)} VALUES LESS THAN ({to_days(day + timedelta(days=1))})")
+            day += timedelta(days=1)
+        return clauses
+
+    def migrate(self, cutoff: datetime) -> bool:
+        """
+        Rebuild the table as daily RANGE partitions. The partition key has to be
+        part of every unique key, so the primary key becomes (id, column).
+        Everything before the retention window lands in one catch-all partition
+        that the next run drops.
+        """
+        today = date.today()
+        start = cutoff.date()
+        clauses = [f"PARTITION p_expired VALUES LESS THAN ({to_days(start)})"]
+        clauses += self._partition_clauses(start, today + timedelta(days=self.days_ahead))
+        clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        logging.info(f"Partitioning {self.table} by day on {self.column} ({len(clauses)} partitions)")
+        result = self.db.execute_query(
+            f"""
+            ALTER TABLE {self.table}
+                MODIFY {self.column} DATETIME NOT NULL,
+                DROP PRIMARY KEY,
+                ADD PRIMARY KEY (id, {self.column})
+            PARTITION BY RANGE (TO_DAYS({self.column})) ({', '.join(clauses)})
+            """
+        )
+        if result is None:
+            logging.error(f"Could not partition {self.table}; falling back to chunked deletes")
+            self.partition = False
+            return False
+        return True
+
+    def add_future_partitions(self, partitions: List[Tuple[str, Optional[int]]]) -> int:
+        bounds = [bound for _, bound in partitions if bound is not None]
+        if not bounds or partitions[-1][1] is not None:
+            return 0
+        first = from_days(max(bounds))
+        last = date.today() + timedelta(days=self.days_ahead)
+        if first > last:
+            return 0
+        clauses = self._partition_clauses(first, last)
+        # pmax only holds future-dated rows, so splitting it is cheap
+        result = self.db.execute_query(
+            f"ALTER TABLE {self.table} REORGANIZE PARTITION pmax INTO "
+            f"({', '.join(clauses)}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        )
+        return len(clauses) if result is not None else 0
+
+    def drop_partitions(self, partitions: List[Tuple[str, Optional[int]]], cutoff: datetime) -> Tuple[List[str], int]:
+        """Drop partitions that end on or before the cutoff; returns (names, rows they held)."""
+        expired = [name for name, bound in partitions if bound is not None and bound <= to_days(cutoff.date())]
+        if not expired:
+            return [], 0
+        rows = 0
+        for name in expired:
+            rows += int(self._scalar(f"SELECT COUNT(*) FROM {self.table} PARTITION ({name})") or 0)
+        if self.db.execute_query(f"ALTER TABLE {self.table} DROP PARTITION {', '.join(expired)}") is None:
+            return [], 0
+        return expired, rows
+
+    def delete_chunks(self, cutoff: datetime, stop_event: Optional[threading.Event] = None) -> Tuple[int, int]:
+        """Delete rows older than the cutoff in short transactions; returns (rows, chunks)."""
+        stamp = cutoff.strftime("%Y-%m-%d %H:%M:%S")
+        deleted = chunks = 0
+        while not (stop_event and stop_event.is_set()):
+            # Bound each chunk by primary key so the delete is a short range scan
+            upper = self._scalar(
+                f"SELECT MAX(id) FROM (SELECT id FROM {self.table} WHERE {self.column} < %s "
+                f"ORDER BY id LIMIT %s) AS chunk",
+                (stamp, self.chunk_size)
+            )
+            if upper is None:
+                break
+            try:
+                with self.db.transaction() as cursor:
+                    cursor.execute(f"DELETE FROM {self.table} WHERE id <= %s AND {self.column} < %s", (upper, stamp))
+                    count = max(cursor.rowcount, 0)
+            except Exception as e:
+                logging.error(f"Retention delete on {self.table} failed: {e}")
+                break
+            deleted += count
+            chunks += 1
+            if count < self.chunk_size:
+                break
+            time.sleep(self.pause)
+        return deleted, chunks
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> Dict:
+        """Apply the policy once and return a report of what was reclaimed."""
+        if not self.db.pool:
+            # Down since boot or lost; the next run picks up once the write buffer has reconnected
+            logging.info(f"Retention on {self.table} skipped: database not available")
+            return {"table": self.table, "skipped": "database not available",
+                    "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        with self.lock, RUN_SECONDS.time():
+            started = time.perf_counter()
+            cutoff = datetime.now() - timedelta(days=self.keep_days)
+            bytes_before = self.table_bytes()
+            partitions = self.partitions() if self.partition else []
+            mode = "partitions" if partitions else "chunked"
+            dropped, deleted, chunks, created, compacted = [], 0, 0, 0, False
+            if mode == "chunked":
+                deleted, chunks = self.delete_chunks(cutoff, stop_event)
+                if self.partition and self.migrate(cutoff):
+                    mode = "partitions"
+                    partitions = self.partitions()
+                elif self.compact and deleted and self.backend == "mariadb":
+                    # InnoDB rebuilds the table online; concurrent inserts keep going
+                    compacted = self.db.execute_query(f"OPTIMIZE TABLE {self.table}") is not None
+            if mode == "partitions":
+                dropped, rows = self.drop_partitions(partitions, cutoff)
+                deleted += rows
+                created = self.add_future_partitions(self.partitions())
+            bytes_after = self.table_bytes()
+            reclaimed = max(0, bytes_before - bytes_after) if None not in (bytes_before, bytes_after) else None
+            ROWS_PURGED.inc(deleted)
+            if reclaimed:
+                BYTES_RECLAIMED.inc(reclaimed)
+            self.last_report = {
+                "table": self.table,
+                "mode": mode,
+                "cutoff": cutoff.strftime("%Y-%m-%d %H:%M:%S"),
+                "rows_deleted": deleted,
+                "chunks": chunks,
+                "partitions_dropped": dropped,
+                "partitions_created": created,
+                "compacted": compacted,
+                "bytes_before": bytes_before,
+                "bytes_after": bytes_after,
+                "bytes_reclaimed": reclaimed,
+                "seconds": round(time.perf_counter() - started, 3),
+                "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            logging.info(f"Retention on {self.table}: removed {deleted} rows ({mode}), "
+                         f"reclaimed {reclaimed if reclaimed is not None else '?'} bytes")
+            return self.last_report
+
+class RetentionService:
+    """Run a RetentionPolicy on a background thread every `interval` seconds."""
+
+    def __init__(self, policy: RetentionPolicy, interval: float = 6 * 3600, initial_delay: float = 60.0):
+        self.policy = policy
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _run(self):
+        # Let startup traffic settle before the first purge
+        if self.stop_event.wait(self.initial_delay):
+            return
+        while not self.stop_event.is_set():
+            try:
+                self.policy.run(self.stop_event)
+            except Exception as e:
+                logging.error(f"Retention run failed: {e}")
+            self.stop_event.wait(self.interval)
+
+    def trigger(self) -> bool:
+        """Start an extra run now in the background; False if one is already in progress."""
+        if self.policy.lock.locked():
+            return False
+        threading.Thread(target=self.policy.run, args=(self.stop_event,), name="retention-manual",
+                         daemon=True).start()
+        return True
+
+    def status(self) -> Dict:
+        return {
+            "table": self.policy.table,
+            "busy": self.policy.lock.locked(),
+            "keep_days": self.policy.keep_days,
+            "partitioned": self.policy.partition,
+            "interval_seconds": self.interval,
+            "running": bool(self.thread and self.thread.is_alive()),
+            "last_run": self.policy.last_report,
+        }
@@ -0,0 +1,174 @@
+# src/utils/ring_store.py
+import math
+import numbers
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+class MetricRing:
+    """Preallocated timestamp/value columns for one metric, bucketed to a fixed resolution."""
+
+    def __init__(self, capacity: int, resolution: float):
+        self.capacity = capacity
+        self.resolution = resolution
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.index = 0
+        self.count = 0
+        self.bucket = None
+        self.bucket_samples = 0
+
+    def append(self, timestamp: float, value: float):
+        bucket = math.floor(timestamp / self.resolution)
+        if bucket == self.bucket and self.count:
+            # Same bucket as the previous sample: fold into a running mean in place
+            last = (self.index - 1) % self.capacity
+            self.bucket_samples += 1
+            self.values[last] += (value - self.values[last]) / self.bucket_samples
+            self.timestamps[last] = timestamp
+            return
+        if self.bucket is not None and bucket < self.bucket:
+            # Out-of-order sample older than the newest bucket; the ring must stay sorted
+            return
+        self.timestamps[self.index] = timestamp
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.bucket = bucket
+        self.bucket_samples = 1
+
+    def segments(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Return the stored data as up to two chronologically ordered array views."""
+        if self.count < self.capacity:
+            return [(self.timestamps[:self.count], self.values[:self.count])]
+        i = self.index
+        return [(self.timestamps[i:], self.values[i:]), (self.timestamps[:i], self.values[:i])]
+
+    def oldest(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return float(self.timestamps[0 if self.count < self.capacity else self.index])
+
+class RingStore:
+    """
+    Columnar in-memory store of recent readings per metric.
+
+    Each metric gets fixed-size NumPy columns covering `horizon` seconds at
+    `resolution` seconds per slot, so memory is bounded up front. Queries for
+    ranges older than what is held in memory are delegated to `fallback`
+    (typically a database query) and stitched in front of the in-memory data.
+    """
+
+    def __init__(self, horizon: float = 86400.0, resolution: float = 1.0,
+                 fallback: Optional[Callable[[str, float, float], Tuple[np.ndarray, np.ndarray]]] = None):
+        if horizon <= 0 or resolution <= 0:
+            raise ValueError("Ring store horizon and resolution must be positive")
+        self.horizon = horizon
+        self.resolution = resolution
+        self.capacity = int(math.ceil(horizon / resolution))
+        self.fallback = fallback
+        self.rings: Dict[str, MetricRing] = {}
+        self.lock = threading.Lock()
+
+    def metrics(self) -> List[str]:
+        return sorted(self.rings)
+
+    def append(self, metric: str, timestamp: float, value: float):
+        with self.lock:
+            ring = self.rings.get(metric)
+            if ring is None:
+                ring = self.rings[metric] = MetricRing(self.capacity, self.resolution)
+            ring.append(timestamp, value)
+
+    def ingest(self, sample):
+        """Store every numeric value of a SensorSample; usable as a SensorService subscriber."""
+        for metric, value in sample.values.items():
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                self.append(metric, sample.timestamp, float(value))
+
+    def last_n(self, metric: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self.lock:
+            ring = self.rings.get(metric)
+            if ring is None or n <= 0:
+                return np.empty(0), np.empty(0, dtype=np.float32)
+            n = min(n, ring.count)
+            order = (np.arange(ring.index - n, ring.index)) % ring.capacity
+            return ring.timestamps[order], ring.values[order]
+
+    def window(self, metric: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return readings with start <= timestamp < end in chronological order.
+        :param start: Window start (Unix time); defaults to the beginning of memory.
+        :param end: Window end (Unix time); defaults to now.
+        :return: Tuple of (timestamps, values) arrays.
+        """
+        end = time.time() if end is None else end
+        timestamps, values = [], []
+        with self.lock:
+            ring = self.rings.get(metric)
+            oldest = ring.oldest() if ring else None
+            if ring:
+                for ts, vals in ring.segments():
+                    lo = 0 if start is None else np.searchsorted(ts, start, side="left")
+                    hi = np.searchsorted(ts, end, side="left")
+                    if hi > lo:
+                        timestamps.append(ts[lo:hi].copy())
+                        values.append(vals[lo:hi].copy())
+
+        if self.fallback and start is not None and (oldest is None or start < oldest):
+            spill_end = end if oldest is None else min(end, oldest)
+            older_ts, older_values = self.fallback(metric, start, spill_end)
+            if len(older_ts):
+                timestamps.insert(0, np.asarray(older_ts, dtype=np.float64))
+                values.insert(0, np.asarray(older_values, dtype=np.float32))
+
+        if not timestamps:
+            return np.empty(0), np.empty(0, dtype=np.float32)
+        return np.concatenate(timestamps), np.concatenate(values)
+
+    def aggregate(self, metric: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+        return window_stats(self.window(metric, start, end)[1])
+
+    def downsample(self, metric: str, start: float, end: Optional[float] = None,
+                   points: int = 300) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Average the window into at most `points` equal-width buckets; empty buckets are dropped.
+        :return: Tuple of (bucket centre timestamps, bucket means).
+        """
+        end = time.time() if end is None else end
+        timestamps, values = self.window(metric, start, end)
+        return bucket_means(timestamps, values, start, end, points)
+
+def window_stats(values: np.ndarray) -> Dict:
+    """Count, mean, min, max and last of a window's values."""
+    if not len(values):
+        return {"count": 0, "mean": None, "min": None, "max": None, "last": None}
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean(dtype=np.float64)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "last": float(values[-1]),
+    }
+
+def bucket_means(timestamps: np.ndarray, values: np.ndarray, start: float, end: float,
+                 points: int = 300) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average a window from RingStore.window into at most `points` equal-width buckets over [start, end).
+    Empty buckets are dropped.
+    :return: Tuple of (bucket centre timestamps, bucket means).
+    """
+    if not len(values) or points <= 0:
+        return np.empty(0), np.empty(0)
+    if len(values) <= points:
+        return timestamps, values.astype(np.float64)
+    width = (end - start) / points
+    buckets = np.clip(((timestamps - start) / width).astype(np.int64), 0, points - 1)
+    counts = np.bincount(buckets, minlength=points)
+    sums = np.bincount(buckets, weights=values, minlength=points)
+    filled = counts > 0
+    centres = start + (np.arange(points) + 0.5) * width
+    return centres[filled], sums[filled] / counts[filled]
@@ -0,0 +1,304 @@
+# src/utils/sensor_service.py
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+
+SensorSample = namedtuple("SensorSample", ["device", "timestamp", "values"])
+
+# Default polling rates (Hz): motion is sampled fast, slow-moving climate readings rarely
+DEFAULT_RATES = {
+    "icm20x": 50.0,
+    "ads1015": 10.0,
+    "tcs34725": 2.0,
+    "lps2x": 1.0,
+    "shtc3": 0.2,
+}
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse a rate override string such as "icm20x=100,shtc3=0.5".
+    :param spec: Comma-separated device=hz pairs.
+    :return: Dictionary of device name to polling rate in Hz.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, value = item.partition("=")
+        rate = float(value)
+        if rate <= 0:
+            raise ValueError(f"Sensor rate for {name} must be positive")
+        rates[name.strip()] = rate
+    return rates
+
+class SimulatedBus:
+    """Sensor bus stand-in producing plausible, smoothly varying readings without hardware."""
+
+    name = "simulated"
+
+    def __init__(self, seed: Optional[int] = None, read_latency: float = 0.0, failure_rate: float = 0.0):
+        self.random = random.Random(seed)
+        self.read_latency = read_latency
+        self.failure_rate = failure_rate
+        self.started = time.monotonic()
+
+    def devices(self) -> List[str]:
+        return list(DEFAULT_RATES)
+
+    def read(self, device: str) -> Dict[str, float]:
+        if self.read_latency:
+            time.sleep(self.read_latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise IOError(f"Simulated I2C error on {device}")
+        t = time.monotonic() - self.started
+        noise = self.random.gauss
+        if device == "icm20x":
+            return {
+                "accel_x": noise(0.0, 0.05),
+                "accel_y": noise(0.0, 0.05),
+                "accel_z": 9.81 + noise(0.0, 0.05),
+                "gyro_x": noise(0.0, 0.01),
+                "gyro_y": noise(0.0, 0.01),
+                "gyro_z": noise(0.0, 0.01),
+            }
+        if device == "ads1015":
+            return {
+                "analog_value": int(512 + 200 * math.sin(t / 60.0) + noise(0, 5)),
+                "soil_moisture": max(0.0, min(100.0, 55 + 10 * math.sin(t / 600.0) + noise(0, 0.5))),
+            }
+        if device == "tcs34725":
+            level = 0.5 + 0.5 * math.sin(t / 300.0)
+            return {
+                "color_red": int(80 + 120 * level),
+                "color_green": int(100 + 140 * level),
+                "color_blue": int(60 + 90 * level),
+                "light_intensity": 100 + 900 * level + noise(0, 5),
+            }
+        if device == "lps2x":
+            return {
+                "pressure": 1013.25 + 2 * math.sin(t / 900.0) + noise(0, 0.05),
+                "temperature_lps": 21 + 3 * math.sin(t / 1200.0) + noise(0, 0.05),
+            }
+        if device == "shtc3":
+            return {
+                "temperature_sht": 21 + 3 * math.sin(t / 1200.0) + noise(0, 0.05),
+                "humidity": 50 + 15 * math.sin(t / 1800.0) + noise(0, 0.2),
+            }
+        raise KeyError(f"Unknown sensor device: {device}")
+
+class I2CBus:
+    """Hardware sensor bus using the Adafruit CircuitPython drivers."""
+
+    name = "i2c"
+
+    def __init__(self):
+        # Imported lazily so the service can run on machines without Blinka installed
+        import board
+        import busio
+
+        self.i2c = busio.I2C(board.SCL, board.SDA)
+        self.drivers = {}
+        for device, factory in (
+            ("ads1015", self._init_ads1015),
+            ("tcs34725", self._init_tcs34725),
+            ("icm20x", self._init_icm20x),
+            ("lps2x", self._init_lps2x),
+            ("shtc3", self._init_shtc3),
+        ):
+            try:
+                self.drivers[device] = factory()
+                logging.info(f"Sensor {device} initialized on I2C bus")
+            except Exception as e:
+                logging.warning(f"Sensor {device} not available: {e}")
+        if not self.drivers:
+            raise IOError("No I2C sensors responded")
+
+    def _init_ads1015(self):
+        import adafruit_ads1x15.ads1015 as ADS
+        from adafruit_ads1x15.analog_in import AnalogIn
+        ads = ADS.ADS1015(self.i2c)
+        return AnalogIn(ads, ADS.P0), AnalogIn(ads, ADS.P1)
+
+    def _init_tcs34725(self):
+        import adafruit_tcs34725
+        return adafruit_tcs34725.TCS34725(self.i2c)
+
+    def _init_icm20x(self):
+        import adafruit_icm20x
+        return adafruit_icm20x.ICM20948(self.i2c)
+
+    def _init_lps2x(self):
+        import adafruit_lps2x
+        return adafruit_lps2x.LPS22(self.i2c)
+
+    def _init_shtc3(self):
+        import adafruit_shtc3
+        return adafruit_shtc3.SHTC3(self.i2c)
+
+    def devices(self) -> List[str]:
+        return list(self.drivers)
+
+    def read(self, device: str) -> Dict[str, float]:
+        driver = self.drivers[device]
+        if device == "ads1015":
+            analog, soil = driver
+            return {
+                "analog_value": analog.value,
+                "soil_moisture": max(0.0, min(100.0, 100.0 * (1.0 - soil.voltage / 3.3))),
+            }
+        if device == "tcs34725":
+            red, green, blue = driver.color_rgb_bytes
+            return {"color_red": red, "color_green": green, "color_blue": blue, "light_intensity": driver.lux}
+        if device == "icm20x":
+            ax, ay, az = driver.acceleration
+            gx, gy, gz = driver.gyro
+            return {"accel_x": ax, "accel_y": ay, "accel_z": az, "gyro_x": gx, "gyro_y": gy, "gyro_z": gz}
+        if device == "lps2x":
+            return {"pressure": driver.pressure, "temperature_lps": driver.temperature}
+        if device == "shtc3":
+            temperature, humidity = driver.measurements
+            return {"temperature_sht": temperature, "humidity": humidity}
+        raise KeyError(f"Unknown sensor device: {device}")
+
+def create_bus(kind: str = "i2c", **kwargs):
+    """
+    Create a sensor bus backend.
+    :param kind: "i2c", "simulated" or "auto" (I2C with simulated fallback, for diagnostics only).
+    :return: Bus instance exposing devices() and read(device).
+    """
+    if kind == "simulated":
+        return SimulatedBus(**kwargs)
+    try:
+        return I2CBus()
+    except Exception as e:
+        if kind == "i2c":
+            raise
+        logging.warning(f"I2C sensor bus unavailable ({e}); using simulated sensors")
+        return SimulatedBus(**kwargs)
+
+class SensorService:
+    """
+    Poll every device on its own schedule from a single background thread.
+
+    The bus is only touched by the polling thread. Consumers either read the
+    merged `snapshot()` or `subscribe()` to every timestamped SensorSample.
+    Subscribers run on the polling thread and must return quickly.
+    """
+
+    def __init__(self, bus, rates: Optional[Dict[str, float]] = None, max_backoff: float = 30.0):
+        self.bus = bus
+        self.rates = {device: DEFAULT_RATES.get(device, 1.0) for device in bus.devices()}
+        for device, rate in (rates or {}).items():
+            if device in self.rates:
+                self.rates[device] = rate
+        self.max_backoff = max_backoff
+        self.subscribers: List[Callable[[SensorSample], None]] = []
+        self.latest: Dict[str, SensorSample] = {}
+        self.stats_by_device = {
+            device: {"reads": 0, "errors": 0, "late": 0, "last_error": None, "read_ms": 0.0}
+            for device in self.rates
+        }
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started_at = None
+
+    def subscribe(self, callback: Callable[[SensorSample], None]):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SensorSample], None]):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name="sensor-service", daemon=True)
+        self.thread.start()
+        rates = ", ".join(f"{device}@{rate:g}Hz" for device, rate in self.rates.items())
+        logging.info(f"Sensor service started on {self.bus.name} bus: {rates}")
+
+    def stop(self, timeout: float = 2.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _run(self):
+        now = time.monotonic()
+        schedule = [(now, device) for device in self.rates]
+        heapq.heapify(schedule)
+        failures = {device: 0 for device in self.rates}
+        while schedule and not self.stop_event.is_set():
+            due, device = schedule[0]
+            delay = due - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            heapq.heappop(schedule)
+            period = 1.0 / self.rates[device]
+            stats = self.stats_by_device[device]
+            started = time.monotonic()
+            if started - due > period:
+                stats["late"] += 1
+            try:
+                values = self.bus.read(device)
+                timestamp = time.time()
+                failures[device] = 0
+            except Exception as e:
+                failures[device] += 1
+                stats["errors"] += 1
+                stats["last_error"] = str(e)
+                backoff = min(self.max_backoff, period * (2 ** failures[device]))
+                if failures[device] == 1:
+                    logging.warning(f"Sensor {device} read failed: {e}")
+                heapq.heappush(schedule, (time.monotonic() + backoff, device))
+                continue
+            stats["reads"] += 1
+            stats["read_ms"] = round((time.monotonic() - started) * 1000, 3)
+            self._publish(SensorSample(device, timestamp, values))
+            # Keep a fixed cadence; if we fell more than a period behind, resync instead of bursting
+            next_due = due + period
+            if next_due < time.monotonic():
+                next_due = time.monotonic() + period
+            heapq.heappush(schedule, (next_due, device))
+
+    def _publish(self, sample: SensorSample):
+        self.latest[sample.device] = sample
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(sample)
+            except Exception as e:
+                logging.error(f"Sensor subscriber failed for {sample.device}: {e}")
+
+    def snapshot(self) -> Dict:
+        """Merge the most recent reading of every device; never touches the bus."""
+        data = {}
+        timestamps = {}
+        for device, sample in list(self.latest.items()):
+            data.update(sample.values)
+            timestamps[device] = sample.timestamp
+        data["sampled_at"] = timestamps
+        return data
+
+    def stats(self) -> Dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "bus": self.bus.name,
+            "devices": {
+                device: {
+                    **stats,
+                    "target_hz": self.rates[device],
+                    "achieved_hz": round(stats["reads"] / elapsed, 2) if elapsed else 0.0,
+                }
+                for device, stats in self.stats_by_device.items()
+            },
+        }
@@ -0,0 +1,105 @@
+# src/utils/snapshot_writer.py
+import logging
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+
+from src.utils import metrics
+
+ENCODE_SECONDS = metrics.stage_timer("snapshot_encode")
+
+class SnapshotWriter:
+    """
+    Encode and write snapshot frames on a background thread.
+
+    `submit()` only assigns file names and enqueues copies of frames that were
+    already captured, so taking a snapshot never adds a camera read or an
+    encode to the request, stream or inference paths.
+    """
+
+    def __init__(self, directory: str, quality: int = 95, max_pending: int = 64):
+        self.directory = directory
+        self.quality = quality
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.pending: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+        self.thread = None
+        os.makedirs(directory, exist_ok=True)
+        metrics.registry.gauge("snapshot_queue_depth", "Snapshots waiting to be encoded").set_function(self.queue.qsize)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+
+    def submit(self, snapshots, prefix: str = "snapshot") -> Optional[List[Dict]]:
+        """
+        Queue frames for writing.
+        :param snapshots: FrameSnapshot objects holding frames the caller owns.
+        :param prefix: File name prefix, e.g. the camera name.
+        :return: One {"filename", "timestamp"} entry per frame, or None if the queue is full.
+        """
+        if self.queue.maxsize - self.queue.qsize() < len(snapshots):
+            return None
+        entries = []
+        # Two requests can snapshot the same frame; the suffix keeps their files apart
+        request_id = uuid.uuid4().hex[:8]
+        for snapshot in snapshots:
+            captured = datetime.fromtimestamp(snapshot.timestamp)
+            filename = f"{prefix}_{captured.strftime('%Y%m%d_%H%M%S_%f')[:-3]}_{snapshot.sequence}_{request_id}.jpg"
+            with self.lock:
+                self.pending[filename] = threading.Event()
+            try:
+                self.queue.put_nowait((filename, snapshot.frame))
+            except queue.Full:
+                # Raced with another burst; return what was queued rather than block the request
+                with self.lock:
+                    self.pending.pop(filename, None)
+                break
+            entries.append({"filename": filename, "timestamp": snapshot.timestamp})
+        return entries or None
+
+    def wait(self, filename: str, timeout: float = 2.0) -> bool:
+        """Wait for a queued snapshot to reach disk; True if it is not (or no longer) pending."""
+        with self.lock:
+            event = self.pending.get(filename)
+        return event is None or event.wait(timeout)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            filename, frame = item
+            path = os.path.join(self.directory, filename)
+            temporary = path[:-len(".jpg")] + ".tmp.jpg"
+            try:
+                with ENCODE_SECONDS.time():
+                    ok = cv2.imwrite(temporary, frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ok:
+                    raise IOError(f"cv2.imwrite failed for {temporary}")
+                # Rename last so readers never see a partially written file
+                os.replace(temporary, path)
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Failed to write snapshot {filename}: {e}")
+            finally:
+                with self.lock:
+                    event = self.pending.pop(filename, None)
+                if event:
+                    event.set()
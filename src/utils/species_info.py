@@ -0,0 +1,207 @@
+# src/utils/species_info.py
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from src.utils import metrics
+
+DEFAULT_UPSTREAM = "https://en.wikipedia.org/w/api.php"
+
+LOOKUPS = {
+    source: metrics.registry.counter("species_info_lookups_total", "Species info lookups by where they were served from",
+                                     labels={"source": source})
+    for source in ("memory", "disk", "upstream", "coalesced")
+}
+UPSTREAM_ERRORS = metrics.registry.counter("species_info_upstream_errors_total", "Failed upstream species lookups")
+UPSTREAM_SECONDS = metrics.stage_timer("species_info_upstream")
+
+def scientific_name(label: str) -> str:
+    """Reduce a model label such as "Betula lenta (Sweet birch)" to the name to look up."""
+    return re.sub(r"\s*\(.*\)\s*$", "", label).strip() or label.strip()
+
+class SpeciesInfoService:
+    """
+    Thumbnail and summary lookups for detected species, cached on the server.
+
+    Lookups go memory LRU -> SQLite disk cache -> upstream (a MediaWiki API,
+    replaceable by a local fixture server through `upstream_url`). Concurrent
+    requests for the same species share one upstream call. Failed lookups are
+    cached for `negative_ttl` so an unreachable upstream is not hammered.
+    """
+
+    def __init__(self, upstream_url: str = DEFAULT_UPSTREAM, cache_path: Optional[str] = None,
+                 memory_size: int = 512, ttl: float = 30 * 86400, negative_ttl: float = 3600,
+                 timeout: float = 3.0, prefetch_workers: int = 2):
+        self.upstream_url = upstream_url
+        self.cache_path = cache_path
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self.in_flight: Dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="species-prefetch")
+        self.db = None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(cache_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS species_info (name TEXT PRIMARY KEY, data TEXT, fetched_at REAL)"
+            )
+            self.db.commit()
+
+    def _fresh(self, entry: Dict) -> bool:
+        ttl = self.ttl if entry.get("found") else self.negative_ttl
+        return time.time() - entry["fetched_at"] < ttl
+
+    def _remember(self, name: str, entry: Dict):
+        with self.lock:
+            self.memory[name] = entry
+            self.memory.move_to_end(name)
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+
+    def _from_memory(self, name: str) -> Optional[Dict]:
+        with self.lock:
+            entry = self.memory.get(name)
+            if entry is not None and self._fresh(entry):
+                self.memory.move_to_end(name)
+                return entry
+        return None
+
+    def _from_disk(self, name: str) -> Optional[Dict]:
+        if self.db is None:
+            return None
+        with self.db_lock:
+            row = self.db.execute("SELECT data FROM species_info WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        entry = json.loads(row[0])
+        return entry if self._fresh(entry) else None
+
+    def _store(self, name: str, entry: Dict):
+        self._remember(name, entry)
+        if self.db is None:
+            return
+        with self.db_lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO species_info (name, data, fetched_at) VALUES (?, ?, ?)",
+                (name, json.dumps(entry), entry["fetched_at"])
+            )
+            self.db.commit()
+
+    def _fetch(self, name: str) -> Dict:
+        query = urllib.parse.urlencode({
+            "action": "query",
+            "titles": name,
+            "prop": "pageimages|extracts|info",
+            "inprop": "url",
+            "exintro": 1,
+            "explaintext": 1,
+            "exsentences": 2,
+            "pithumbsize": 100,
+            "redirects": 1,
+            "format": "json",
+        })
+        request = urllib.request.Request(f"{self.upstream_url}?{query}", headers={"User-Agent": "GardenHub/1.0"})
+        with UPSTREAM_SECONDS.time():
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.load(response)
+        pages = data.get("query", {}).get("pages", {})
+        page = next(iter(pages.values()), {}) if pages else {}
+        found = bool(page) and "missing" not in page
+        return {
+            "name": name,
+            "found": found,
+            "title": page.get("title"),
+            "thumbnail": page.get("thumbnail", {}).get("source"),
+            "summary": page.get("extract"),
+            "url": page.get("fullurl"),
+            "fetched_at": time.time(),
+        }
+
+    def lookup(self, label: str) -> Dict:
+        """
+        Return cached or freshly fetched info for a species label.
+        :return: Dictionary with name, found, title, thumbnail, summary, url and fetched_at.
+        """
+        name = scientific_name(label)
+        entry = self._from_memory(name)
+        if entry is not None:
+            LOOKUPS["memory"].inc()
+            return entry
+        with self.lock:
+            event = self.in_flight.get(name)
+            leader = event is None
+            if leader:
+                event = self.in_flight[name] = threading.Event()
+        if not leader:
+            # Another request is already fetching this species; wait for its result
+            event.wait(self.timeout * 2)
+            LOOKUPS["coalesced"].inc()
+            return self._from_memory(name) or self._error_entry(name)
+        try:
+            entry = self._from_disk(name)
+            if entry is not None:
+                LOOKUPS["disk"].inc()
+                self._remember(name, entry)
+                return entry
+            LOOKUPS["upstream"].inc()
+            try:
+                entry = self._fetch(name)
+            except Exception as e:
+                UPSTREAM_ERRORS.inc()
+                logging.warning(f"Species info lookup failed for {name}: {e}")
+                entry = self._error_entry(name)
+            self._store(name, entry)
+            return entry
+        finally:
+            with self.lock:
+                self.in_flight.pop(name, None)
+            event.set()
+
+    def _error_entry(self, name: str) -> Dict:
+        return {"name": name, "found": False, "title": None, "thumbnail": None, "summary": None,
+                "url": None, "fetched_at": time.time()}
+
+    def prefetch(self, labels: Iterable[str]) -> int:
+        """Warm the caches for labels in the background; returns how many lookups were queued."""
+        names = list(OrderedDict.fromkeys(scientific_name(label) for label in labels))
+        queued = 0
+        for name in names:
+            if self._from_memory(name) is None:
+                self.prefetcher.submit(self.lookup, name)
+                queued += 1
+        return queued
+
+    def stats(self) -> Dict:
+        with self.lock:
+            memory = len(self.memory)
+        disk = None
+        if self.db is not None:
+            with self.db_lock:
+                disk = self.db.execute("SELECT COUNT(*) FROM species_info").fetchone()[0]
+        return {
+            "upstream": self.upstream_url,
+            "memory_entries": memory,
+            "disk_entries": disk,
+            "lookups": {source: counter.value for source, counter in LOOKUPS.items()},
+            "upstream_errors": UPSTREAM_ERRORS.value,
+        }
+
+    def close(self):
+        self.prefetcher.shutdown(wait=False)
+        if self.db is not None:
+            with self.db_lock:
+                self.db.close()
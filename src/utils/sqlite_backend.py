@@ -0,0 +1,76 @@
+# src/utils/sqlite_backend.py
+"""
+SQLite stand-in for MariaDB, usable as a PooledDB creator.
+
+Queries are written for MariaDB throughout the app; this module rewrites the
+handful of dialect differences the app relies on (%s placeholders,
+AUTO_INCREMENT, ENGINE clauses, UNIX_TIMESTAMP/FROM_UNIXTIME, upserts) so benchmarks
+and tests can run without a database server.
+"""
+import re
+import sqlite3
+
+threadsafety = 1
+paramstyle = "format"
+Error = sqlite3.Error
+OperationalError = sqlite3.OperationalError
+InterfaceError = sqlite3.InterfaceError
+InternalError = sqlite3.InternalError
+
+_REWRITES = [
+    (re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bBIGINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\)\s*ENGINE\s*=\s*\w+", re.I), ")"),
+    (re.compile(r"\bUNIX_TIMESTAMP\(([^()]*)\)", re.I), r"CAST(strftime('%s', \1, 'utc') AS REAL)"),
+    (re.compile(r"\bFROM_UNIXTIME\(([^()]*)\)", re.I), r"datetime(\1, 'unixepoch', 'localtime')"),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I), "ON CONFLICT DO UPDATE SET"),
+    (re.compile(r"\bVALUES\(([A-Za-z_]\w*)\)", re.I), r"excluded.\1"),
+    (re.compile(r"\bGREATEST\(", re.I), "MAX("),
+]
+
+def translate(query: str) -> str:
+    """Rewrite a MariaDB query into the SQLite dialect."""
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    # Placeholders last so the strftime('%s') format above is not mistaken for one
+    return re.sub(r"(?<!')%s(?!')", "?", query)
+
+class Cursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        return self._cursor.execute(translate(query), params or ())
+
+    def executemany(self, query, seq_of_params):
+        return self._cursor.executemany(translate(query), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+class Connection:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        # MariaDB-only cursor options (buffered, prepared, ...) have no SQLite equivalent
+        return Cursor(self._connection.cursor())
+
+    def ping(self, reconnect=False):
+        """Mirror mariadb's ping() so DBUtils pre-ping works against SQLite too."""
+        self._connection.execute("SELECT 1")
+        return True
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+def connect(database=":memory:", **kwargs):
+    """Open a connection; MariaDB keyword arguments such as host or user are ignored."""
+    connection = sqlite3.connect(database, check_same_thread=False, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA foreign_keys=ON")
+    return Connection(connection)
@@ -0,0 +1,190 @@
+# src/utils/system_sampler.py
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from src.utils.network import get_network_status
+
+THERMAL_ZONE_PATH = "/sys/class/thermal/thermal_zone0/temp"
+
+class SystemSampler:
+    """
+    Sample host and process metrics on a background thread into a fixed-size ring buffer.
+
+    Readers never call psutil themselves: `latest()` returns the last sample and
+    `history()` copies a window out of the preallocated NumPy arrays.
+    """
+
+    FIELDS = (
+        "cpu_usage",
+        "ram_usage",
+        "storage_usage",
+        "temperature",
+        "process_cpu",
+        "process_rss_mb",
+        "process_threads",
+    )
+
+    def __init__(self, interval: float = 1.0, capacity: int = 3600, disk_path: str = "/",
+                 network_interval: float = 60.0):
+        if interval <= 0 or capacity <= 0:
+            raise ValueError("Sampler interval and capacity must be positive")
+        self.interval = interval
+        self.capacity = capacity
+        self.disk_path = disk_path
+        self.network_interval = network_interval
+        self.num_cores = psutil.cpu_count() or 1
+
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.full((capacity, len(self.FIELDS)), np.nan, dtype=np.float32)
+        self.per_core = np.full((capacity, self.num_cores), np.nan, dtype=np.float32)
+        self.index = 0
+        self.count = 0
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.process = psutil.Process(os.getpid())
+        self._latest = self._empty_snapshot()
+        self._network = {"connected": False, "ip_address": "N/A"}
+        self._network_checked = 0.0
+
+    def _empty_snapshot(self) -> Dict:
+        snapshot = {field: None for field in self.FIELDS}
+        snapshot.update({"cpu_per_core": [], "sampled_at": None})
+        return snapshot
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        # Prime psutil's non-blocking counters so the first real sample has a baseline
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        self.process.cpu_percent(interval=None)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        self.thread.start()
+        logging.info(f"System sampler started: every {self.interval}s, {self.capacity} samples of history")
+
+    def stop(self, timeout: float = 2.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logging.error(f"System sampling failed: {e}")
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Fell behind (e.g. suspended); skip missed ticks instead of bursting
+                next_tick = time.monotonic()
+                delay = 0
+            self.stop_event.wait(delay)
+
+    def _read_temperature(self) -> float:
+        sensors = getattr(psutil, "sensors_temperatures", None)
+        if sensors:
+            try:
+                readings = sensors()
+                for name in ("cpu_thermal", "coretemp", "k10temp", "soc_thermal"):
+                    if readings.get(name):
+                        return float(readings[name][0].current)
+                for entries in readings.values():
+                    if entries:
+                        return float(entries[0].current)
+            except Exception:
+                pass
+        try:
+            with open(THERMAL_ZONE_PATH, "r") as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError):
+            return math.nan
+
+    def sample(self) -> Dict:
+        """Take one sample, store it in the ring buffer and return it."""
+        now = time.time()
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        with self.process.oneshot():
+            process_cpu = self.process.cpu_percent(interval=None)
+            process_rss = self.process.memory_info().rss / (1024 * 1024)
+            process_threads = self.process.num_threads()
+        row = (
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            psutil.disk_usage(self.disk_path).percent,
+            self._read_temperature(),
+            process_cpu,
+            process_rss,
+            process_threads,
+        )
+
+        if now - self._network_checked >= self.network_interval:
+            self._network = get_network_status()
+            self._network_checked = now
+
+        with self.lock:
+            i = self.index
+            self.timestamps[i] = now
+            self.values[i] = row
+            self.per_core[i, :len(per_core)] = per_core[:self.num_cores]
+            self.index = (i + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+        snapshot = {field: self._to_json(value) for field, value in zip(self.FIELDS, row)}
+        snapshot["cpu_per_core"] = [float(v) for v in per_core]
+        snapshot["sampled_at"] = now
+        snapshot.update(self._network)
+        # Swap the reference in one step so readers never see a half-built dict
+        self._latest = snapshot
+        return snapshot
+
+    @staticmethod
+    def _to_json(value) -> Optional[float]:
+        value = float(value)
+        return None if math.isnan(value) else round(value, 2)
+
+    def latest(self) -> Dict:
+        """Return the most recent sample without blocking."""
+        return self._latest
+
+    def history(self, seconds: Optional[float] = None, max_points: Optional[int] = None) -> Dict[str, List]:
+        """
+        Return buffered samples in chronological order.
+        :param seconds: Only include samples from the last N seconds.
+        :param max_points: Decimate the window to at most this many points.
+        :return: Dictionary of column name to list of values.
+        """
+        with self.lock:
+            count = self.count
+            start = (self.index - count) % self.capacity
+            order = (np.arange(count) + start) % self.capacity
+            timestamps = self.timestamps[order]
+            values = self.values[order]
+            per_core = self.per_core[order]
+
+        if seconds is not None and count:
+            keep = timestamps >= time.time() - seconds
+            timestamps, values, per_core = timestamps[keep], values[keep], per_core[keep]
+        if max_points and len(timestamps) > max_points:
+            step = int(math.ceil(len(timestamps) / max_points))
+            timestamps, values, per_core = timestamps[::step], values[::step], per_core[::step]
+
+        values = np.round(values.astype(np.float64), 2)
+        per_core = np.round(per_core.astype(np.float64), 2)
+        history = {"timestamp": timestamps.tolist()}
+        for column, field in enumerate(self.FIELDS):
+            history[field] = [None if math.isnan(v) else v for v in values[:, column].tolist()]
+        history["cpu_per_core"] = [[None if math.isnan(v) else v for v in row] for row in per_core.tolist()]
+        return history
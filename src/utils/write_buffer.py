@@ -0,0 +1,226 @@
+# src/utils/write_buffer.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import metrics
+
+APPENDED = metrics.registry.counter("write_buffer_appended_total", "Writes accepted into the local buffer")
+REPLAYED = metrics.registry.counter("write_buffer_replayed_total", "Buffered writes forwarded to the database")
+DROPPED = metrics.registry.counter("write_buffer_dropped_total", "Oldest buffered writes discarded at the size cap")
+DEAD_LETTERED = metrics.registry.counter("write_buffer_dead_lettered_total",
+                                         "Buffered writes the database rejected, moved to the dead-letter table")
+REPLAY_SECONDS = metrics.stage_timer("write_buffer_replay")
+
+class WriteBuffer:
+    """
+    Store-and-forward buffer for database writes.
+
+    `append()` only touches a local SQLite file in WAL mode, so callers never
+    wait on the database and nothing is lost while it is unreachable. A
+    background thread forwards pending rows oldest first in batches through
+    `db.execute_batches()` and deletes them once committed. A crash between
+    the commit and the delete replays the batch, so statements must be
+    idempotent (e.g. INSERT IGNORE on a unique key carried in the params).
+    While the database is down the forwarder backs off up to `max_backoff`
+    and asks `db` to reconnect. If a batch fails while the database is
+    reachable, one of its rows is bad (a data or schema error INSERT IGNORE
+    does not absorb), so the batch is retried row by row and rows that still
+    fail move to the `dead_letter` table instead of blocking everything
+    buffered behind them.
+    """
+
+    def __init__(self, path: str, db, batch_size: int = 500, interval: float = 1.0,
+                 max_backoff: float = 60.0, max_rows: int = 1_000_000):
+        self.path = path
+        self.db = db
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.backoff = 0.0
+        self.last_error: Optional[str] = None
+        self.last_replay: Optional[Dict] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Survives an app crash; only an OS crash can lose the last few writes
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, statement TEXT NOT NULL, params TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letter ("
+            "seq INTEGER PRIMARY KEY, statement TEXT NOT NULL, params TEXT NOT NULL, created REAL NOT NULL, "
+            "failed REAL NOT NULL)"
+        )
+        self.conn.commit()
+        self.pending = self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        self.dead_lettered = self.conn.execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+        metrics.registry.gauge("write_buffer_backlog", "Writes waiting to be forwarded").set_function(lambda: self.pending)
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def append(self, statement: str, params: tuple):
+        """Queue one write; returns as soon as it is on local disk."""
+        row = (statement, json.dumps(params), time.time())
+        with self.lock:
+            if self.pending >= self.max_rows:
+                self._drop_oldest(max(1, self.max_rows // 100))
+            self.conn.execute("INSERT INTO pending (statement, params, created) VALUES (?, ?, ?)", row)
+            self.conn.commit()
+            self.pending += 1
+        APPENDED.inc()
+
+    def _drop_oldest(self, count: int):
+        dropped = self.conn.execute(
+            "DELETE FROM pending WHERE seq IN (SELECT seq FROM pending ORDER BY seq LIMIT ?)", (count,)
+        ).rowcount
+        self.pending -= dropped
+        DROPPED.inc(dropped)
+        logging.warning(f"Write buffer full ({self.max_rows} rows); dropped the {dropped} oldest")
+
+    def _read_rows(self) -> List[Tuple[int, str, str]]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT seq, statement, params FROM pending ORDER BY seq LIMIT ?", (self.batch_size,)
+            ).fetchall()
+
+    @staticmethod
+    def _group(rows: List[Tuple[int, str, str]]) -> List[Tuple[str, List[tuple]]]:
+        # Consecutive rows of the same statement become one executemany(), keeping write order
+        batches: List[Tuple[str, List[tuple]]] = []
+        for _, statement, params in rows:
+            if batches and batches[-1][0] == statement:
+                batches[-1][1].append(tuple(json.loads(params)))
+            else:
+                batches.append((statement, [tuple(json.loads(params))]))
+        return batches
+
+    def _delete_through(self, seq: int, exact: bool = False):
+        with self.lock:
+            deleted = self.conn.execute(
+                f"DELETE FROM pending WHERE seq {'=' if exact else '<='} ?", (seq,)
+            ).rowcount
+            self.conn.commit()
+            self.pending = max(0, self.pending - deleted)
+
+    def _reachable(self) -> bool:
+        # Tells a rejected row apart from a database that went away mid-batch
+        return self.db.execute_query("SELECT 1") is not None
+
+    def _dead_letter(self, seq: int):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dead_letter (seq, statement, params, created, failed) "
+                "SELECT seq, statement, params, created, ? FROM pending WHERE seq = ?", (time.time(), seq)
+            )
+            deleted = self.conn.execute("DELETE FROM pending WHERE seq = ?", (seq,)).rowcount
+            self.conn.commit()
+            self.pending = max(0, self.pending - deleted)
+            self.dead_lettered += deleted
+        DEAD_LETTERED.inc(deleted)
+        logging.error(f"Write buffer row {seq} was rejected by the database; moved to dead_letter")
+
+    def _forward_rows(self, rows: List[Tuple[int, str, str]]) -> int:
+        """Forward rows one at a time after a batch failed; returns rows forwarded, -1 if the database went away."""
+        forwarded = 0
+        for seq, statement, params in rows:
+            if self.db.execute_batches([(statement, [tuple(json.loads(params))])]):
+                self._delete_through(seq, exact=True)
+                forwarded += 1
+            elif self._reachable():
+                self._dead_letter(seq)
+            else:
+                self.last_error = "database unreachable during row-by-row replay"
+                break
+        REPLAYED.inc(forwarded)
+        if forwarded == 0 and self.last_error:
+            return -1
+        return forwarded
+
+    def forward(self) -> int:
+        """Forward one batch; returns rows forwarded (0 if nothing was pending or all were rejected), -1 on failure."""
+        rows = self._read_rows()
+        if not rows:
+            return 0
+        count = len(rows)
+        if not self.db.pool and not self.db.reconnect():
+            self.last_error = "database unreachable"
+            return -1
+        self.last_error = None
+        started = time.perf_counter()
+        with REPLAY_SECONDS.time():
+            ok = self.db.execute_batches(self._group(rows))
+        if not ok:
+            if not self._reachable():
+                self.last_error = "batch write failed"
+                return -1
+            logging.warning(f"Write buffer batch of {count} rows failed with the database up; retrying row by row")
+            return self._forward_rows(rows)
+        elapsed = time.perf_counter() - started
+        self._delete_through(rows[-1][0])
+        REPLAYED.inc(count)
+        self.last_replay = {
+            "rows": count,
+            "seconds": round(elapsed, 4),
+            "rows_per_second": round(count / elapsed, 1) if elapsed > 0 else None,
+            "at": time.time(),
+        }
+        return count
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            forwarded = self.forward()
+            if forwarded < 0:
+                self.backoff = min(self.max_backoff, max(self.interval, self.backoff * 2))
+                logging.warning(f"Write buffer holding {self.pending} rows; retrying in {self.backoff:.0f}s")
+                self.stop_event.wait(self.backoff)
+                continue
+            self.backoff = 0.0
+            if forwarded < self.batch_size:
+                # Caught up; let more writes accumulate into the next batch
+                self.stop_event.wait(self.interval)
+        # Last attempt to hand off what is pending before shutdown; anything left stays on disk
+        if self.pending and self.db.pool:
+            self.forward()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            oldest = self.conn.execute("SELECT MIN(created) FROM pending").fetchone()[0]
+        return {
+            "path": self.path,
+            "backlog": self.pending,
+            "oldest_age_seconds": round(time.time() - oldest, 1) if oldest else None,
+            "appended": int(APPENDED.value),
+            "replayed": int(REPLAYED.value),
+            "dropped": int(DROPPED.value),
+            "dead_lettered": self.dead_lettered,
+            "database_available": bool(self.db.pool),
+            "backoff_seconds": self.backoff,
+            "last_error": self.last_error,
+            "last_replay": self.last_replay,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
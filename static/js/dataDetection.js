@@ -1,18 +1,26 @@
 import { endpoints } from './routing.js';
 
+const PLACEHOLDER_IMAGE = "https://via.placeholder.com/50";
+// One lookup per species per page load; the server caches across browsers and restarts
+const speciesCache = new Map();
+
 // Function to fetch an image of the detected species
-export async function fetchSpeciesImage(speciesName) {
-    try {
-        const response = await fetch(`https://en.wikipedia.org/w/api.php?action=query&titles=${encodeURIComponent(speciesName)}&prop=pageimages&format=json&pithumbsize=100&origin=*`);
-        const data = await response.json();
-        const pages = data.query.pages;
-        const pageId = Object.keys(pages)[0];
-        const imageUrl = pages[pageId].thumbnail?.source;
-        return imageUrl || "https://via.placeholder.com/50"; // Fallback placeholder
-    } catch (error) {
-        console.error("Error fetching species image:", error);
-        return "https://via.placeholder.com/50"; // Fallback on error
+export function fetchSpeciesImage(speciesName) {
+    if (!speciesCache.has(speciesName)) {
+        const lookup = fetch(`${endpoints.speciesInfo}?label=${encodeURIComponent(speciesName)}`)
+            .then((response) => {
+                if (!response.ok) throw new Error(`HTTP error! Status: ${response.status}`);
+                return response.json();
+            })
+            .then((info) => info.thumbnail || PLACEHOLDER_IMAGE)
+            .catch((error) => {
+                console.error("Error fetching species image:", error);
+                speciesCache.delete(speciesName); // Retry on a later poll
+                return PLACEHOLDER_IMAGE;
+            });
+        speciesCache.set(speciesName, lookup);
     }
+    return speciesCache.get(speciesName);
 }
 
 // Fetch and display detection insights
@@ -52,12 +60,10 @@ export async function updateDetectionData() {
             detectionInsightsBox.classList.remove("highlight");
         }
 
-        // Fetch an image of the detected species
-        const imageUrl = await fetchSpeciesImage(highestConfidenceDetection.label);
-
-        // Create the insight card
+        // Create the insight card; the species image is filled in once its lookup resolves
         const insightCard = `
             <div class="insight-card">
+                <img class="species-image" src="${PLACEHOLDER_IMAGE}" alt="${highestConfidenceDetection.label}" width="50" height="50">
                 <div class="content">
                     <h6>Breaking: ${highestConfidenceDetection.label} detected with ${highestConfidenceDetection.confidence.toFixed(2)}% confidence!</h6>
                     <p>Did you know? ${highestConfidenceDetection.label} is a fascinating species!</p>
@@ -79,6 +85,12 @@ export async function updateDetectionData() {
                 `
             )
             .join("");
+
+        const label = highestConfidenceDetection.label;
+        fetchSpeciesImage(label).then((imageUrl) => {
+            const image = detectionInsights.querySelector(".species-image");
+            if (image && image.alt === label) image.src = imageUrl;
+        });
     } catch (error) {
         console.error("Error updating detection data:", error);
         detectionInsightsBox.classList.remove("highlight");
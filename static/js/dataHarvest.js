@@ -5,6 +5,6 @@ import { fetchData } from './utils.js';
 export function fetchHarvestScheduler() {
     fetchData(endpoints.harvestScheduler, 'harvest-scheduler-table-body', row => `
         <td>${row.plant_name}</td>
-        <td>${row.predicted_harvest_date}</td>
+        <td>${row.predicted_harvest_date ?? "Not enough data"}</td>
     `);
 }
\ No newline at end of file
@@ -8,9 +8,9 @@ export async function fetchSensorData() {
         const data = await response.json();
 
         // Update system monitoring data
-        document.getElementById("cpu-usage").textContent = `${data.cpu_usage.toFixed(2)}%`;
-        document.getElementById("ram-usage").textContent = `${data.ram_usage.toFixed(2)}%`;
-        document.getElementById("storage-usage").textContent = `${data.storage_usage.toFixed(2)}%`;
+        document.getElementById("cpu-usage").textContent = `${data.cpu_usage !== null ? data.cpu_usage.toFixed(2) + "%" : "N/A"}`;
+        document.getElementById("ram-usage").textContent = `${data.ram_usage !== null ? data.ram_usage.toFixed(2) + "%" : "N/A"}`;
+        document.getElementById("storage-usage").textContent = `${data.storage_usage !== null ? data.storage_usage.toFixed(2) + "%" : "N/A"}`;
 
         // Update IP address
         document.getElementById("ip-address").textContent = `IP: ${data.ip_address}`;
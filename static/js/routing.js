@@ -5,5 +5,7 @@ export const endpoints = {
     harvestScheduler: "/harvest_scheduler",
     growthGraph: "/growth_graph",
     sensorData: "/sensor_data",
-    inferenceData: "/inference_data"
+    systemHistory: "/system_history",
+    inferenceData: "/inference_data",
+    speciesInfo: "/species_info"
 };
\ No newline at end of file
@@ -109,7 +109,7 @@ function fetchSeasonalStatus() {
 function fetchHarvestScheduler() {
     fetchData(endpoints.harvestScheduler, "harvest-scheduler-table-body", (row) => `
         <td>${row.plant_name}</td>
-        <td>${row.predicted_harvest_date}</td>
+        <td>${row.predicted_harvest_date ?? "Not enough data"}</td>
     `);
 }
 
@@ -1,34 +1,32 @@
-function takeSnapshot() {
-    const videoFeed = document.querySelector(".video-feed img, .video-feed video");
-    if (!videoFeed) {
-        console.error("Video feed not found!");
-        alert("Error: Video feed not found!");
-        return;
-    }
-
-    // Create a canvas element
-    const canvas = document.createElement("canvas");
-    canvas.width = videoFeed.videoWidth || videoFeed.width;
-    canvas.height = videoFeed.videoHeight || videoFeed.height;
-    const context = canvas.getContext("2d");
-
-    // Draw the current frame from the video feed onto the canvas
-    context.drawImage(videoFeed, 0, 0, canvas.width, canvas.height);
+async function takeSnapshot(count = 1) {
+    try {
+        // The server copies the newest captured frame(s) and writes them in the background
+        const response = await fetch("/snapshot", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ count })
+        });
+        const data = await response.json();
+        if (!response.ok || !data.success) throw new Error(data.message || `HTTP error! Status: ${response.status}`);
 
-    // Generate a timestamp for the filename
-    const timestamp = new Date().toISOString().replace(/[:.]/g, "-");
-    const filename = `snapshot_${timestamp}.png`;
-
-    // Create a download link
-    const link = document.createElement("a");
-    link.download = filename;
-    link.href = canvas.toDataURL("image/png");
-    link.click();
-
-    // Provide feedback to the user
-    alert("Snapshot captured and downloaded!");
-    console.log(`Snapshot captured and saved as ${filename}`);
+        const snapshot = data.snapshots[data.snapshots.length - 1];
+        const preview = document.getElementById("snapshot-preview");
+        const modal = document.getElementById("snapshot-modal");
+        if (preview && modal && window.bootstrap) {
+            preview.src = snapshot.url;
+            window.bootstrap.Modal.getOrCreateInstance(modal).show();
+        } else {
+            const link = document.createElement("a");
+            link.download = snapshot.url.split("/").pop();
+            link.href = snapshot.url;
+            link.click();
+        }
+        console.log(`Snapshot saved: ${data.snapshots.map(s => s.url).join(", ")}`);
+    } catch (error) {
+        console.error("Error taking snapshot:", error);
+        alert("Failed to take snapshot: " + error.message);
+    }
 }
 
 // Attach the function to the window object
-window.takeSnapshot = takeSnapshot;
\ No newline at end of file
+window.takeSnapshot = takeSnapshot;
@@ -1,18 +1,20 @@
-import board
-import busio
-import adafruit_ads1x15.ads1015 as ADS
-from adafruit_ads1x15.analog_in import AnalogIn
-import adafruit_tcs34725
-import adafruit_icm20x
-import adafruit_lps2x
-import adafruit_shtc3
+from src.utils.sensor_service import create_bus
 
-def read_sensors():
-    # Add your sensor reading logic here
-    return {
-        "analog_value": 123,
-        "color_red": 255,
-        "accel_x": 0.5,
-        "pressure": 1013.25,
-        "temperature_sht": 25.0
-    }
\ No newline at end of file
+def read_sensors(bus=None):
+    """
+    Read every available sensor once and merge the values.
+
+    The dashboard uses the background SensorService instead; this is a
+    one-shot helper for diagnostics from the command line.
+    """
+    bus = bus or create_bus("auto")
+    data = {}
+    for device in bus.devices():
+        try:
+            data.update(bus.read(device))
+        except Exception as e:
+            data[f"{device}_error"] = str(e)
+    return data
+
+if __name__ == "__main__":
+    print(read_sensors())
@@ -1,9 +1,9 @@
 import psutil
 import socket
 
-def get_cpu_usage():
-    """Get CPU usage as a percentage."""
-    return psutil.cpu_percent(interval=1)
+def get_cpu_usage(interval=None):
+    """Get CPU usage as a percentage since the previous call (non-blocking by default)."""
+    return psutil.cpu_percent(interval=interval)
 
 def get_ram_usage():
     """Get RAM usage as a percentage."""
@@ -0,0 +1,89 @@
+import os
+
+from src.models.batch_classifier import ArchiveClassifier
+from src.utils import sqlite_backend
+
+class FakeDB:
+    """The db_manager surface ArchiveClassifier uses, over an SQLite connection."""
+
+    def __init__(self):
+        self.connection = sqlite_backend.connect()
+        self.connection.execute("""
+            CREATE TABLE image_classifications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, image_path TEXT NOT NULL, captured_at TEXT,
+                label_rank INT, label TEXT, confidence REAL
+            )""")
+        self.fail_writes = False
+
+    def execute_query(self, query, params=None):
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def execute_batches(self, batches):
+        if self.fail_writes:
+            return False
+        cursor = self.connection.cursor()
+        for query, rows in batches:
+            cursor.executemany(query, rows)
+        self.connection.commit()
+        return True
+
+    def labels(self):
+        return self.execute_query("SELECT image_path, label_rank, label FROM image_classifications ORDER BY image_path, label_rank")
+
+class FakeClassifier:
+    """Hands out fixed top-2 labels two images at a time, deleting `vanish` before its batch is written."""
+
+    def __init__(self, vanish=None):
+        self.vanish = vanish
+
+    def run(self, paths, on_batch, should_stop):
+        for i in range(0, len(paths), 2):
+            batch = [(path, [("tomato", 0.9), ("basil", 0.1)]) for path in paths[i:i + 2]]
+            if self.vanish in paths[i:i + 2]:
+                os.remove(self.vanish)
+            on_batch(batch)
+        return {"images": len(paths), "images_per_s": 0, "batch_size": 2, "workers": 1}
+
+def make_archive(tmp_path, count=3):
+    for i in range(count):
+        (tmp_path / f"frame_{i}.jpg").write_bytes(b"jpeg")
+    return [str(tmp_path / f"frame_{i}.jpg") for i in range(count)]
+
+def test_reclassify_replaces_existing_labels(tmp_path):
+    paths = make_archive(tmp_path)
+    db = FakeDB()
+    archive = ArchiveClassifier(db, FakeClassifier)
+    archive.run(str(tmp_path), reclassify=False)
+    first = db.labels()
+    assert len(first) == 6
+
+    archive.run(str(tmp_path), reclassify=True)
+    assert db.labels() == first
+    assert archive.status()["done"] == len(paths)
+
+    # Nothing is pending any more without reclassify
+    archive.run(str(tmp_path), reclassify=False)
+    assert archive.status()["total"] == 0
+
+def test_failed_write_does_not_advance_progress(tmp_path):
+    make_archive(tmp_path)
+    db = FakeDB()
+    db.fail_writes = True
+    archive = ArchiveClassifier(db, FakeClassifier)
+    archive.run(str(tmp_path), reclassify=False)
+    status = archive.status()
+    assert status["done"] == 0
+    assert status["failed"] == 3
+    assert db.labels() == []
+
+def test_vanished_image_is_skipped(tmp_path):
+    paths = make_archive(tmp_path)
+    db = FakeDB()
+    archive = ArchiveClassifier(db, lambda: FakeClassifier(vanish=paths[0]))
+    archive.run(str(tmp_path), reclassify=False)
+    status = archive.status()
+    assert "error" not in status["last_result"]
+    assert status["skipped"] == 1
+    assert {row[0] for row in db.labels()} == set(paths[1:])
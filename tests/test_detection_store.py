@@ -0,0 +1,115 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from src.utils import sqlite_backend
+from src.utils.detection_store import DETECTION_TABLES, Detection, DetectionWriter, hour_start, rollup, summarize
+
+class FakeDB:
+    """The db_manager surface the detection store uses, over an SQLite connection."""
+
+    def __init__(self):
+        self.connection = sqlite_backend.connect()
+        cursor = self.connection.cursor()
+        for statement in DETECTION_TABLES:
+            cursor.execute(statement)
+        self.fail_writes = False
+
+    def execute_query(self, query, params=None):
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def execute_batches(self, batches):
+        if self.fail_writes:
+            return False
+        cursor = self.connection.cursor()
+        for query, rows in batches:
+            if rows:
+                cursor.executemany(query, rows)
+        self.connection.commit()
+        return True
+
+@pytest.fixture(params=["UTC0", "IST-5:30"])
+def local_zone(request):
+    """Run in UTC and in a +05:30 zone, where UTC-epoch hours start at :30 local time."""
+    saved = os.environ.get("TZ")
+    os.environ["TZ"] = request.param
+    time.tzset()
+    yield request.param
+    if saved is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = saved
+    time.tzset()
+
+def local(text):
+    return datetime.fromisoformat(text).timestamp()
+
+def test_rollup_buckets_on_local_hours(local_zone):
+    detections = [
+        Detection(local("2024-05-01 10:05:00"), "bird", 3, "Robin", 0.5),
+        Detection(local("2024-05-01 10:59:59"), "bird", 3, "Robin", 0.8),
+        Detection(local("2024-05-01 11:00:00"), "bird", 3, "Robin", 0.4),
+        Detection(local("2024-05-01 10:20:00"), "plant", 7, "Basil", 0.9),
+    ]
+    rows = sorted(rollup(detections), key=lambda row: (row[0], row[1]))
+    assert rows == [
+        (local("2024-05-01 10:00:00"), "bird", 3, "Robin", 2, 0.8),
+        (local("2024-05-01 10:00:00"), "plant", 7, "Basil", 1, 0.9),
+        (local("2024-05-01 11:00:00"), "bird", 3, "Robin", 1, 0.4),
+    ]
+    assert hour_start(local("2024-05-01 10:30:00")) == local("2024-05-01 10:00:00")
+
+def test_flush_writes_detections_and_accumulates_rollups(local_zone):
+    db = FakeDB()
+    writer = DetectionWriter(db)
+    assert writer.flush([Detection(local("2024-05-01 10:05:00"), "bird", 3, "Robin", 0.5)])
+    assert writer.flush([
+        Detection(local("2024-05-01 10:40:00"), "bird", 3, "Robin", 0.9),
+        Detection(local("2024-05-01 11:10:00"), "bird", 3, "Robin", 0.2),
+    ])
+    assert db.execute_query("SELECT COUNT(*) FROM detections") == [(3,)]
+    rows = db.execute_query("SELECT bucket, detection_count, max_confidence FROM detection_rollups ORDER BY bucket")
+    assert [(bucket, count) for bucket, count, _ in rows] == [
+        ("2024-05-01 10:00:00", 2),
+        ("2024-05-01 11:00:00", 1),
+    ]
+    assert rows[0][2] == pytest.approx(0.9)
+
+    db.fail_writes = True
+    assert not writer.flush([Detection(local("2024-05-01 12:00:00"), "bird", 3, "Robin", 0.5)])
+    assert writer.flush([])
+
+def test_summarize_by_hour_and_day(local_zone):
+    db = FakeDB()
+    DetectionWriter(db).flush([
+        Detection(local("2024-05-01 10:05:00"), "bird", 3, "Robin", 0.5),
+        Detection(local("2024-05-01 10:45:00"), "bird", 3, "Robin", 0.7),
+        Detection(local("2024-05-01 10:50:00"), "plant", 7, "Basil", 0.6),
+        Detection(local("2024-05-01 23:30:00"), "bird", 3, "Robin", 0.9),
+        Detection(local("2024-05-02 01:00:00"), "bird", 4, "Wren", 0.3),
+    ])
+    hourly = summarize(db, "hour")
+    assert [(row["bucket"], row["label"], row["count"]) for row in hourly] == [
+        ("2024-05-01 10:00:00", "Robin", 2),
+        ("2024-05-01 10:00:00", "Basil", 1),
+        ("2024-05-01 23:00:00", "Robin", 1),
+        ("2024-05-02 01:00:00", "Wren", 1),
+    ]
+    daily = summarize(db, "day", category="bird")
+    assert [(row["bucket"], row["label"], row["count"]) for row in daily] == [
+        ("2024-05-01", "Robin", 3),
+        ("2024-05-02", "Wren", 1),
+    ]
+    assert daily[0]["max_confidence"] == pytest.approx(0.9)
+    # start is floored to its hour, so the 10:00 bucket is still included from 10:30
+    ranged = summarize(db, "hour", start=local("2024-05-01 10:30:00"), end=local("2024-05-02 00:00:00"), label="Robin")
+    assert [(row["bucket"], row["count"]) for row in ranged] == [
+        ("2024-05-01 10:00:00", 2),
+        ("2024-05-01 23:00:00", 1),
+    ]
+    with pytest.raises(ValueError):
+        summarize(db, "week")
@@ -0,0 +1,45 @@
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from src.utils.export import csv_chunks, encode, gzip_chunks, ndjson_chunks
+
+COLUMNS = ("id", "timestamp", "humidity", "note")
+CHUNKS = [
+    [(1, datetime(2024, 5, 1, 12, 30), Decimal("41.5"), "ok"), (2, datetime(2024, 5, 1, 12, 31), 42.0, 'say "hi", bye')],
+    [],
+    [(3, date(2024, 5, 2), None, b"raw")],
+]
+
+def test_csv_chunks_one_block_per_chunk_with_header():
+    blocks = list(csv_chunks(COLUMNS, CHUNKS))
+    assert len(blocks) == 3
+    assert b"".join(blocks).decode().splitlines() == [
+        "id,timestamp,humidity,note",
+        "1,2024-05-01 12:30:00,41.5,ok",
+        '2,2024-05-01 12:31:00,42.0,"say ""hi"", bye"',
+        "3,2024-05-02,,raw",
+    ]
+    # The header still goes out when there are no rows at all
+    assert list(csv_chunks(COLUMNS, [])) == [b"id,timestamp,humidity,note\r\n"]
+
+def test_ndjson_chunks():
+    lines = b"".join(ndjson_chunks(COLUMNS, CHUNKS)).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "timestamp": "2024-05-01 12:30:00", "humidity": 41.5, "note": "ok"},
+        {"id": 2, "timestamp": "2024-05-01 12:31:00", "humidity": 42.0, "note": 'say "hi", bye'},
+        {"id": 3, "timestamp": "2024-05-02", "humidity": None, "note": "raw"},
+    ]
+
+def test_gzip_chunks_is_one_member_streamed():
+    data = [b"a,b\r\n"] + [f"{i},{i * 2}\r\n".encode() for i in range(5000)]
+    compressed = list(gzip_chunks(iter(data), level=1))
+    assert len(compressed) > 1
+    assert gzip.decompress(b"".join(compressed)) == b"".join(data)
+    assert gzip.decompress(b"".join(gzip_chunks(iter([])))) == b""
+
+def test_encode_combines_format_and_compression():
+    plain = b"".join(encode(COLUMNS, CHUNKS, "csv", compress=False))
+    assert gzip.decompress(b"".join(encode(COLUMNS, CHUNKS, "csv", compress=True))) == plain
+    assert b"".join(encode(COLUMNS, CHUNKS, "ndjson", compress=False)).startswith(b'{"id":1,')
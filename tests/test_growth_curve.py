@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from src.models.growth_curve import GrowthAnalytics, GrowthFit, fit_logistic, predict, stage
+
+def logistic(days, capacity, rate, midpoint):
+    return capacity / (1.0 + np.exp(-rate * (days - midpoint)))
+
+def test_recovers_synthetic_curve():
+    days = np.arange(0, 60, 2, dtype=np.float64)
+    fit = fit_logistic(days, logistic(days, 80.0, 0.15, 30.0))
+    assert fit.capacity == pytest.approx(80.0, rel=1e-3)
+    assert fit.rate == pytest.approx(0.15, rel=1e-3)
+    assert fit.midpoint == pytest.approx(30.0, abs=0.05)
+    assert fit.rmse < 1e-3 and fit.points == days.size
+
+def test_noisy_partial_curve():
+    rng = np.random.default_rng(7)
+    days = np.repeat(np.arange(5, 40, dtype=np.float64), 2)
+    heights = logistic(days, 50.0, 0.2, 25.0) + rng.normal(0, 0.5, days.size)
+    fit = fit_logistic(days, heights)
+    assert fit.capacity == pytest.approx(50.0, rel=0.05)
+    assert fit.midpoint == pytest.approx(25.0, abs=1.0)
+    assert fit.rmse < 1.0
+    assert predict(fit, 60.0) == pytest.approx(fit.capacity, rel=0.01)
+
+def test_unusable_input():
+    assert fit_logistic(np.array([1.0, 1.0, 2.0]), np.array([3.0, 4.0, 5.0])) is None
+    # Shrinking plants have no positive growth rate
+    assert fit_logistic(np.arange(10.0), np.linspace(20.0, 5.0, 10)) is None
+    # Non-finite and non-positive heights are ignored
+    days = np.array([0.0, 10.0, 20.0, 30.0, np.nan, 40.0])
+    heights = np.array([1.0, 5.0, 20.0, 35.0, 10.0, 0.0])
+    assert fit_logistic(days, heights).points == 4
+
+def test_stage_boundaries():
+    assert [stage(f) for f in (0.05, 0.3, 0.7, 0.95)] == ["Early Growth", "Rapid Growth", "Late Growth", "Mature"]
+    assert predict(GrowthFit(10.0, 1.0, 5.0, 0.0, 3), 5.0) == pytest.approx(5.0)
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute_query(self, query, params=None):
+        if "MAX(id)" in query:
+            return [(len(self.rows),)]
+        return self.rows
+
+def rows_for(plant_id, name, days, heights):
+    return [(plant_id, name, float(d), float(h)) for d, h in zip(days, heights)]
+
+def test_flat_plants_get_no_prediction():
+    days = np.arange(30)
+    rows = (rows_for(1, "Basil", days, 5 + 1e-7 * days)
+            + rows_for(2, "Chive", [0, 1, 2], [1, 1.0000001, 1.0000002])
+            + rows_for(3, "Tomato", days * 2, logistic(days * 2.0, 80.0, 0.15, 30.0)))
+    plants = {plant["plant_id"]: plant for plant in GrowthAnalytics(FakeDB(rows)).refresh()}
+    for plant_id in (1, 2):
+        assert plants[plant_id]["predicted_harvest_date"] is None
+        assert plants[plant_id]["days_to_harvest"] is None
+        assert plants[plant_id]["current_stage"] == "Not enough data"
+    assert plants[3]["predicted_harvest_date"] is not None
+    assert plants[3]["current_stage"] == "Mature"
+
+def test_one_bad_plant_does_not_fail_the_refresh():
+    rows = rows_for(1, "Ancient", [1e9, 1e9 + 1, 1e9 + 2], [1.0, 2.0, 3.0]) + rows_for(2, "Basil", [0, 10, 20], [1.0, 5.0, 9.0])
+    plants = GrowthAnalytics(FakeDB(rows)).refresh()
+    assert [plant["plant_id"] for plant in plants] == [2]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+gi = pytest.importorskip("gi")
+try:
+    gi.require_version("Gst", "1.0")
+    gi.require_version("GstVideo", "1.0")
+    from gi.repository import Gst
+except (ValueError, ImportError):
+    pytest.skip("GStreamer bindings not installed", allow_module_level=True)
+
+from src.utils.gst_camera import GstCamera, build_pipeline, init_gstreamer
+
+init_gstreamer()
+if not all(Gst.ElementFactory.find(name) for name in ("videotestsrc", "videoconvert", "appsink")):
+    pytest.skip("videotestsrc, videoconvert or appsink element missing", allow_module_level=True)
+
+def test_build_pipeline_sources():
+    assert build_pipeline("/dev/video0", 640, 480, 30).startswith(
+        "v4l2src device=/dev/video0 ! image/jpeg,width=640,height=480,framerate=30/1 ! jpegdec")
+    assert "video/x-raw,format=YUY2,width=640,height=480 !" in build_pipeline(
+        "/dev/video0", 640, 480, None, input_format="YUY2")
+    assert build_pipeline("videotestsrc ! queue").startswith("videotestsrc ! queue ! videoconvert")
+    assert "max-buffers=2 drop=true" in build_pipeline("videotestsrc")
+
+@pytest.mark.parametrize("width", [320, 322])
+def test_videotestsrc_frames(width):
+    # 322 * 3 bytes is not a multiple of 4, so GStreamer pads each BGR row
+    camera = GstCamera("videotestsrc", width, 240, fps=30)
+    try:
+        assert camera.isOpened()
+        assert (camera.width, camera.height) == (width, 240)
+        assert camera.stride >= width * 3
+        ok, frame = camera.read()
+        assert ok and frame.shape == (240, width, 3) and frame.dtype == np.uint8
+        buffer = np.zeros_like(frame)
+        ok, reused = camera.read(buffer)
+        assert ok and reused is buffer
+        with camera.mapped() as view:
+            assert view.shape == (240, width, 3)
+            assert view.strides[0] == camera.stride
+            copy = view.copy()
+            del view
+        assert copy.any()
+    finally:
+        camera.release()
+    assert not camera.isOpened()
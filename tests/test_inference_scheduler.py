@@ -0,0 +1,103 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.utils.camera import FrameSnapshot
+from src.utils.camera_registry import CameraRegistry, check_device
+from src.utils.inference_scheduler import COALESCED, InferenceScheduler
+
+class FakeSupervisor:
+    """Every read is a new frame, as with a camera capturing faster than inference."""
+
+    def __init__(self, name, device):
+        self.name = name
+        self.sequence = 0
+        self.frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def get_frame(self):
+        self.sequence += 1
+        return FrameSnapshot(self.frame, time.time(), self.sequence, False)
+
+    def stop(self):
+        pass
+
+@pytest.fixture
+def cameras():
+    registry = CameraRegistry(FakeSupervisor)
+    for name in ("busy", "quiet", "idle"):
+        registry.add(name, "synthetic")
+    order = []
+
+    def classify(camera, snapshot):
+        order.append(camera)
+        time.sleep(0.002)
+        return [{"camera": camera, "sequence": snapshot.sequence}]
+
+    scheduler = InferenceScheduler(registry, classify, budget=1.0, history=3)
+    yield registry, scheduler, order
+    scheduler.stop()
+
+def test_busy_camera_cannot_starve_others(cameras):
+    registry, scheduler, order = cameras
+    scheduler.start()
+    stop = threading.Event()
+    fresh = {"busy": 0, "quiet": 0}
+
+    def poll(camera):
+        while not stop.is_set():
+            _, error, ok = scheduler.request(camera, timeout=1.0)
+            assert error is None
+            fresh[camera] += ok
+
+    threads = [threading.Thread(target=poll, args=("busy",)) for _ in range(6)]
+    threads.append(threading.Thread(target=poll, args=("quiet",)))
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    runs = {name: stats["runs"] for name, stats in scheduler.status()["cameras"].items()}
+    # Six pollers on one camera and one on the other still alternate turn by turn
+    assert runs["quiet"] >= 0.8 * runs["busy"] > 0
+    assert "idle" not in runs
+    assert fresh["quiet"] > 0 and scheduler.status()["coalesced"] > 0
+
+def test_concurrent_requests_share_a_run(cameras):
+    registry, scheduler, order = cameras
+    results = []
+    coalesced = COALESCED.value
+    threads = [threading.Thread(target=lambda: results.append(scheduler.request("quiet"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # All five are waiting on the same pending run before the worker starts
+    deadline = time.time() + 2
+    while COALESCED.value - coalesced < 4 and time.time() < deadline:
+        time.sleep(0.01)
+    scheduler.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and all(fresh for _, _, fresh in results)
+    assert order == ["quiet"]
+    assert scheduler.latest("quiet") == [{"camera": "quiet", "sequence": 1}]
+
+def test_removed_camera_is_forgotten(cameras):
+    registry, scheduler, order = cameras
+    scheduler.start()
+    scheduler.request("idle")
+    assert "idle" in scheduler.status()["cameras"]
+    registry.remove("idle")
+    assert "idle" not in scheduler.status()["cameras"]
+    assert scheduler.latest("idle") == []
+
+def test_check_device():
+    configured = ["/dev/video0", "synthetic@15"]
+    assert check_device("2", configured) == "/dev/video2"
+    assert check_device("/dev/video10", configured) == "/dev/video10"
+    assert check_device("synthetic@15", configured) == "synthetic@15"
+    for device in ("gst:videotestsrc ! fakesink", "replay:/etc", "synthetic@30", "/etc/passwd", ""):
+        with pytest.raises(ValueError):
+            check_device(device, configured)
+    assert check_device("replay:/tmp/frames", configured, allow_sources=True) == "replay:/tmp/frames"
@@ -0,0 +1,40 @@
+import logging
+
+from src.utils.log_pipeline import RateLimiter
+
+def record(line=10, name="root", level=logging.WARNING, msg="camera read failed", **extra):
+    rec = logging.LogRecord(name, level, "/app/src/utils/camera.py", line, msg, None, None)
+    rec.__dict__.update(extra)
+    return rec
+
+def test_burst_per_call_site_then_summary():
+    limiter = RateLimiter(burst=2, window=60)
+    assert [limiter.check(record())[0] for _ in range(5)] == [True, True, False, False, False]
+    # A different call site has its own budget
+    assert limiter.check(record(line=11))[0]
+    summaries = limiter.flush()
+    assert len(summaries) == 1
+    assert summaries[0].getMessage() == "Suppressed 3 repeats of 'camera read failed' from camera.py:10 in the last 0s"
+    assert limiter.active_keys() == 0
+    assert limiter.check(record())[0]
+
+def test_log_key_groups_call_sites():
+    limiter = RateLimiter(burst=1, window=60)
+    assert limiter.check(record(line=1, log_key="camera"))[0]
+    assert not limiter.check(record(line=2, log_key="camera"))[0]
+
+def test_window_expiry_reports_and_resets():
+    limiter = RateLimiter(burst=1, window=60)
+    limiter.check(record())
+    assert not limiter.check(record())[0]
+    limiter.windows[("/app/src/utils/camera.py", 10)].start -= 61
+    allowed, summaries = limiter.check(record())
+    assert allowed and len(summaries) == 1
+
+def test_werkzeug_access_log_is_exempt():
+    limiter = RateLimiter(burst=1, window=60)
+    access = [record(name="werkzeug", level=logging.INFO, msg='"GET /sensor_data HTTP/1.1" 200 -') for _ in range(10)]
+    assert all(limiter.check(rec)[0] for rec in access)
+    assert limiter.active_keys() == 0
+    errors = [limiter.check(record(name="werkzeug", level=logging.ERROR))[0] for _ in range(3)]
+    assert errors == [True, False, False]
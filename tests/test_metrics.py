@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry
+
+def test_render_text_format():
+    registry = MetricsRegistry()
+    registry.counter("frames_total", "Frames captured", labels={"camera": "bench"}).inc(3)
+    registry.gauge("queue_depth", "Items queued").set(2)
+    registry.gauge("pool_idle").set_function(lambda: 4)
+    stage = registry.histogram("stage_seconds", "Stage time", labels={"stage": "encode"}, buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.5):
+        stage.observe(value)
+    assert registry.render().splitlines() == [
+        "# HELP frames_total Frames captured",
+        "# TYPE frames_total counter",
+        'frames_total{camera="bench"} 3.0',
+        "# TYPE pool_idle gauge",
+        "pool_idle 4.0",
+        "# HELP queue_depth Items queued",
+        "# TYPE queue_depth gauge",
+        "queue_depth 2.0",
+        "# HELP stage_seconds Stage time",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="encode",le="0.01"} 1',
+        'stage_seconds_bucket{stage="encode",le="0.1"} 2',
+        'stage_seconds_bucket{stage="encode",le="+Inf"} 3',
+        'stage_seconds_sum{stage="encode"} 0.555',
+        'stage_seconds_count{stage="encode"} 3',
+    ]
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", labels={"message": 'bad "quote"\\\n'}).inc()
+    assert 'errors_total{message="bad \\"quote\\"\\\\\\n"} 1.0' in registry.render().splitlines()
+
+def test_same_name_returns_same_series_and_kind_is_checked():
+    registry = MetricsRegistry()
+    assert registry.counter("runs_total", labels={"camera": "a"}) is registry.counter("runs_total", labels={"camera": "a"})
+    assert registry.counter("runs_total", labels={"camera": "a"}) is not registry.counter("runs_total", labels={"camera": "b"})
+    with pytest.raises(ValueError):
+        registry.gauge("runs_total")
+
+def test_failing_gauge_function_renders_nan():
+    registry = MetricsRegistry()
+    registry.gauge("broken").set_function(lambda: 1 / 0)
+    assert "broken nan" in registry.render()
+    assert math.isnan(registry.gauge("broken").read())
+
+def test_histogram_quantile():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", buckets=(0.1, 0.2, 0.4))
+    assert math.isnan(histogram.quantile(0.5))
+    for value in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    with histogram.time():
+        pass
+    assert sum(histogram.snapshot()[0]) == 5
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+pytest.importorskip("tflite_runtime")
+
+from src.utils.edgedevice import load_models
+from src.utils.model_registry import ModelRegistry, find_variants
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODEL_DIR = os.path.join(ROOT, "data_model")
+
+@pytest.fixture
+def bird():
+    variants, label_path = find_variants(MODEL_DIR, "bird")
+    if "cpu" not in variants or label_path is None:
+        pytest.skip("bird model not in data_model")
+    return variants["cpu"], label_path
+
+def test_load_models_uses_registry_choice(bird, tmp_path):
+    model_path, label_path = bird
+    registry = ModelRegistry(MODEL_DIR, cache_path=str(tmp_path / "choice.json"), warmup=0, runs=1,
+                             thread_options=[1])
+    interpreters, labels = load_models({"bird": {"model_path": model_path, "label_path": label_path},
+                                        "missing": {"model_path": "nope.tflite", "label_path": label_path}},
+                                       registry=registry)
+    assert list(interpreters) == ["bird"] and len(labels["bird"]) > 0
+    choice = registry.choices["bird"]
+    assert choice.model_path == model_path and choice.backend in ("xnnpack", "builtin")
+    assert os.path.exists(tmp_path / "choice.json")
+    # A second registry reuses the cached choice instead of probing
+    again = ModelRegistry(MODEL_DIR, cache_path=str(tmp_path / "choice.json"), warmup=0, runs=1, thread_options=[1])
+    assert again.select("bird", variants={"cpu": model_path}, label_path=label_path) == choice
+    assert again.probe_results == {}
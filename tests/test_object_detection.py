@@ -0,0 +1,27 @@
+import numpy as np
+
+from src.models.object_detection import ObjectDetector
+
+def frames(count, height=240, width=320):
+    for i in range(count):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        frame[100:160, 20 + i * 10:80 + i * 10] = 255
+        yield frame
+
+def test_detectors_at_different_scales_keep_their_buffers():
+    full, half = ObjectDetector(analysis_scale=1.0, min_area=100), ObjectDetector(analysis_scale=0.5, min_area=100)
+    buffers = None
+    for frame in frames(12):
+        full.detect_motion(frame)
+        boxes = half.detect_motion(frame)
+        if buffers is None:
+            buffers = {name: buffer for name, buffer in half.buffers.items()}
+    assert all(half.buffers[name] is buffer for name, buffer in buffers.items())
+    assert half.buffers["small"].shape == (120, 160, 3)
+    assert full.buffers["mask"].shape == (240, 320)
+    assert boxes and all(x >= 0 and w > 0 for x, _, w, _ in boxes)
+
+def test_frame_stride_reuses_boxes():
+    detector = ObjectDetector(frame_stride=3)
+    results = [detector.detect_motion(frame) for frame in frames(6)]
+    assert results[1] is results[0] and results[2] is results[0]
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.utils.profiler import SamplingProfiler
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_collapsed_output_for_one_thread(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.002)
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        session = profiler.start(5, threads={worker.ident}, mode="wall", label="spinner")
+        time.sleep(0.2)
+        info = profiler.stop(session)
+    finally:
+        stop.set()
+        worker.join()
+    assert info["samples"] > 0 and info["finished"] is not None
+    path = profiler.path(session)
+    assert path == os.path.join(str(tmp_path), f"{session}.collapsed")
+    lines = open(path).read().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == info["samples"]
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        frames = stack.split(";")
+        # Thread name first, then outermost to innermost function
+        assert frames[0] == "spinner" and count.isdigit()
+        assert any(frame.startswith("spin (test_profiler.py:") for frame in frames)
+    assert profiler.stop(session) is None
+    assert profiler.status()["finished"][0]["id"] == session
+
+def test_session_ends_at_deadline_and_old_files_are_pruned(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.005, keep=1)
+    first = profiler.start(0.05, mode="wall")
+    deadline = time.time() + 2
+    # Written by a background thread once the deadline passes
+    while not profiler.status()["finished"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert profiler.path(first)
+    second = profiler.start(5, mode="wall")
+    profiler.stop(second)
+    assert profiler.path(first) is None and profiler.path(second)
+
+def test_limits_and_validation(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), max_sessions=1)
+    with pytest.raises(ValueError):
+        profiler.start(5, mode="gpu")
+    with pytest.raises(ValueError):
+        profiler.start(0)
+    session = profiler.start(5)
+    assert profiler.start(5) is None
+    profiler.stop_all()
+    assert profiler.status()["active"] == []
+    assert profiler.path("../../etc/passwd") is None
+    assert profiler.path(session)
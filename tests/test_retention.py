@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from src.utils import sqlite_backend
+from src.utils.retention import RetentionPolicy, from_days, partition_name, to_days
+
+class FakeDB:
+    """The db_manager surface RetentionPolicy uses, over an SQLite connection."""
+
+    def __init__(self, partitions=()):
+        self.pool = True
+        self.connection = sqlite_backend.connect()
+        self.partition_rows = list(partitions)
+        self.statements = []
+
+    def execute_query(self, query, params=None):
+        self.statements.append(" ".join(query.split()))
+        if "information_schema.PARTITIONS" in query:
+            return self.partition_rows
+        if query.lstrip().startswith("ALTER TABLE"):
+            return []
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        self.connection.commit()
+        return rows
+
+    @contextmanager
+    def transaction(self):
+        cursor = self.connection.cursor()
+        yield cursor
+        self.connection.commit()
+
+def test_to_days_matches_mariadb():
+    # SELECT TO_DAYS('2007-10-07') in the MariaDB manual
+    assert to_days(date(2007, 10, 7)) == 733321
+    assert from_days(733321) == date(2007, 10, 7)
+    assert partition_name(date(2024, 5, 1)) == "p20240501"
+
+def test_partition_clauses_cover_each_day():
+    policy = RetentionPolicy(FakeDB(), "mariadb")
+    clauses = policy._partition_clauses(date(2024, 2, 28), date(2024, 3, 1))
+    assert clauses == [
+        f"PARTITION p20240228 VALUES LESS THAN ({to_days(date(2024, 2, 29))})",
+        f"PARTITION p20240229 VALUES LESS THAN ({to_days(date(2024, 3, 1))})",
+        f"PARTITION p20240301 VALUES LESS THAN ({to_days(date(2024, 3, 2))})",
+    ]
+    assert policy._partition_clauses(date(2024, 3, 2), date(2024, 3, 1)) == []
+
+def test_partitioning_only_on_mariadb():
+    assert RetentionPolicy(FakeDB(), "mariadb").partition
+    assert not RetentionPolicy(FakeDB(), "sqlite").partition
+    assert RetentionPolicy(FakeDB(), "sqlite").partitions() == []
+
+def test_add_future_partitions_splits_pmax():
+    today = date.today()
+    db = FakeDB()
+    policy = RetentionPolicy(db, "mariadb", days_ahead=2)
+    partitions = [(partition_name(today), to_days(today + timedelta(days=1))), ("pmax", None)]
+    assert policy.add_future_partitions(partitions) == 2
+    assert db.statements[-1].startswith("ALTER TABLE sensor_data REORGANIZE PARTITION pmax INTO (PARTITION "
+                                        f"{partition_name(today + timedelta(days=1))} VALUES LESS THAN")
+    assert db.statements[-1].endswith("PARTITION pmax VALUES LESS THAN MAXVALUE)")
+    # Nothing to add once the partitions reach days_ahead, or without a MAXVALUE partition
+    ahead = today + timedelta(days=3)
+    assert policy.add_future_partitions([(partition_name(ahead), to_days(ahead)), ("pmax", None)]) == 0
+    assert policy.add_future_partitions(partitions[:1]) == 0
+
+def test_drop_partitions_before_cutoff():
+    db = FakeDB()
+    db.connection.execute("CREATE TABLE sensor_data (id INTEGER PRIMARY KEY, timestamp TEXT)")
+    policy = RetentionPolicy(db, "mariadb")
+    policy._scalar = lambda query, params=None: 10
+    cutoff = datetime(2024, 5, 3, 12)
+    partitions = [("p_expired", to_days(date(2024, 5, 1))), ("p20240501", to_days(date(2024, 5, 2))),
+                  ("p20240502", to_days(date(2024, 5, 3))), ("p20240503", to_days(date(2024, 5, 4))),
+                  ("pmax", None)]
+    assert policy.drop_partitions(partitions, cutoff) == (["p_expired", "p20240501", "p20240502"], 30)
+    assert db.statements[-1] == "ALTER TABLE sensor_data DROP PARTITION p_expired, p20240501, p20240502"
+    assert policy.drop_partitions(partitions[3:], cutoff) == ([], 0)
+
+def test_delete_chunks_on_sqlite():
+    db = FakeDB()
+    db.connection.execute("CREATE TABLE sensor_data (id INTEGER PRIMARY KEY, timestamp TEXT)")
+    old = (datetime.now() - timedelta(days=100)).strftime("%Y-%m-%d %H:%M:%S")
+    new = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    db.connection.executemany("INSERT INTO sensor_data (timestamp) VALUES (?)",
+                              [(old,)] * 25 + [(new,)] * 5 + [(old,)] * 3)
+    policy = RetentionPolicy(db, "sqlite", keep_days=90, chunk_size=10, pause=0)
+    report = policy.run()
+    assert (report["mode"], report["rows_deleted"], report["chunks"]) == ("chunked", 28, 3)
+    remaining = db.connection.execute("SELECT timestamp FROM sensor_data").fetchall()
+    assert remaining == [(new,)] * 5
+
+def test_run_skips_without_database():
+    db = FakeDB()
+    db.pool = None
+    assert RetentionPolicy(db, "sqlite").run()["skipped"] == "database not available"
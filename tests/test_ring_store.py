@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.utils.ring_store import RingStore, bucket_means, window_stats
+
+def test_window_wraps_in_order():
+    store = RingStore(horizon=10, resolution=1)
+    for t in range(25):
+        store.append("temp", float(t), float(t) * 2)
+    timestamps, values = store.window("temp", 0, 100)
+    assert timestamps.tolist() == list(range(15, 25))
+    assert values.tolist() == [t * 2.0 for t in range(15, 25)]
+    timestamps, _ = store.window("temp", 18, 21)
+    assert timestamps.tolist() == [18, 19, 20]
+    assert store.last_n("temp", 3)[0].tolist() == [22, 23, 24]
+
+def test_same_bucket_is_averaged_and_late_samples_dropped():
+    store = RingStore(horizon=10, resolution=1)
+    store.append("temp", 1.0, 10.0)
+    store.append("temp", 1.5, 20.0)
+    store.append("temp", 2.0, 30.0)
+    store.append("temp", 0.5, 99.0)
+    timestamps, values = store.window("temp", 0, 10)
+    assert timestamps.tolist() == [1.5, 2.0]
+    assert values.tolist() == [15.0, 30.0]
+
+def test_fallback_fills_older_range():
+    calls = []
+
+    def fallback(metric, start, end):
+        calls.append((metric, start, end))
+        return np.array([1.0, 2.0]), np.array([5.0, 6.0])
+
+    store = RingStore(horizon=10, resolution=1, fallback=fallback)
+    for t in range(10, 13):
+        store.append("temp", float(t), 1.0)
+    timestamps, values = store.window("temp", 0, 20)
+    assert timestamps.tolist() == [1, 2, 10, 11, 12]
+    assert values.tolist() == [5, 6, 1, 1, 1]
+    assert calls == [("temp", 0, 10.0)]
+    store.window("temp", 10, 20)
+    assert len(calls) == 1
+
+def test_downsample_buckets_and_summary():
+    store = RingStore(horizon=1000, resolution=1)
+    for t in range(100):
+        store.append("temp", float(t), float(t))
+    timestamps, values = store.downsample("temp", 0, 100, points=10)
+    assert len(timestamps) == 10
+    assert timestamps[0] == pytest.approx(5.0)
+    assert values.tolist() == [t * 10 + 4.5 for t in range(10)]
+    window = store.window("temp", 0, 100)
+    assert [a.tolist() for a in bucket_means(*window, 0, 100, points=10)] == [timestamps.tolist(), values.tolist()]
+    # Fewer readings than points are returned as they are
+    assert bucket_means(*window, 0, 100, points=200)[0].tolist() == list(range(100))
+    assert window_stats(window[1]) == {"count": 100, "mean": 49.5, "min": 0.0, "max": 99.0, "last": 99.0}
+    assert store.aggregate("temp", 0, 100) == window_stats(window[1])
+    assert window_stats(np.empty(0))["count"] == 0
+    assert store.downsample("missing", 0, 100)[0].size == 0
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        RingStore(horizon=0)
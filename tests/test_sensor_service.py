@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from src.utils.sensor_service import DEFAULT_RATES, SensorService, SimulatedBus, parse_rates
+
+def run_for(service, seconds):
+    service.start()
+    try:
+        time.sleep(seconds)
+    finally:
+        service.stop()
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_parse_rates():
+    assert parse_rates("icm20x=100, shtc3=0.5,") == {"icm20x": 100.0, "shtc3": 0.5}
+    with pytest.raises(ValueError):
+        parse_rates("shtc3=0")
+
+def test_each_device_polled_at_its_own_rate():
+    service = SensorService(SimulatedBus(seed=1), rates={"ads1015": 40.0, "unknown": 5.0})
+    assert "unknown" not in service.rates
+    assert service.rates["icm20x"] == DEFAULT_RATES["icm20x"]
+    run_for(service, 0.5)
+    devices = service.stats()["devices"]
+    # Every device is read once at start, then on its own period
+    assert devices["shtc3"]["reads"] == 1
+    assert devices["lps2x"]["reads"] == 1
+    assert 10 <= devices["ads1015"]["reads"] <= 22
+    assert devices["icm20x"]["reads"] > devices["ads1015"]["reads"]
+    assert all(stats["errors"] == 0 for stats in devices.values())
+
+def test_failing_device_backs_off():
+    service = SensorService(SimulatedBus(failure_rate=1.0), rates={"icm20x": 50.0}, max_backoff=0.2)
+    run_for(service, 0.6)
+    stats = service.stats()["devices"]["icm20x"]
+    assert stats["reads"] == 0
+    assert "Simulated I2C error" in stats["last_error"]
+    # At 50 Hz without backoff this would be ~30; doubling from 40 ms and capping at 200 ms allows ~5
+    assert 2 <= stats["errors"] <= 7
+    assert service.snapshot() == {"sampled_at": {}}
+
+def test_subscribers_get_every_sample():
+    service = SensorService(SimulatedBus(seed=2))
+    received = []
+
+    def broken(sample):
+        raise RuntimeError("subscriber bug")
+
+    service.subscribe(broken)
+    service.subscribe(received.append)
+    service.start()
+    try:
+        assert wait_for(lambda: {sample.device for sample in received} == set(DEFAULT_RATES))
+    finally:
+        service.stop()
+    sample = next(sample for sample in received if sample.device == "shtc3")
+    assert set(sample.values) == {"temperature_sht", "humidity"}
+    assert abs(sample.timestamp - time.time()) < 5
+    count = len(received)
+    service.unsubscribe(received.append)
+    run_for(service, 0.1)
+    assert len(received) == count
+
+def test_snapshot_merges_latest_readings():
+    service = SensorService(SimulatedBus(seed=3))
+    assert service.snapshot() == {"sampled_at": {}}
+    service.start()
+    try:
+        assert wait_for(lambda: len(service.snapshot()["sampled_at"]) == len(DEFAULT_RATES))
+    finally:
+        service.stop()
+    snapshot = service.snapshot()
+    for key in ("analog_value", "soil_moisture", "color_red", "light_intensity", "pressure", "humidity", "accel_z"):
+        assert key in snapshot
+    assert 0.0 <= snapshot["soil_moisture"] <= 100.0
+    assert snapshot["sampled_at"]["icm20x"] == service.latest["icm20x"].timestamp
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from benchmarks.species_fixture import start_fixture_server
+from src.utils.species_info import SpeciesInfoService, scientific_name
+
+@pytest.fixture
+def upstream():
+    server, url = start_fixture_server()
+    yield server, url
+    server.shutdown()
+    server.server_close()
+
+def test_scientific_name():
+    assert scientific_name("Betula lenta (Sweet birch)") == "Betula lenta"
+    assert scientific_name("  Quercus robur ") == "Quercus robur"
+    assert scientific_name("(unknown)") == "(unknown)"
+
+def test_lookup_cached_in_memory_and_on_disk(upstream, tmp_path):
+    server, url = upstream
+    cache = str(tmp_path / "species.sqlite3")
+    service = SpeciesInfoService(url, cache_path=cache)
+    try:
+        entry = service.lookup("Betula lenta (Sweet birch)")
+        assert entry["found"] and entry["title"] == "Betula lenta"
+        assert entry["summary"].startswith("Betula lenta")
+        assert entry["url"].startswith(url.split("/w/")[0])
+        assert service.lookup("Betula lenta") is entry
+        missing = service.lookup("Missing plant")
+        assert not missing["found"] and missing["title"] == "Missing plant"
+    finally:
+        service.close()
+    assert server.requests == ["Betula lenta", "Missing plant"]
+    reopened = SpeciesInfoService(url, cache_path=cache)
+    try:
+        assert reopened.lookup("Betula lenta")["found"]
+        assert reopened.stats()["disk_entries"] == 2
+    finally:
+        reopened.close()
+    assert len(server.requests) == 2
+
+def test_concurrent_lookups_share_one_request(upstream):
+    server, url = upstream
+    service = SpeciesInfoService(url)
+    barrier = threading.Barrier(8)
+
+    def look():
+        barrier.wait()
+        service.lookup("Acer rubrum")
+
+    threads = [threading.Thread(target=look) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        service.close()
+    assert server.requests == ["Acer rubrum"]
+
+def test_unreachable_upstream_is_negatively_cached(upstream):
+    server, url = upstream
+    server.shutdown()
+    server.server_close()
+    service = SpeciesInfoService(url, timeout=0.5)
+    try:
+        entry = service.lookup("Acer rubrum")
+        assert not entry["found"]
+        assert service.lookup("Acer rubrum") is entry
+    finally:
+        service.close()
@@ -0,0 +1,35 @@
+import time
+
+from src.utils import sqlite_backend
+from src.utils.detection_store import DETECTION_TABLES, INSERT_DETECTIONS, UPSERT_ROLLUPS
+
+def test_translate_rewrites_mariadb_dialect():
+    translate = sqlite_backend.translate
+    assert translate("CREATE TABLE t (id INT AUTO_INCREMENT PRIMARY KEY, v FLOAT) ENGINE=InnoDB") == \
+        "CREATE TABLE t (id INTEGER PRIMARY KEY AUTOINCREMENT, v FLOAT)"
+    assert translate("id BIGINT AUTO_INCREMENT PRIMARY KEY") == "id INTEGER PRIMARY KEY AUTOINCREMENT"
+    assert translate("INSERT IGNORE INTO t (a) VALUES (%s)") == "INSERT OR IGNORE INTO t (a) VALUES (?)"
+    assert translate("SELECT UNIX_TIMESTAMP(ts) FROM t WHERE ts >= FROM_UNIXTIME(%s)") == \
+        "SELECT CAST(strftime('%s', ts, 'utc') AS REAL) FROM t WHERE ts >= datetime(?, 'unixepoch', 'localtime')"
+    assert translate("ON DUPLICATE KEY UPDATE n = n + VALUES(n), m = GREATEST(m, VALUES(m))") == \
+        "ON CONFLICT DO UPDATE SET n = n + excluded.n, m = MAX(m, excluded.m)"
+    # The strftime format is not a placeholder
+    assert translate("SELECT UNIX_TIMESTAMP(%s)").count("?") == 1
+
+def test_translated_queries_run_on_sqlite():
+    connection = sqlite_backend.connect()
+    cursor = connection.cursor()
+    for statement in DETECTION_TABLES:
+        cursor.execute(statement)
+    hour = 1714550400.0
+    cursor.execute(INSERT_DETECTIONS, (hour + 5, "bird", 3, "Robin", 0.7))
+    cursor.executemany(UPSERT_ROLLUPS, [(hour, "bird", 3, "Robin", 2, 0.6), (hour, "bird", 3, "Robin", 1, 0.9)])
+    connection.commit()
+    cursor.execute("SELECT UNIX_TIMESTAMP(detected_at), label FROM detections")
+    assert cursor.fetchall() == [(hour + 5, "Robin")]
+    cursor.execute("SELECT detection_count, max_confidence FROM detection_rollups")
+    count, confidence = cursor.fetchone()
+    assert count == 3 and abs(confidence - 0.9) < 1e-6
+    cursor.execute("SELECT COUNT(*) FROM detections WHERE detected_at >= FROM_UNIXTIME(%s)", (time.time(),))
+    assert cursor.fetchone() == (0,)
+    assert connection.ping()
@@ -0,0 +1,109 @@
+import pytest
+
+from src.utils.write_buffer import WriteBuffer
+
+INSERT = "INSERT IGNORE INTO sensor_data (reading_key, value) VALUES (%s, %s)"
+EVENT = "INSERT INTO events (name) VALUES (%s)"
+
+class FakeDB:
+    """db_manager stand-in: records committed batches, can be down or reject marked rows."""
+
+    def __init__(self):
+        self.pool = True
+        self.up = True
+        self.reconnects = 0
+        self.committed = []
+        self.batches = []
+
+    def reconnect(self):
+        self.reconnects += 1
+        self.pool = self.up
+        return self.up
+
+    def execute_query(self, query, params=None):
+        return [(1,)] if self.up else None
+
+    def execute_batches(self, batches):
+        if not self.up:
+            self.pool = None
+            return False
+        if any(params[0] == "bad" for _, rows in batches for params in rows):
+            return False
+        self.batches.append(batches)
+        self.committed += [(statement, params) for statement, rows in batches for params in rows]
+        return True
+
+@pytest.fixture
+def buffer(tmp_path):
+    db = FakeDB()
+    wb = WriteBuffer(str(tmp_path / "buffer.sqlite3"), db, batch_size=10)
+    yield wb, db
+    wb.close()
+
+def test_append_and_forward_in_order(buffer):
+    wb, db = buffer
+    for i in range(3):
+        wb.append(INSERT, (f"k{i}", i * 1.5))
+    wb.append(EVENT, ("rain",))
+    wb.append(INSERT, ("k3", 4.5))
+    assert wb.pending == 5
+    assert wb.forward() == 5
+    # Consecutive rows of one statement share an executemany, in write order
+    assert [(statement, len(rows)) for statement, rows in db.batches[0]] == [(INSERT, 3), (EVENT, 1), (INSERT, 1)]
+    assert db.committed[0] == (INSERT, ("k0", 0.0))
+    assert wb.pending == 0 and wb.forward() == 0
+    assert wb.stats()["backlog"] == 0 and wb.stats()["last_replay"]["rows"] == 5
+
+def test_forward_in_batches(buffer):
+    wb, db = buffer
+    for i in range(25):
+        wb.append(INSERT, (f"k{i}", i))
+    assert [wb.forward() for _ in range(4)] == [10, 10, 5, 0]
+    assert [params[0] for _, params in db.committed] == [f"k{i}" for i in range(25)]
+
+def test_database_down_keeps_rows(buffer):
+    wb, db = buffer
+    wb.append(INSERT, ("k0", 1))
+    db.up = False
+    assert wb.forward() == -1
+    assert wb.forward() == -1 and db.reconnects == 1
+    assert wb.pending == 1 and wb.stats()["last_error"] == "database unreachable"
+    db.up = True
+    assert wb.forward() == 1
+    assert wb.pending == 0 and wb.dead_lettered == 0
+
+def test_rejected_row_is_dead_lettered(buffer):
+    wb, db = buffer
+    wb.append(INSERT, ("k0", 1))
+    wb.append(INSERT, ("bad", 2))
+    wb.append(INSERT, ("k2", 3))
+    assert wb.forward() == 2
+    assert [params[0] for _, params in db.committed] == ["k0", "k2"]
+    assert wb.pending == 0 and wb.dead_lettered == 1
+    assert wb.conn.execute("SELECT params FROM dead_letter").fetchall() == [('["bad", 2]',)]
+    assert wb.stats()["dead_lettered"] == 1
+
+def test_backlog_survives_reopen(tmp_path):
+    path = str(tmp_path / "buffer.sqlite3")
+    db = FakeDB()
+    db.up = db.pool = False
+    first = WriteBuffer(path, db)
+    first.append(INSERT, ("k0", 1))
+    first.close()
+    db.up = True
+    second = WriteBuffer(path, db)
+    try:
+        assert second.pending == 1
+        assert second.forward() == 1
+    finally:
+        second.close()
+
+def test_size_cap_drops_oldest(tmp_path):
+    wb = WriteBuffer(str(tmp_path / "buffer.sqlite3"), FakeDB(), max_rows=100)
+    try:
+        for i in range(101):
+            wb.append(INSERT, (f"k{i}", i))
+        assert wb.pending == 100
+        assert wb.conn.execute("SELECT MIN(seq) FROM pending").fetchone()[0] == 2
+    finally:
+        wb.close()